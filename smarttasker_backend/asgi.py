@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smarttasker_backend.settings')
+# Lets settings pick ASGI-appropriate defaults (see CONN_MAX_AGE).
+os.environ['SMARTTASKER_ASGI'] = '1'
+# Serve the read endpoints from their async views (see ASYNC_READ_VIEWS).
+os.environ.setdefault('SMARTTASKER_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
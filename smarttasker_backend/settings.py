@@ -43,12 +43,15 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
+    'django_filters',
 
     # Local apps
     'tasks',
 ]
 
 MIDDLEWARE = [
+    'tasks.metrics.PerformanceMiddleware',
+    'tasks.db_router.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -78,13 +81,41 @@ TEMPLATES = [
     },
 ]
 
+# Persistent connections only pay off under WSGI, where a worker thread
+# serves request after request. Under ASGI each request may run on a new
+# thread, so kept connections would pile up; Django advises against them.
+_CONN_MAX_AGE_DEFAULT = 0 if os.environ.get('SMARTTASKER_ASGI') == '1' else 60
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections across requests; verify them before reuse.
+        'CONN_MAX_AGE': int(os.environ.get('SMARTTASKER_CONN_MAX_AGE', _CONN_MAX_AGE_DEFAULT)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas: comma-separated database names (SQLite files when testing
+# locally) using the primary's engine and credentials. See
+# tasks.db_router for routing, stickiness and health checks.
+DATABASE_REPLICAS = []
+for _index, _name in enumerate(filter(None, os.environ.get('SMARTTASKER_DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{_index}'] = {**DATABASES['default'], 'NAME': _name, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{_index}')
+
+# Extra shards for per-user task data, named like replicas; 'default' is
+# always shard 0 and holds users and the shard map. See tasks.sharding.
+DATABASE_SHARDS = ['default']
+for _index, _name in enumerate(filter(None, os.environ.get('SMARTTASKER_DB_SHARDS', '').split(',')), 1):
+    DATABASES[f'shard{_index}'] = {**DATABASES['default'], 'NAME': _name}
+    DATABASE_SHARDS.append(f'shard{_index}')
+SHARD_MAP_CACHE_TTL = 60
+
+DATABASE_ROUTERS = ['tasks.sharding.ShardRouter', 'tasks.db_router.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = 5
+REPLICA_HEALTH_INTERVAL = 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -132,18 +163,18 @@ CSRF_TRUSTED_ORIGINS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'tasks.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'tasks.metrics.TimedJSONRenderer',
     ),
     'DEFAULT_PARSER_CLASSES': (
         'rest_framework.parsers.JSONParser',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'tasks.pagination.TaskCursorPagination',
     'PAGE_SIZE': 10,
 }
 
@@ -156,6 +187,38 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+# Per-process cache of users resolved from access tokens (see
+# tasks.authentication.CachedJWTAuthentication).
+JWT_USER_CACHE_SIZE = 1024
+JWT_USER_CACHE_TTL = 60  # seconds
+
+# Token-bucket throttles for login, register and password reset ("N/period":
+# bursts of N, refilled at N per period), and how many of those requests may
+# hash passwords at once (default: half the cores). AUTH_THROTTLE_CACHE names
+# a cache alias to share this state between workers; unset keeps it per process.
+AUTH_THROTTLE_RATES = {
+    'auth_ip': '30/min',
+    'auth_account': '10/min',
+}
+AUTH_HASHING_CONCURRENCY = None
+AUTH_THROTTLE_CACHE = None
+
+# Cached payloads of the dashboard, calendar and insights endpoints, keyed by
+# the user's data version. Per-process LRU of RESPONSE_CACHE_SIZE entries by
+# default; RESPONSE_CACHE_ALIAS names a shared Django cache instead.
+RESPONSE_CACHE_SIZE = 2048
+RESPONSE_CACHE_ALIAS = None
+
+# Route the read endpoints to their coroutine views. asgi.py turns this on;
+# WSGI workers keep the sync views.
+ASYNC_READ_VIEWS = os.environ.get('SMARTTASKER_ASYNC_VIEWS') == '1'
+
+# Per-request timings in a Server-Timing response header (visible to clients,
+# so off in production by default). /metrics requires METRICS_TOKEN as a
+# bearer token; without one it only answers under DEBUG or to INTERNAL_IPS.
+PERF_SERVER_TIMING = DEBUG
+METRICS_TOKEN = os.environ.get('SMARTTASKER_METRICS_TOKEN')
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 LOGGING = {
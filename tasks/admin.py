@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Task, Event
+from .models import ArchivedTask, Task, Event, Job, ReminderLog, TaskCounter
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
@@ -19,6 +19,18 @@ class TaskAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'status', 'priority', 'due_date', 'updated_at', 'archived_at')
+    list_filter = ('priority', 'archived_at')
+    search_fields = ('title', 'description', 'user__username', 'user__email')
+    ordering = ('-archived_at',)
+    readonly_fields = (
+        'id', 'user', 'title', 'description', 'due_date', 'created_at', 'updated_at',
+        'completed', 'priority', 'status', 'archived_at',
+    )
+
+
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'user', 'start', 'end', 'all_day')
@@ -35,3 +47,26 @@ class EventAdmin(admin.ModelAdmin):
             'fields': ('start', 'end'),
         }),
     )
+
+
+@admin.register(TaskCounter)
+class TaskCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'total', 'completed', 'pending', 'in_progress', 'updated_at')
+    search_fields = ('user__username', 'user__email')
+    readonly_fields = TaskCounter.COUNTER_FIELDS + ('updated_at',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'max_attempts', 'run_after', 'locked_by', 'created_at')
+    list_filter = ('status', 'name')
+    ordering = ('-id',)
+    readonly_fields = ('attempts', 'locked_by', 'locked_until', 'last_error', 'created_at', 'finished_at')
+
+
+@admin.register(ReminderLog)
+class ReminderLogAdmin(admin.ModelAdmin):
+    list_display = ('task', 'kind', 'due_date', 'sent_at')
+    list_filter = ('kind',)
+    ordering = ('-sent_at',)
+    readonly_fields = ('task', 'kind', 'due_date', 'sent_at', 'run_id')
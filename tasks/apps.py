@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+        from . import metrics, signals
+
+        connection_created.connect(metrics.install_query_timer)
+        post_migrate.connect(signals.ensure_search_index, sender=self)
+        post_migrate.connect(signals.reserve_shard_ids, sender=self)
@@ -0,0 +1,81 @@
+"""
+Hot/cold archival of completed tasks.
+
+Tasks completed (by updated_at) more than TASK_ARCHIVE_AFTER_DAYS ago are
+moved from Task into ArchivedTask, so the live table and the per-user
+indexes every list and calendar query walks only hold current work.
+
+Each batch copies the oldest archivable rows and deletes them from Task in
+one transaction, through the Task queryset so counters, tombstones and data
+versions are updated as for any other delete: archived tasks leave stats,
+sync and the calendar, and stay readable with ?archived=true on the task
+list and export. Moved rows are gone from Task, so an interrupted run
+resumes where it stopped when it is started again.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedTask, Task
+from .sharding import shard_aliases
+
+
+def archive_after_days():
+    return getattr(settings, "TASK_ARCHIVE_AFTER_DAYS", 90)
+
+
+def archive_batch_size():
+    return getattr(settings, "TASK_ARCHIVE_BATCH_SIZE", 500)
+
+
+def archive_cutoff(days=None, now=None):
+    return (now or timezone.now()) - timedelta(days=archive_after_days() if days is None else days)
+
+
+def archivable(cutoff, using):
+    # Served by the partial task_done_updated_idx.
+    return Task.objects.using(using).filter(completed=True, updated_at__lt=cutoff).order_by("updated_at", "id")
+
+
+def archive_batch(cutoff, size, using):
+    """
+    Moves up to size of the oldest archivable tasks on one database and
+    returns how many were moved.
+    """
+    with transaction.atomic(using=using):
+        # Locked so a task reopened mid-batch is neither archived nor lost.
+        rows = list(archivable(cutoff, using).select_for_update().values(*ArchivedTask.ARCHIVED_FIELDS)[:size])
+        if not rows:
+            return 0
+        now = timezone.now()
+        ArchivedTask.objects.using(using).bulk_create(
+            [ArchivedTask(archived_at=now, **row) for row in rows], ignore_conflicts=True,
+        )
+        Task.objects.using(using).filter(pk__in=[row["id"] for row in rows]).delete()
+    return len(rows)
+
+
+def archive_completed_tasks(cutoff=None, batch_size=None, limit=None, aliases=None, progress=None):
+    """
+    Archives tasks completed before cutoff on every shard, batch by batch,
+    stopping after limit tasks if given. Returns the number archived.
+    """
+    cutoff = cutoff or archive_cutoff()
+    batch_size = batch_size or archive_batch_size()
+    archived = 0
+    for alias in aliases or shard_aliases():
+        while limit is None or archived < limit:
+            size = batch_size if limit is None else min(batch_size, limit - archived)
+            moved = archive_batch(cutoff, size, alias)
+            archived += moved
+            if progress is not None and moved:
+                progress(alias, moved)
+            if moved < size:
+                break
+    return archived
+
+
+def count_archivable(cutoff=None, aliases=None):
+    cutoff = cutoff or archive_cutoff()
+    return sum(archivable(cutoff, alias).count() for alias in aliases or shard_aliases())
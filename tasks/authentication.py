@@ -0,0 +1,54 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .lru import LRUCache
+
+_user_cache = None
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = LRUCache(
+            maxsize=getattr(settings, "JWT_USER_CACHE_SIZE", 1024),
+            ttl=getattr(settings, "JWT_USER_CACHE_TTL", 60),
+        )
+    return _user_cache
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drops every cached entry for a user, e.g. after a password change or
+    deactivation. Only affects this process; other workers expire by TTL.
+    """
+    user_id = str(user_id)
+    return get_user_cache().delete_where(lambda key: key[0] == user_id)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that remembers the resolved user per (user id, token
+    jti) for a short TTL, so authenticated requests skip the User lookup.
+    Field values are cached rather than the instance, and each request gets
+    a fresh user built from them, so nothing a view sets or caches on its
+    user (related objects, prefetches) leaks into later requests.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        jti = validated_token.get(jwt_settings.JTI_CLAIM)
+        if user_id is None or jti is None:
+            return super().get_user(validated_token)
+
+        cache = get_user_cache()
+        key = (str(user_id), jti)
+        fields = self.user_model._meta.concrete_fields
+        cached = cache.get(key)
+        if cached is None:
+            # Inactive or missing users raise here and are never cached.
+            user = super().get_user(validated_token)
+            cache.set(key, (user._state.db, tuple(getattr(user, field.attname) for field in fields)))
+            return user
+        db, values = cached
+        return self.user_model.from_db(db, [field.attname for field in fields], values)
@@ -0,0 +1,118 @@
+"""
+Endpoint benchmark suite driven through the Django test client.
+
+Each endpoint is requested repeatedly for a sample of users; wall-clock
+latency (p50/p95), SQL query count and peak Python memory are recorded and
+can be compared against a saved JSON baseline.
+"""
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+# Metrics where a larger value is a regression, with an absolute slack that
+# keeps sub-millisecond timer noise from being flagged.
+COMPARED_METRICS = {"p50_ms": 0.5, "p95_ms": 1.0, "queries": 0, "peak_kb": 16}
+
+
+def default_endpoints(now=None):
+    now = now or timezone.now()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    window = {"start": month_start.isoformat(), "end": (month_start + timedelta(days=31)).isoformat()}
+    return [
+        ("tasks", "/api/tasks/", {}),
+        ("tasks_page_100", "/api/tasks/", {"page_size": 100}),
+        ("dashboard", "/api/dashboard/", {}),
+        ("calendar", "/api/calendar/", {}),
+        ("calendar_feed_month", "/api/calendar/feed/", window),
+        ("insights", "/api/insights/", {}),
+        ("task_stats", "/api/task-stats/", {}),
+        ("events", "/api/events/", {}),
+    ]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def measure_endpoint(client, path, params, iterations, warmup=1):
+    for _ in range(warmup):
+        client.get(path, params)
+
+    timings, query_counts, sizes = [], [], []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(path, params)
+            timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+        query_counts.append(len(queries))
+        sizes.append(len(response.content))
+
+    # Memory is traced in a separate request since tracemalloc slows execution.
+    gc.collect()
+    tracemalloc.start()
+    client.get(path, params)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "queries": int(statistics.median(query_counts)),
+        "peak_kb": round(peak / 1024, 1),
+        "bytes": int(statistics.median(sizes)),
+    }
+
+
+def run_suite(users, iterations=20, endpoints=None):
+    """
+    Benchmarks every endpoint for each user. Returns
+    {"<endpoint>@<username>": metrics}.
+    """
+    endpoints = endpoints or default_endpoints()
+    results = {}
+    for user in users:
+        client = APIClient(SERVER_NAME="localhost")
+        client.force_authenticate(user)
+        for name, path, params in endpoints:
+            results[f"{name}@{user.username}"] = measure_endpoint(client, path, params, iterations)
+    return results
+
+
+def compare(current, baseline, threshold):
+    """
+    Returns a list of (key, metric, baseline, current) for metrics that grew
+    by more than threshold (a fraction) over the baseline.
+    """
+    regressions = []
+    for key, metrics in current.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric, slack in COMPARED_METRICS.items():
+            before, after = previous.get(metric), metrics.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + threshold) + slack:
+                regressions.append((key, metric, before, after))
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as fh:
+        return json.load(fh)["results"]
+
+
+def save_results(path, results, meta):
+    with open(path, "w") as fh:
+        json.dump({"meta": meta, "results": results}, fh, indent=2, sort_keys=True)
@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Task
+from .serializers import TaskSerializer
+
+
+class BulkRequestError(ValueError):
+    pass
+
+
+def max_bulk_items():
+    return getattr(settings, "TASK_BULK_MAX_ITEMS", 500)
+
+
+def db_batch_size():
+    return getattr(settings, "TASK_BULK_DB_BATCH_SIZE", 100)
+
+
+def _check_items(items, key=None):
+    if key and isinstance(items, dict):
+        items = items.get(key)
+    if not isinstance(items, list) or not items:
+        raise BulkRequestError("Expected a non-empty list.")
+    if len(items) > max_bulk_items():
+        raise BulkRequestError(f"At most {max_bulk_items()} items per request.")
+    return items
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _id_error(index, value):
+    if not _is_id(value):
+        return {"index": index, "id": value, "errors": {"id": ["A valid integer is required."]}}
+    return {"index": index, "id": value, "errors": {"id": ["Not found."]}}
+
+
+def bulk_create_tasks(user, items, context):
+    """
+    Validates every item with TaskSerializer and, if all pass, inserts them
+    with bulk_create in one transaction. Returns (tasks, errors); nothing is
+    written when errors is non-empty.
+    """
+    items = _check_items(items, "tasks")
+    tasks, errors = [], []
+    for index, item in enumerate(items):
+        serializer = TaskSerializer(data=item, context=context)
+        if serializer.is_valid():
+            tasks.append(Task(user=user, **serializer.validated_data))
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+    if errors:
+        return [], errors
+
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks, batch_size=db_batch_size())
+    return tasks, []
+
+
+def bulk_update_tasks(user, items, context):
+    """
+    Applies partial updates ({"id": ..., <fields>}) to the user's tasks with
+    bulk_update in one transaction. Returns (tasks, errors).
+    """
+    items = _check_items(items, "tasks")
+    ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+    existing = Task.objects.filter(user=user).in_bulk([i for i in ids if _is_id(i)])
+
+    tasks, errors, fields = [], [], set()
+    for index, (item, task_id) in enumerate(zip(items, ids)):
+        task = existing.get(task_id) if _is_id(task_id) else None
+        if task is None:
+            errors.append(_id_error(index, task_id))
+            continue
+        serializer = TaskSerializer(task, data=item, partial=True, context=context)
+        if not serializer.is_valid():
+            errors.append({"index": index, "id": task.id, "errors": serializer.errors})
+            continue
+        for attr, value in serializer.validated_data.items():
+            setattr(task, attr, value)
+            fields.add(attr)
+        tasks.append(task)
+    if errors:
+        return [], errors
+
+    # bulk_update() skips auto_now, so stamp updated_at explicitly.
+    now = timezone.now()
+    for task in tasks:
+        task.updated_at = now
+    fields.add("updated_at")
+    with transaction.atomic():
+        Task.objects.bulk_update(tasks, sorted(fields), batch_size=db_batch_size())
+    return tasks, []
+
+
+def bulk_delete_tasks(user, ids):
+    """
+    Deletes the user's tasks with the given ids in batches inside one
+    transaction. Returns (deleted_count, errors).
+    """
+    ids = _check_items(ids, "ids")
+    found = set(Task.objects.filter(user=user, id__in=[i for i in ids if _is_id(i)]).values_list("id", flat=True))
+    errors = [_id_error(index, i) for index, i in enumerate(ids) if not _is_id(i) or i not in found]
+    if errors:
+        return 0, errors
+
+    ids = sorted(found)
+    deleted = 0
+    with transaction.atomic():
+        for start in range(0, len(ids), db_batch_size()):
+            _, per_model = Task.objects.filter(user=user, id__in=ids[start:start + db_batch_size()]).delete()
+            deleted += per_model.get(Task._meta.label, 0)
+    return deleted, []
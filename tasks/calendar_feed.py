@@ -0,0 +1,160 @@
+import heapq
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Task, Event
+from .recurrence import occurrences
+
+
+class CalendarWindowError(ValueError):
+    pass
+
+
+def parse_window_bound(value, name):
+    """
+    Parses an ISO date or datetime query parameter into an aware datetime.
+    A bare date means midnight at the start of that day.
+    """
+    if not value:
+        raise CalendarWindowError(f"'{name}' is required.")
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CalendarWindowError(f"'{name}' must be an ISO 8601 date or datetime.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_window(params, required=True):
+    """
+    Returns (start, end) from request query params, or (None, None) when the
+    window is optional and absent.
+    """
+    raw_start, raw_end = params.get("start"), params.get("end")
+    if not required and not raw_start and not raw_end:
+        return None, None
+    start = parse_window_bound(raw_start, "start")
+    end = parse_window_bound(raw_end, "end")
+    if end <= start:
+        raise CalendarWindowError("'end' must be after 'start'.")
+    max_days = getattr(settings, "CALENDAR_MAX_WINDOW_DAYS", 366)
+    if end - start > timedelta(days=max_days):
+        raise CalendarWindowError(f"The window may span at most {max_days} days.")
+    return start, end
+
+
+def long_event_span():
+    """
+    Events that start more than this before a window are looked up through
+    series_end rather than the (user, start) range scan.
+    """
+    return timedelta(days=getattr(settings, "CALENDAR_LONG_EVENT_DAYS", 7))
+
+
+def tasks_in_window(user, start=None, end=None):
+    tasks = Task.objects.filter(user=user, due_date__isnull=False)
+    if start is None:
+        # No window: every dated task, newest first as before windows existed.
+        return tasks
+    # Range scan on the (user, due_date) index.
+    return tasks.filter(due_date__gte=start, due_date__lt=end).order_by("due_date", "id")
+
+
+def events_in_window(user, start, end):
+    """
+    Returns the user's events with an occurrence that may overlap [start, end).
+    Each branch is a bounded index range scan, so past events are never walked:
+      * events starting in [start - long_event_span(), end), on (user, start);
+      * earlier events and finite series still running at start, on
+        (user, series_end);
+      * earlier open-ended series, on the partial event_open_series_idx.
+    """
+    recent_start = start - long_event_span()
+    events = Event.objects.filter(user=user).order_by()
+    recent = events.filter(start__gte=recent_start, start__lt=end).filter(
+        Q(series_end__isnull=True) | Q(series_end__gt=start) | Q(start__gte=start)
+    )
+    running = events.filter(series_end__gt=start, start__lt=recent_start)
+    open_ended = events.filter(series_end__isnull=True, start__lt=recent_start)
+    ids = recent.values("pk").union(running.values("pk"), open_ended.values("pk"))
+    return Event.objects.filter(pk__in=ids).order_by("start", "id")
+
+
+def event_occurrences(events, start, end):
+    """
+    Expands events into (occurrence_start, occurrence_end, event) triples
+    inside [start, end), ordered by occurrence start. Non-recurring events
+    pass through as their single occurrence.
+    """
+    expanded = [
+        (occurrence_start, occurrence_end, event)
+        for event in events
+        for occurrence_start, occurrence_end in occurrences(event, start, end)
+    ]
+    expanded.sort(key=lambda item: (item[0], item[2].id))
+    return expanded
+
+
+def serialize_occurrences(events, start, end, serializer_class):
+    """
+    Serializes each event once with serializer_class and emits one copy per
+    occurrence in [start, end) with that occurrence's start and end.
+    """
+    rendered = {}
+    datetime_field = serializer_class().fields["start"]
+    data = []
+    for occurrence_start, occurrence_end, event in event_occurrences(events, start, end):
+        if event.id not in rendered:
+            rendered[event.id] = serializer_class(event).data
+        data.append({
+            **rendered[event.id],
+            "start": datetime_field.to_representation(occurrence_start),
+            "end": datetime_field.to_representation(occurrence_end),
+        })
+    return data
+
+
+def task_entry(task):
+    return {
+        "id": task.id,
+        "title": task.title,
+        "start": task.due_date.isoformat(),
+        "end": task.due_date.isoformat(),
+        "completed": task.completed,
+        "priority": task.get_priority_display(),
+        "status": task.get_status_display(),
+    }
+
+
+def event_entry(event, start=None, end=None):
+    return {
+        "id": event.id,
+        "title": event.title,
+        "description": event.description,
+        "start": (start or event.start).isoformat(),
+        "end": (end or event.end).isoformat(),
+        "all_day": event.all_day,
+        "recurring": event.is_recurring,
+    }
+
+
+def calendar_window_payload(user, start, end):
+    """
+    Returns the user's tasks and events inside [start, end) merged into a
+    single list ordered by start time.
+    """
+    tasks = ((t.due_date, {"type": "task", **task_entry(t)}) for t in tasks_in_window(user, start, end))
+    events = (
+        (occurrence_start, {"type": "event", **event_entry(e, occurrence_start, occurrence_end)})
+        for occurrence_start, occurrence_end, e in event_occurrences(events_in_window(user, start, end), start, end)
+    )
+    return [entry for _, entry in heapq.merge(tasks, events, key=lambda item: item[0])]
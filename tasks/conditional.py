@@ -0,0 +1,93 @@
+import hashlib
+import time
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .models import UserDataVersion
+from .response_cache import acached_response, cached_response
+
+# Responses that depend on the current time (is_overdue, "upcoming") also
+# change when the clock moves, so their validators roll over this often.
+TIME_SENSITIVE_TTL = 60
+
+
+def user_validators(request, user, ttl=None):
+    """
+    Returns (etag, last_modified_timestamp) for this request, derived from the
+    user's data version, the URL and, for time-sensitive views, the clock.
+    last_modified is None while it is still the current second: HTTP dates
+    have one-second resolution, so a later write in the same second would
+    carry the same date and If-Modified-Since would wrongly match.
+    """
+    return version_validators(request, user, UserDataVersion.for_user(user), ttl)
+
+
+def version_validators(request, user, version, ttl=None):
+    last_modified = int(version.modified_at.timestamp())
+    # modified_at keeps validators unique if a user id is ever reused.
+    parts = [
+        str(user.pk), str(version.version), version.modified_at.isoformat(),
+        request.path, request.META.get("QUERY_STRING", ""),
+    ]
+    if ttl:
+        bucket = int(time.time() // ttl)
+        parts.append(str(bucket))
+        last_modified = max(last_modified, bucket * ttl)
+    etag = '"%s"' % hashlib.sha1("|".join(parts).encode()).hexdigest()
+    if last_modified >= int(time.time()):
+        last_modified = None
+    return etag, last_modified
+
+
+def conditional_user_response(request, user, build_response, ttl=None, cache=False):
+    """
+    Answers If-None-Match / If-Modified-Since with 304 when the user's data
+    has not changed; otherwise calls build_response() and stamps validators.
+    With cache=True the payload is served from the response cache while the
+    validators match.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return build_response()
+
+    etag, last_modified = user_validators(request, user, ttl)
+    not_modified = _not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    if cache:
+        return _stamp(cached_response(etag, build_response, ttl), etag, last_modified)
+    return _stamp(build_response(), etag, last_modified)
+
+
+async def aconditional_user_response(request, user, build_response, ttl=None, cache=False):
+    """
+    Async conditional_user_response: build_response is a coroutine function
+    and the data version is read through the async ORM.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return await build_response()
+
+    version = await UserDataVersion.afor_user(user)
+    etag, last_modified = version_validators(request, user, version, ttl)
+    not_modified = _not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    if cache:
+        return _stamp(await acached_response(etag, build_response, ttl), etag, last_modified)
+    return _stamp(await build_response(), etag, last_modified)
+
+
+def _not_modified(request, etag, last_modified):
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        response.headers["ETag"] = etag
+    return response
+
+
+def _stamp(response, etag, last_modified):
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Authorization"])
+    return response
@@ -0,0 +1,228 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the primary ("default"). Reads go to a healthy replica
+from DATABASE_REPLICAS only while serving a safe (GET/HEAD/OPTIONS) request
+outside a transaction; everything else, including management commands and
+job workers, reads from the primary. A request reads from a single replica,
+chosen on its first read, so the data version it checks and the payload it
+builds (and may cache) come from the same point in replication. After a user writes, their reads stay
+on the primary for REPLICA_STICKY_SECONDS so they see their own changes
+despite replication lag.
+
+Replicas are health-checked at most every REPLICA_HEALTH_INTERVAL seconds
+(a SELECT 1, plus replay lag on PostgreSQL when REPLICA_MAX_LAG_SECONDS is
+set); a failing replica is skipped until a later check passes.
+"""
+import random
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject, empty
+
+from .lru import LRUCache
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_current_request = ContextVar("routing_request", default=None)
+_health = {}
+_health_lock = threading.Lock()
+_sticky = None
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def sticky_seconds():
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+
+
+def sticky_cache_alias():
+    return getattr(settings, "REPLICA_STICKY_CACHE", None)
+
+
+def health_interval():
+    return getattr(settings, "REPLICA_HEALTH_INTERVAL", 10)
+
+
+def max_replica_lag():
+    return getattr(settings, "REPLICA_MAX_LAG_SECONDS", None)
+
+
+# --- Read-your-writes ---
+
+def _sticky_store():
+    global _sticky
+    if _sticky is None:
+        _sticky = LRUCache(maxsize=10000, ttl=sticky_seconds())
+    return _sticky
+
+
+def pin_to_primary(user_id):
+    """
+    Routes this user's reads to the primary for REPLICA_STICKY_SECONDS.
+    """
+    alias = sticky_cache_alias()
+    if alias:
+        caches[alias].set(f"replica-pin:{user_id}", True, timeout=sticky_seconds())
+    else:
+        _sticky_store().set(user_id, True)
+
+
+def is_pinned(user_id):
+    alias = sticky_cache_alias()
+    if alias:
+        return bool(caches[alias].get(f"replica-pin:{user_id}"))
+    return bool(_sticky_store().get(user_id))
+
+
+def reset_routing_state():
+    """
+    Forgets pins and health results (used by tests).
+    """
+    global _sticky
+    _sticky = None
+    with _health_lock:
+        _health.clear()
+
+
+# --- Health checks ---
+
+def check_replica(alias):
+    """
+    Returns True if the replica answers and is within REPLICA_MAX_LAG_SECONDS.
+    """
+    try:
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            lag_limit = max_replica_lag()
+            if lag_limit is not None and connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT CASE WHEN pg_is_in_recovery() "
+                    "THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                )
+                lag = cursor.fetchone()[0]
+                if lag is not None and lag > lag_limit:
+                    return False
+        return True
+    except Exception:
+        return False
+
+
+def mark_replica(alias, healthy, now=None):
+    with _health_lock:
+        _health[alias] = (healthy, time.monotonic() if now is None else now)
+
+
+def replica_is_healthy(alias):
+    with _health_lock:
+        healthy, checked_at = _health.get(alias, (None, None))
+    if checked_at is None or time.monotonic() - checked_at >= health_interval():
+        healthy = check_replica(alias)
+        mark_replica(alias, healthy)
+    return healthy
+
+
+def healthy_replicas():
+    return [alias for alias in replica_aliases() if replica_is_healthy(alias)]
+
+
+# --- Routing ---
+
+def _resolved_user(request):
+    # DRF copies the authenticated user onto the Django request. The lazy
+    # session user is left alone: resolving it would itself hit the router.
+    user = getattr(request, "user", None)
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return None
+    return user if user.is_authenticated else None
+
+
+def _reads_may_use_replica():
+    request = _current_request.get()
+    if request is None or request.method not in SAFE_METHODS:
+        return False
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return False
+    user = _resolved_user(request)
+    return user is None or not is_pinned(user.pk)
+
+
+def _request_replica(request):
+    alias = getattr(request, "_read_replica", None)
+    if alias is None:
+        replicas = healthy_replicas()
+        alias = request._read_replica = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+    return alias
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not replica_aliases() or not _reads_may_use_replica():
+            return DEFAULT_DB_ALIAS
+        return _request_replica(_current_request.get())
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication.
+        return db not in replica_aliases()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Exposes the current request to the router and pins the user to the
+    primary after any request that may have written. The request is held in
+    a ContextVar, which sync_to_async carries into its worker threads, so
+    async views route their queries the same way.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        user = self.writer(request)
+        if user is not None:
+            pin_to_primary(user.pk)
+        return response
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        user = self.writer(request)
+        if user is not None:
+            # A shared pin store (REPLICA_STICKY_CACHE) may do blocking I/O.
+            await sync_to_async(pin_to_primary)(user.pk)
+        return response
+
+    @staticmethod
+    def writer(request):
+        if request.method in SAFE_METHODS or not replica_aliases():
+            return None
+        return _resolved_user(request)
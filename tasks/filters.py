@@ -0,0 +1,69 @@
+import django_filters
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedTask, Task, Event
+
+# Orderings a cursor can walk; each is backed by a (user, <field>) index.
+TASK_ORDERING_FIELDS = ('created_at', 'updated_at', 'due_date')
+EVENT_ORDERING_FIELDS = ('start', 'updated_at')
+
+
+def archived_requested(params):
+    """
+    True for ?archived=true (or 1/yes): read tasks from the archive table.
+    """
+    return params.get('archived', '').lower() in ('1', 'true', 'yes')
+
+
+def _overdue_condition(now=None):
+    return Q(completed=False, due_date__lt=now or timezone.now())
+
+
+class TaskFilter(django_filters.FilterSet):
+    """
+    Query parameters for the task list. Open-task and status/due-date
+    filters are served by the partial and composite indexes on Task.
+    """
+    status = django_filters.MultipleChoiceFilter(choices=Task.STATUS_CHOICES, distinct=False)
+    priority = django_filters.MultipleChoiceFilter(choices=Task.PRIORITY_CHOICES, distinct=False)
+    completed = django_filters.BooleanFilter()
+    overdue = django_filters.BooleanFilter(method='filter_overdue')
+    has_due_date = django_filters.BooleanFilter(field_name='due_date', lookup_expr='isnull', exclude=True)
+    due_after = django_filters.IsoDateTimeFilter(field_name='due_date', lookup_expr='gte')
+    due_before = django_filters.IsoDateTimeFilter(field_name='due_date', lookup_expr='lt')
+    created_after = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+    ordering = django_filters.OrderingFilter(fields=TASK_ORDERING_FIELDS)
+
+    class Meta:
+        model = Task
+        fields = []
+
+    def filter_overdue(self, queryset, name, value):
+        if value:
+            return queryset.filter(_overdue_condition())
+        return queryset.exclude(_overdue_condition())
+
+
+class ArchivedTaskFilter(TaskFilter):
+    # The task list's filters over the archive (?archived=true).
+    class Meta(TaskFilter.Meta):
+        model = ArchivedTask
+
+
+class EventFilter(django_filters.FilterSet):
+    all_day = django_filters.BooleanFilter()
+    recurring = django_filters.BooleanFilter(method='filter_recurring')
+    start_after = django_filters.IsoDateTimeFilter(field_name='start', lookup_expr='gte')
+    start_before = django_filters.IsoDateTimeFilter(field_name='start', lookup_expr='lt')
+    ordering = django_filters.OrderingFilter(fields=EVENT_ORDERING_FIELDS)
+
+    class Meta:
+        model = Event
+        fields = []
+
+    def filter_recurring(self, queryset, name, value):
+        if value:
+            return queryset.exclude(recurrence_freq='')
+        return queryset.filter(recurrence_freq='')
@@ -0,0 +1,373 @@
+"""
+Minimal, streaming iCalendar (RFC 5545) reader for VEVENT and VTODO
+components. Lines are unfolded and parsed one at a time, so arbitrarily
+large files are read in constant memory.
+"""
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+import re
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+SUPPORTED_COMPONENTS = {"VEVENT", "VTODO"}
+SUPPORTED_FREQUENCIES = {"DAILY", "WEEKLY", "MONTHLY", "YEARLY"}
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+_DURATION_RE = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+class ICalendarError(ValueError):
+    pass
+
+
+def unfold(lines):
+    """
+    Yields (line_number, logical_line) with RFC 5545 folding undone.
+    """
+    current, start = None, 0
+    for number, raw in enumerate(lines, start=1):
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current:
+        yield start, current
+
+
+def parse_line(line):
+    """
+    Splits 'NAME;PARAM=x:VALUE' into (NAME, {PARAM: x}, VALUE).
+    """
+    # The first ':' outside a quoted parameter value ends the name part.
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            head, value = line[:index], line[index + 1:]
+            break
+    else:
+        raise ICalendarError(f"Malformed content line: {line[:40]!r}")
+    name, *raw_params = head.split(";")
+    params = {}
+    for raw in raw_params:
+        key, _, val = raw.partition("=")
+        params[key.upper()] = val.strip('"')
+    return name.upper(), params, value
+
+
+def unescape_text(value):
+    out, chars = [], iter(value)
+    for char in chars:
+        if char == "\\":
+            nxt = next(chars, "")
+            out.append("\n" if nxt in ("n", "N") else nxt)
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def parse_datetime_value(value, params):
+    """
+    Returns (datetime, is_date) for a DATE or DATE-TIME property value.
+    Floating times are interpreted in the current Django timezone.
+    """
+    value = value.strip()
+    try:
+        if params.get("VALUE") == "DATE" or len(value) == 8:
+            day = datetime.strptime(value, "%Y%m%d").date()
+            return timezone.make_aware(datetime.combine(day, time.min)), True
+        if value.endswith("Z"):
+            return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=dt_timezone.utc), False
+        naive = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    except ValueError:
+        raise ICalendarError(f"Invalid date value {value!r}.")
+    tzid = params.get("TZID")
+    if tzid:
+        try:
+            return naive.replace(tzinfo=ZoneInfo(tzid)), False
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return timezone.make_aware(naive), False
+
+
+def parse_duration(value):
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        raise ICalendarError(f"Invalid duration {value!r}.")
+    parts = {k: int(v) for k, v in match.groupdict().items() if v and k != "sign"}
+    delta = timedelta(**parts)
+    return -delta if match.group("sign") == "-" else delta
+
+
+def iter_components(lines):
+    """
+    Yields (line_number, component_name, {NAME: (value, params)}) for every
+    VEVENT/VTODO. Repeated properties keep their first occurrence, except
+    EXDATE which is collected into a list.
+    """
+    stack, props, start_line = [], None, 0
+    for number, line in unfold(lines):
+        if not line.strip():
+            continue
+        try:
+            name, params, value = parse_line(line)
+        except ICalendarError:
+            # Tolerate junk lines the way calendar clients do.
+            continue
+        if name == "BEGIN":
+            stack.append(value.upper())
+            if value.upper() in SUPPORTED_COMPONENTS:
+                props, start_line = {}, number
+            continue
+        if name == "END":
+            component = stack.pop() if stack else None
+            if component in SUPPORTED_COMPONENTS and props is not None:
+                yield start_line, component, props
+                props = None
+            continue
+        if props is not None and stack and stack[-1] in SUPPORTED_COMPONENTS:
+            if name == "EXDATE":
+                props.setdefault(name, []).append((value, params))
+            else:
+                props.setdefault(name, (value, params))
+
+
+def _text(props, name):
+    value = props.get(name)
+    return unescape_text(value[0]) if value else ""
+
+
+def _priority(value):
+    # RFC 5545: 1-4 high, 5 medium, 6-9 low, 0/absent undefined.
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        return None
+    if 1 <= level <= 4:
+        return "H"
+    if level == 5:
+        return "M"
+    if 6 <= level <= 9:
+        return "L"
+    return None
+
+
+def vtodo_to_task(props):
+    """
+    Maps VTODO properties onto TaskSerializer input.
+    """
+    data = {"title": _text(props, "SUMMARY"), "description": _text(props, "DESCRIPTION")}
+    if "DUE" in props:
+        data["due_date"] = parse_datetime_value(*props["DUE"])[0].isoformat()
+    priority = _priority(props.get("PRIORITY", (None,))[0])
+    if priority:
+        data["priority"] = priority
+    ical_status = props.get("STATUS", ("",))[0].upper()
+    if ical_status == "COMPLETED":
+        data["completed"] = True
+        data["status"] = "completed"
+    elif ical_status == "IN-PROCESS":
+        data["status"] = "in_progress"
+    return data
+
+
+def parse_rrule(value, start):
+    """
+    Maps an RRULE onto Event recurrence fields. BY* parts are accepted only
+    when they restate what DTSTART already implies (e.g. BYDAY=TU for a
+    weekly rule starting on a Tuesday); anything richer is rejected rather
+    than silently expanded wrong.
+    """
+    parts = {}
+    for item in value.split(";"):
+        key, _, val = item.partition("=")
+        if key:
+            parts[key.strip().upper()] = val.strip().upper()
+    freq = parts.pop("FREQ", "")
+    if freq not in SUPPORTED_FREQUENCIES:
+        raise ICalendarError(f"Unsupported RRULE frequency {freq!r}.")
+    local_start = timezone.localtime(start)
+    implied = {
+        "BYDAY": WEEKDAYS[local_start.weekday()],
+        "BYMONTHDAY": str(local_start.day),
+        "BYMONTH": str(local_start.month),
+    }
+    data = {"recurrence_freq": freq}
+    try:
+        if "INTERVAL" in parts:
+            data["recurrence_interval"] = int(parts.pop("INTERVAL"))
+        if "COUNT" in parts:
+            data["recurrence_count"] = int(parts.pop("COUNT"))
+    except ValueError:
+        raise ICalendarError(f"Invalid RRULE {value!r}.")
+    if "UNTIL" in parts:
+        data["recurrence_until"] = parse_datetime_value(parts.pop("UNTIL"), {})[0].isoformat()
+    parts.pop("WKST", None)
+    for key, val in parts.items():
+        if implied.get(key) != val:
+            raise ICalendarError(f"Unsupported RRULE part {key}={val}.")
+    return data
+
+
+def vevent_to_event(props):
+    """
+    Maps VEVENT properties onto EventSerializer input.
+    """
+    if "DTSTART" not in props:
+        raise ICalendarError("VEVENT without DTSTART.")
+    start, all_day = parse_datetime_value(*props["DTSTART"])
+    if "DTEND" in props:
+        end = parse_datetime_value(*props["DTEND"])[0]
+    elif "DURATION" in props:
+        end = start + parse_duration(props["DURATION"][0])
+    else:
+        end = start + timedelta(days=1) if all_day else start
+    data = {
+        "title": _text(props, "SUMMARY"),
+        "description": _text(props, "DESCRIPTION"),
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "all_day": all_day,
+    }
+    if "RRULE" in props:
+        data.update(parse_rrule(props["RRULE"][0], start))
+        data["recurrence_exdates"] = [
+            parse_datetime_value(item, params)[0].isoformat()
+            for value, params in props.get("EXDATE", [])
+            for item in value.split(",") if item.strip()
+        ]
+    return data
+
+
+
+# --- Writing ---
+
+def escape_text(value):
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """
+    Folds a content line at 75 octets as RFC 5545 requires.
+    """
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, limit = [], 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split inside a multi-byte UTF-8 sequence.
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_datetime_value(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def format_date_value(value):
+    return timezone.localtime(value).strftime("%Y%m%d")
+
+
+def _task_priority(priority):
+    return {"H": 1, "M": 5, "L": 9}.get(priority)
+
+
+def task_vevent(task, domain):
+    """
+    Content lines for a task with a due date, as a zero-length VEVENT so it
+    shows up in calendar apps that ignore VTODO.
+    """
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:task-{task.id}@{domain}",
+        f"DTSTAMP:{format_datetime_value(task.updated_at)}",
+        f"DTSTART:{format_datetime_value(task.due_date)}",
+        f"DTEND:{format_datetime_value(task.due_date)}",
+        f"SUMMARY:{escape_text(task.title)}",
+        "CATEGORIES:Task",
+    ]
+    if task.description:
+        lines.append(f"DESCRIPTION:{escape_text(task.description)}")
+    priority = _task_priority(task.priority)
+    if priority:
+        lines.append(f"PRIORITY:{priority}")
+    if task.status == "completed":
+        lines.append("STATUS:CONFIRMED")
+        lines.append("TRANSP:TRANSPARENT")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def recurrence_lines(event):
+    rule = f"FREQ={event.recurrence_freq}"
+    if event.recurrence_interval and event.recurrence_interval > 1:
+        rule += f";INTERVAL={event.recurrence_interval}"
+    if event.recurrence_count:
+        rule += f";COUNT={event.recurrence_count}"
+    elif event.recurrence_until:
+        rule += f";UNTIL={format_datetime_value(event.recurrence_until)}"
+    lines = [f"RRULE:{rule}"]
+    exdates = [parse_datetime(value) for value in event.recurrence_exdates or []]
+    for exdate in filter(None, exdates):
+        if event.all_day:
+            lines.append(f"EXDATE;VALUE=DATE:{format_date_value(exdate)}")
+        else:
+            lines.append(f"EXDATE:{format_datetime_value(exdate)}")
+    return lines
+
+
+def event_vevent(event, domain):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{event.id}@{domain}",
+        f"DTSTAMP:{format_datetime_value(event.updated_at)}",
+    ]
+    if event.all_day:
+        lines.append(f"DTSTART;VALUE=DATE:{format_date_value(event.start)}")
+        lines.append(f"DTEND;VALUE=DATE:{format_date_value(event.end)}")
+    else:
+        lines.append(f"DTSTART:{format_datetime_value(event.start)}")
+        lines.append(f"DTEND:{format_datetime_value(event.end)}")
+    if event.recurrence_freq:
+        lines.extend(recurrence_lines(event))
+    lines.append(f"SUMMARY:{escape_text(event.title)}")
+    if event.description:
+        lines.append(f"DESCRIPTION:{escape_text(event.description)}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def render_calendar(tasks, events, name, domain="smarttasker"):
+    """
+    Renders tasks (with due dates) and events as one VCALENDAR document.
+    """
+    out = [fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//SmartTasker//Calendar Feed//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    )]
+    for task in tasks:
+        out.extend(fold(line) for line in task_vevent(task, domain))
+    for event in events:
+        out.extend(fold(line) for line in event_vevent(event, domain))
+    out.append(fold("END:VCALENDAR"))
+    return "".join(out)
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from .ical import render_calendar
+from .models import Task, Event, UserDataVersion
+
+
+def feed_cache():
+    return caches[getattr(settings, "ICS_FEED_CACHE_ALIAS", "default")]
+
+
+def feed_cache_timeout():
+    return getattr(settings, "ICS_FEED_CACHE_TTL", 60 * 60 * 24)
+
+
+def render_user_feed(user):
+    tasks = Task.objects.filter(user=user, due_date__isnull=False).order_by("due_date", "id")
+    events = Event.objects.filter(user=user).order_by("start", "id")
+    return render_calendar(
+        tasks.iterator(chunk_size=2000),
+        events.iterator(chunk_size=2000),
+        name=f"SmartTasker - {user.get_username()}",
+    )
+
+
+def user_feed(user):
+    """
+    Returns the rendered .ics document for a user. It is cached under the
+    user's data version, so any Task/Event write makes the next request
+    render afresh while unchanged feeds are served straight from the cache.
+    """
+    version = UserDataVersion.for_user(user).version
+    key = f"ics-feed:{user.pk}:{version}"
+    cache = feed_cache()
+    body = cache.get(key)
+    if body is None:
+        body = render_user_feed(user)
+        cache.set(key, body, feed_cache_timeout())
+    return body
@@ -0,0 +1,240 @@
+"""
+Lightweight database-backed job queue.
+
+Handlers are registered by name with @register_job and enqueued with
+enqueue(). Workers (`manage.py run_jobs`) claim due jobs in batches, run
+them and retry failures with exponential backoff. A claimed job is hidden
+from other workers until its visibility timeout passes, so a job whose
+worker died is picked up again; handlers must therefore be idempotent.
+"""
+import os
+import random
+import socket
+import time
+import traceback
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import send_mail
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .models import Job, ReminderLog, Task, TaskCounter
+from .sharding import group_by_shard
+
+_handlers = {}
+
+
+class UnknownJobError(ValueError):
+    pass
+
+
+def visibility_timeout():
+    return getattr(settings, "JOB_VISIBILITY_TIMEOUT", 300)
+
+
+def retry_backoff():
+    return getattr(settings, "JOB_RETRY_BACKOFF", 30)
+
+
+def max_retry_delay():
+    return getattr(settings, "JOB_MAX_RETRY_DELAY", 60 * 60)
+
+
+def default_max_attempts():
+    return getattr(settings, "JOB_MAX_ATTEMPTS", 5)
+
+
+def retention_days():
+    return getattr(settings, "JOB_RETENTION_DAYS", 7)
+
+
+def register_job(name):
+    """
+    Registers the decorated function as the handler for jobs called name.
+    It is called with the job's payload as keyword arguments.
+    """
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, delay=None, max_attempts=None):
+    if name not in _handlers:
+        raise UnknownJobError(f"No job handler registered for {name!r}.")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        run_after=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or default_max_attempts(),
+    )
+
+
+def enqueue_many(name, payloads, max_attempts=None):
+    """
+    Enqueues one job per payload with a single bulk insert.
+    """
+    if name not in _handlers:
+        raise UnknownJobError(f"No job handler registered for {name!r}.")
+    now = timezone.now()
+    return Job.objects.bulk_create(
+        [Job(name=name, payload=payload, run_after=now, max_attempts=max_attempts or default_max_attempts())
+         for payload in payloads],
+        batch_size=500,
+    )
+
+
+def backoff_delay(attempts):
+    """
+    Exponential backoff after the given number of failed attempts, capped
+    and with up to 25% jitter so failing jobs do not retry in lockstep.
+    """
+    delay = min(retry_backoff() * 2 ** max(0, attempts - 1), max_retry_delay())
+    return timedelta(seconds=delay * (1 + random.random() / 4))
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_jobs(worker_id, limit=10, now=None):
+    """
+    Marks up to `limit` due jobs as running for this worker and returns them.
+    Uses SKIP LOCKED where the database supports it; elsewhere the claiming
+    UPDATE re-checks claimability so two workers never win the same job.
+    """
+    now = now or timezone.now()
+    claim = f"{worker_id}:{uuid.uuid4().hex[:8]}"
+    using = router.db_for_write(Job)
+    with transaction.atomic(using=using):
+        candidates = Job.objects.using(using).filter(Job.claimable(now)).order_by("run_after", "id")
+        if connections[using].features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list("pk", flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.using(using).filter(Job.claimable(now), pk__in=ids).update(
+            status=Job.RUNNING,
+            locked_by=claim,
+            locked_until=now + timedelta(seconds=visibility_timeout()),
+            attempts=F("attempts") + 1,
+        )
+    return list(Job.objects.using(using).filter(locked_by=claim, status=Job.RUNNING).order_by("run_after", "id"))
+
+
+def run_job(job):
+    """
+    Runs one claimed job and records the outcome. Updates are conditional on
+    the claim, so a worker that overran its visibility timeout cannot clobber
+    the state written by whoever re-claimed the job.
+    """
+    mine = Job.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    handler = _handlers.get(job.name)
+    try:
+        if handler is None:
+            raise UnknownJobError(f"No job handler registered for {job.name!r}.")
+        handler(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts or handler is None:
+            mine.update(status=Job.FAILED, last_error=error, locked_until=None, finished_at=timezone.now())
+            return Job.FAILED
+        mine.update(
+            status=Job.QUEUED,
+            last_error=error,
+            locked_until=None,
+            run_after=timezone.now() + backoff_delay(job.attempts),
+        )
+        return Job.QUEUED
+    mine.update(status=Job.DONE, last_error="", locked_until=None, finished_at=timezone.now())
+    return Job.DONE
+
+
+def work(worker_id=None, batch_size=10, once=False, idle_sleep=1.0, stop=None):
+    """
+    Claims and runs jobs until `once` and the queue is drained, or until
+    stop() returns True. Returns {status: count} for the jobs it ran.
+    """
+    worker_id = worker_id or default_worker_id()
+    outcomes = {}
+    while not (stop and stop()):
+        jobs = claim_jobs(worker_id, limit=batch_size)
+        for job in jobs:
+            outcome = run_job(job)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        if not jobs:
+            if once:
+                break
+            time.sleep(idle_sleep)
+    return outcomes
+
+
+def prune_jobs(now=None):
+    """
+    Deletes finished jobs older than JOB_RETENTION_DAYS.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days())
+    deleted, _ = Job.objects.filter(status__in=[Job.DONE, Job.FAILED], finished_at__lt=cutoff).delete()
+    return deleted
+
+
+# --- Handlers ---
+
+@register_job("send_password_reset_email")
+def send_password_reset_email(user_id):
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is None or not user.email:
+        return
+    # The token is minted when the mail is sent, so it is never stored in
+    # the jobs table.
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = default_token_generator.make_token(user)
+    frontend_url = getattr(settings, "FRONTEND_URL", "http://localhost:3000")
+    reset_link = f"{frontend_url}/reset-password/{uid}/{token}/"
+
+    send_mail(
+        subject="SmartTasker Password Reset",
+        message=f"Click here to reset your password:\n{reset_link}",
+        from_email="noreply@smarttasker.com",
+        recipient_list=[user.email],
+        fail_silently=False,
+    )
+
+
+@register_job("rebuild_task_counters")
+def rebuild_task_counters(user_ids=None):
+    if user_ids is None:
+        user_ids = get_user_model().objects.values_list("pk", flat=True)
+    for alias, shard_user_ids in group_by_shard(user_ids).items():
+        TaskCounter.rebuild(shard_user_ids, using=alias)
+
+
+REMINDER_SUBJECTS = {
+    ReminderLog.DUE_SOON: "Task due soon: {title}",
+    ReminderLog.OVERDUE: "Task overdue: {title}",
+}
+
+
+@register_job("send_task_reminder")
+def send_task_reminder(task_id, kind, due_date, shard=DEFAULT_DB_ALIAS):
+    task = Task.objects.using(shard).filter(pk=task_id).first()
+    # Skip if the task was completed or rescheduled after the reminder was queued.
+    if task is None or task.completed or not task.due_date or task.due_date.isoformat() != due_date:
+        return
+    # Users live on the default database; a shard only holds a copy of the row.
+    user = get_user_model().objects.filter(pk=task.user_id).first()
+    if user is None or not user.email:
+        return
+    send_mail(
+        subject=REMINDER_SUBJECTS[kind].format(title=task.title),
+        message=f"\"{task.title}\" is due {timezone.localtime(task.due_date):%Y-%m-%d %H:%M %Z}.",
+        from_email="noreply@smarttasker.com",
+        recipient_list=[user.email],
+        fail_silently=False,
+    )
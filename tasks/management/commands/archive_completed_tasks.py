@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from tasks.archive import archive_after_days, archive_completed_tasks, archive_cutoff, count_archivable
+
+
+class Command(BaseCommand):
+    help = (
+        "Move tasks completed more than --days ago into the archive table, in batches. "
+        "Safe to interrupt: a later run picks up the remaining tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=None,
+            help=f"Archive tasks completed more than this many days ago (default {archive_after_days()}).",
+        )
+        parser.add_argument("--batch-size", type=int, default=None, help="Tasks moved per transaction.")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after archiving this many tasks.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the tasks that would be archived.")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["days"])
+        if options["dry_run"]:
+            count = count_archivable(cutoff)
+            self.stdout.write(f"{count} tasks completed before {cutoff:%Y-%m-%d %H:%M} would be archived.")
+            return
+
+        def progress(alias, moved):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{alias}: archived {moved} tasks")
+
+        archived = archive_completed_tasks(
+            cutoff, batch_size=options["batch_size"], limit=options["limit"], progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} tasks."))
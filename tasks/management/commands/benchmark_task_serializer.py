@@ -0,0 +1,78 @@
+import time
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tasks.models import Task
+from tasks.serializers import TaskRowSerializer, TaskSerializer
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-row cost of TaskSerializer and TaskRowSerializer on a "
+        "synthetic task list. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options["rows"], options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, row_count, repeat):
+        user = User.objects.create_user(username="__serializer_benchmark__", password=None)
+        now = timezone.now()
+        priorities = ["H", "M", "L", None]
+        Task.objects.bulk_create(
+            [
+                Task(
+                    user=user,
+                    title=f"Task {i}",
+                    description="benchmark row",
+                    priority=priorities[i % 4],
+                    due_date=now + timedelta(hours=i - row_count // 2) if i % 5 else None,
+                    completed=i % 3 == 0,
+                )
+                for i in range(row_count)
+            ],
+            batch_size=1000,
+        )
+        tasks = Task.objects.filter(user=user).select_related("user")
+        renderer = JSONRenderer()
+
+        def model_path():
+            return renderer.render(TaskSerializer(tasks.all(), many=True).data)
+
+        def row_path():
+            rows = tasks.values(*TaskRowSerializer.values_fields)
+            return renderer.render(TaskRowSerializer().serialize(rows))
+
+        results = {}
+        for name, fn in (("TaskSerializer", model_path), ("TaskRowSerializer", row_path)):
+            best = min(self._time(fn) for _ in range(repeat))
+            results[name] = best
+            self.stdout.write(
+                f"{name:<18} {best * 1000:9.1f} ms total  {best / row_count * 1e6:7.2f} us/row  ({row_count} rows)"
+            )
+        self.stdout.write(f"speedup: {results['TaskSerializer'] / results['TaskRowSerializer']:.1f}x")
+
+    @staticmethod
+    def _time(fn):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
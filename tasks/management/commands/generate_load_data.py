@@ -0,0 +1,124 @@
+import random
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.models import Task, Event
+from tasks.sharding import using_user_shard
+
+User = get_user_model()
+
+PRIORITY_WEIGHTS = [("H", 2), ("M", 5), ("L", 3), (None, 1)]
+STATUS_WEIGHTS = [("pending", 5), ("in_progress", 2), ("completed", 4)]
+WORDS = (
+    "review plan draft call email fix deploy write read sync design test update "
+    "prepare budget report meeting client invoice backlog sprint release notes"
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a reproducible synthetic dataset: users with Zipf-skewed task "
+        "and event counts, due dates spread over several years and mixed "
+        "priorities and statuses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--max-tasks", type=int, default=5000, help="Tasks for the heaviest user.")
+        parser.add_argument("--max-events", type=int, default=1000, help="Events for the heaviest user.")
+        parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for per-user counts.")
+        parser.add_argument("--years", type=float, default=3.0, help="Spread of due dates around today.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--prefix", default="loadgen_")
+        parser.add_argument("--clear", action="store_true", help="Delete previously generated users first.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if not prefix:
+            raise CommandError("--prefix must not be empty.")
+        if options["clear"]:
+            deleted, _ = User.objects.filter(username__startswith=prefix).delete()
+            self.stdout.write(f"Removed {deleted} rows from a previous run.")
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Users prefixed '{prefix}' already exist; pass --clear to replace them.")
+
+        rng = random.Random(options["seed"])
+        now = timezone.now().replace(microsecond=0)
+        spread = timedelta(days=365 * options["years"])
+        password = make_password("loadgen-password")
+        batch_size = options["batch_size"]
+
+        total_tasks = total_events = 0
+        for rank in range(1, options["users"] + 1):
+            weight = 1 / rank ** options["skew"]
+            task_count = max(1, int(options["max_tasks"] * weight))
+            event_count = max(1, int(options["max_events"] * weight))
+
+            user = User.objects.create(
+                username=f"{prefix}{rank:04d}", email=f"{prefix}{rank:04d}@example.com", password=password,
+            )
+            with using_user_shard(user.pk) as shard, transaction.atomic(using=shard):
+                tasks = (self._task(rng, user, now, spread) for _ in range(task_count))
+                self._insert(Task, tasks, batch_size)
+                events = (self._event(rng, user, now, spread) for _ in range(event_count))
+                self._insert(Event, events, batch_size)
+
+            total_tasks += task_count
+            total_events += event_count
+            self.stdout.write(f"{user.username}: {task_count} tasks, {event_count} events")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['users']} users, {total_tasks} tasks and {total_events} events (seed {options['seed']})."
+        ))
+
+    @staticmethod
+    def _insert(model, objs, batch_size):
+        batch = []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(batch, batch_size=batch_size)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+
+    @staticmethod
+    def _title(rng):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).capitalize()
+
+    def _task(self, rng, user, now, spread):
+        status = rng.choices(*zip(*STATUS_WEIGHTS))[0]
+        due_date = None
+        if rng.random() < 0.85:
+            due_date = now + timedelta(seconds=rng.uniform(-1, 1) * spread.total_seconds())
+        return Task(
+            user=user,
+            title=self._title(rng),
+            description=" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 40))),
+            due_date=due_date,
+            priority=rng.choices(*zip(*PRIORITY_WEIGHTS))[0],
+            status=status,
+            completed=status == "completed",
+        )
+
+    def _event(self, rng, user, now, spread):
+        start = now + timedelta(seconds=rng.uniform(-1, 1) * spread.total_seconds())
+        all_day = rng.random() < 0.2
+        if all_day:
+            start = start.replace(hour=0, minute=0, second=0)
+            duration = timedelta(days=rng.randint(1, 3))
+        else:
+            duration = timedelta(minutes=rng.choice([15, 30, 45, 60, 90, 120]))
+        return Event(
+            user=user,
+            title=self._title(rng),
+            description=" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 20))),
+            start=start,
+            end=start + duration,
+            all_day=all_day,
+        )
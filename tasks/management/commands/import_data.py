@@ -0,0 +1,39 @@
+import json
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import ImportFormatError, import_file
+from tasks.sharding import UserMoving, using_user_shard
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Import tasks/events for a user from a CSV or iCalendar (.ics) file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--user", required=True, help="Username to import into.")
+        parser.add_argument("--kind", choices=["tasks", "events"], help="Required for CSV files.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']!r}.")
+
+        started = time.perf_counter()
+        try:
+            with open(options["path"], "rb") as fh, using_user_shard(user.pk):
+                report = import_file(user, fh, options["path"], options["kind"])
+        except (OSError, ImportFormatError, UserMoving) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        result = report.as_dict()
+        processed = sum(result["created"].values()) + result["failed"]
+        self.stdout.write(json.dumps(result, indent=2, default=str))
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} rows in {elapsed:.2f}s ({processed / max(elapsed, 1e-9):,.0f} rows/s)."
+        ))
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import ShardAssignment
+from tasks.sharding import ShardMoveError, hash_shard, move_users, shard_aliases
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Move users' task data between shards: the given users to --to, or with --all every user "
+        "whose recorded shard differs from their hash placement over DATABASE_SHARDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users", help="User id to move (repeatable).")
+        parser.add_argument("--to", help="Target shard alias for --user.")
+        parser.add_argument("--all", action="store_true", help="Rebalance every misplaced user.")
+        parser.add_argument("--limit", type=int, help="Move at most this many users.")
+        parser.add_argument(
+            "--batch-size", type=int, default=100,
+            help="Users moved together; each batch waits out the shard map cache twice.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only print the planned moves.")
+
+    def handle(self, *args, **options):
+        if bool(options["users"]) == options["all"]:
+            raise CommandError("Pass either --user (with --to) or --all.")
+        if options["users"]:
+            if options["to"] not in shard_aliases():
+                raise CommandError(f"--to must be one of: {', '.join(shard_aliases())}.")
+            plan = [(user_id, options["to"]) for user_id in options["users"]]
+        else:
+            recorded = dict(ShardAssignment.objects.values_list("user_id", "shard"))
+            plan = [
+                (user_id, hash_shard(user_id))
+                for user_id in User.objects.order_by("pk").values_list("pk", flat=True)
+                if recorded.get(user_id, "default") != hash_shard(user_id)
+            ]
+        if options["limit"] is not None:
+            plan = plan[:options["limit"]]
+
+        if options["dry_run"]:
+            for user_id, target in plan:
+                self.stdout.write(f"user {user_id} -> {target}")
+            self.stdout.write(self.style.SUCCESS(f"{len(plan)} users would move."))
+            return
+
+        moved = failed = 0
+        size = max(1, options["batch_size"])
+        for offset in range(0, len(plan), size):
+            batch = plan[offset:offset + size]
+            results = move_users(batch)
+            for user_id, target in batch:
+                rows = results[user_id]
+                if isinstance(rows, ShardMoveError):
+                    failed += 1
+                    self.stderr.write(f"user {user_id}: {rows}")
+                    continue
+                moved += 1
+                self.stdout.write(f"user {user_id} -> {target}: {rows} rows copied")
+
+        if failed:
+            raise CommandError(f"Moved {moved} users; {failed} failed and can be retried.")
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} users."))
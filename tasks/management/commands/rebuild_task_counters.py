@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.jobs import enqueue
+from tasks.models import Task, TaskCounter
+from tasks.sharding import group_by_shard
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user TaskCounter rows from the Task table, or verify them with --verify."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users", help="Only this user id (repeatable).")
+        parser.add_argument("--verify", action="store_true", help="Compare stored counters with the table without writing.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--enqueue", action="store_true", help="Queue one job per batch for run_jobs workers instead.")
+
+    def handle(self, *args, **options):
+        user_ids = options["users"] or list(User.objects.order_by("pk").values_list("pk", flat=True))
+        batch_size = options["batch_size"]
+
+        if options["enqueue"]:
+            batches = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+            for batch in batches:
+                enqueue("rebuild_task_counters", {"user_ids": batch})
+            self.stdout.write(self.style.SUCCESS(f"Queued {len(batches)} counter rebuild jobs."))
+            return
+
+        if not options["verify"]:
+            written = 0
+            for alias, shard_user_ids in group_by_shard(user_ids).items():
+                for i in range(0, len(shard_user_ids), batch_size):
+                    written += TaskCounter.rebuild(shard_user_ids[i:i + batch_size], using=alias)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {written} users."))
+            return
+
+        mismatches = 0
+        for alias, shard_user_ids in group_by_shard(user_ids).items():
+            for i in range(0, len(shard_user_ids), batch_size):
+                batch = shard_user_ids[i:i + batch_size]
+                actual = TaskCounter.count_rows(Task.objects.using(alias).filter(user_id__in=batch))
+                stored = {c.pk: c.as_dict() for c in TaskCounter.objects.using(alias).filter(pk__in=batch)}
+                for user_id in batch:
+                    expected = {f: actual.get(user_id, {}).get(f, 0) for f in TaskCounter.COUNTER_FIELDS}
+                    if stored.get(user_id) != expected:
+                        mismatches += 1
+                        self.stdout.write(f"user {user_id}: stored {stored.get(user_id)} != actual {expected}")
+
+        if mismatches:
+            raise CommandError(f"{mismatches} of {len(user_ids)} users have stale counters.")
+        self.stdout.write(self.style.SUCCESS(f"Counters verified for {len(user_ids)} users."))
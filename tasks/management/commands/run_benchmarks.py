@@ -0,0 +1,71 @@
+import logging
+import platform
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from tasks import benchmarks
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the read endpoints for users created by generate_load_data, "
+        "write the results to JSON and optionally flag regressions against a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="loadgen_")
+        parser.add_argument("--sample", type=int, default=3, help="Users to benchmark: heaviest, median and lightest.")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--output", default="bench_output.json")
+        parser.add_argument("--compare", metavar="BASELINE", help="Baseline JSON to compare against.")
+        parser.add_argument("--threshold", type=float, default=0.2, help="Allowed growth as a fraction (0.2 = 20%%).")
+
+    def handle(self, *args, **options):
+        users = list(
+            User.objects.filter(username__startswith=options["prefix"])
+            .annotate(task_count=Count("tasks"))
+            .order_by("-task_count", "username")
+        )
+        if not users:
+            raise CommandError("No generated users found; run generate_load_data first.")
+        sample = self._sample(users, options["sample"])
+
+        # SQL debug logging would dominate the timings.
+        logging.getLogger("django.db.backends").setLevel(logging.WARNING)
+        results = benchmarks.run_suite(sample, iterations=options["iterations"])
+
+        for key, metrics in sorted(results.items()):
+            self.stdout.write(
+                f"{key:<45} p50 {metrics['p50_ms']:8.2f} ms  p95 {metrics['p95_ms']:8.2f} ms  "
+                f"{metrics['queries']:3d} queries  peak {metrics['peak_kb']:9.1f} KB"
+            )
+
+        meta = {
+            "created": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "iterations": options["iterations"],
+            "users": {u.username: u.task_count for u in sample},
+        }
+        benchmarks.save_results(options["output"], results, meta)
+        self.stdout.write(f"Results written to {options['output']}.")
+
+        if options["compare"]:
+            regressions = benchmarks.compare(results, benchmarks.load_baseline(options["compare"]), options["threshold"])
+            for key, metric, before, after in regressions:
+                self.stdout.write(self.style.ERROR(f"REGRESSION {key} {metric}: {before} -> {after}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} metrics regressed by more than {options['threshold']:.0%}.")
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+
+    @staticmethod
+    def _sample(users, size):
+        if size >= len(users):
+            return users
+        if size == 1:
+            return users[:1]
+        step = (len(users) - 1) / (size - 1)
+        return [users[round(i * step)] for i in range(size)]
@@ -0,0 +1,36 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tasks.jobs import default_worker_id, prune_jobs, work
+
+
+class Command(BaseCommand):
+    help = "Run a worker for the database-backed job queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit once no jobs are due.")
+        parser.add_argument("--batch-size", type=int, default=10, help="Jobs claimed per round trip.")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--worker-id", default=None)
+        parser.add_argument("--prune", action="store_true", help="Delete finished jobs past JOB_RETENTION_DAYS first.")
+
+    def handle(self, *args, **options):
+        if options["prune"]:
+            self.stdout.write(f"Pruned {prune_jobs()} finished jobs.")
+
+        # Finish the current job on SIGTERM/SIGINT instead of abandoning it.
+        stopping = []
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: stopping.append(True))
+
+        worker_id = options["worker_id"] or default_worker_id()
+        outcomes = work(
+            worker_id=worker_id,
+            batch_size=options["batch_size"],
+            once=options["once"],
+            idle_sleep=options["sleep"],
+            stop=lambda: bool(stopping),
+        )
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(outcomes.items())) or "no jobs"
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} stopped: {summary}."))
@@ -0,0 +1,25 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tasks.reminders import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = "Enqueue due-soon and overdue task reminders as their due dates approach."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Scan, send what is due now and exit.")
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler()
+        if options["once"]:
+            sent = scheduler.run_once()
+            self.stdout.write(self.style.SUCCESS(f"Enqueued {sent} reminders."))
+            return
+
+        stopping = []
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: stopping.append(True))
+        scheduler.run(stop=lambda: bool(stopping))
+        self.stdout.write(self.style.SUCCESS(f"Scheduler stopped: enqueued {scheduler.sent} reminders."))
@@ -0,0 +1,284 @@
+"""
+Per-request performance instrumentation.
+
+PerformanceMiddleware times every request, counts and times its SQL through
+an execute_wrapper installed on each database connection, and measures
+serializer time (less the SQL it triggers), JSON rendering and response
+size. The numbers are written to a Server-Timing
+header (when PERF_SERVER_TIMING is on) and folded into in-process
+histograms labelled by URL route, which metrics_view serves in the
+Prometheus text format. Each worker process keeps its own registry, so
+scrape every worker (or sum across them).
+
+The current request's timings live in a ContextVar, which sync_to_async
+carries into its worker threads, so queries run from async views are
+counted too.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from rest_framework.renderers import JSONRenderer
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_timings = ContextVar("request_timings", default=None)
+
+
+def server_timing_enabled():
+    return getattr(settings, "PERF_SERVER_TIMING", settings.DEBUG)
+
+
+def metrics_token():
+    return getattr(settings, "METRICS_TOKEN", None)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram keyed by a tuple of label values.
+    """
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            snapshot = [(key, list(counts), total, count) for key, (counts, total, count) in self.series.items()]
+        for key, counts, total, count in sorted(snapshot):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key))
+            cumulative = 0
+            for bound, hits in zip(self.buckets + ("+Inf",), counts):
+                cumulative += hits
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.6g}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def inc(self, label_values):
+        with self.lock:
+            self.series[label_values] = self.series.get(label_values, 0) + 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            snapshot = sorted(self.series.items())
+        for key, value in snapshot:
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key))
+            lines.append(f"{self.name}{{{labels}}} {value}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+ROUTE_LABELS = ("route", "method")
+
+REQUESTS = Counter("smarttasker_http_requests_total", "Requests handled.", ROUTE_LABELS + ("status",))
+DURATION = Histogram(
+    "smarttasker_http_request_duration_seconds", "Wall time per request.", ROUTE_LABELS, DURATION_BUCKETS,
+)
+DB_TIME = Histogram(
+    "smarttasker_db_query_duration_seconds", "SQL time per request.", ROUTE_LABELS, DURATION_BUCKETS,
+)
+DB_QUERIES = Histogram("smarttasker_db_queries", "SQL queries per request.", ROUTE_LABELS, QUERY_BUCKETS)
+SERIALIZE_TIME = Histogram(
+    "smarttasker_serialize_duration_seconds", "Serializer time per request, excluding SQL.", ROUTE_LABELS,
+    DURATION_BUCKETS,
+)
+RENDER_TIME = Histogram(
+    "smarttasker_render_duration_seconds", "JSON rendering time per request.", ROUTE_LABELS, DURATION_BUCKETS,
+)
+RESPONSE_SIZE = Histogram("smarttasker_response_size_bytes", "Response body size.", ROUTE_LABELS, SIZE_BUCKETS)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "smarttasker_response_cache_lookups_total", "Response cache lookups by result.", ("result",),
+)
+
+REGISTRY = [
+    REQUESTS, DURATION, DB_TIME, DB_QUERIES, SERIALIZE_TIME, RENDER_TIME, RESPONSE_SIZE, RESPONSE_CACHE_LOOKUPS,
+]
+
+
+class RequestTimings:
+    __slots__ = ("queries", "db_time", "serialize_time", "render_time", "serializing")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.serializing = False
+
+
+def current_timings():
+    return _timings.get()
+
+
+def time_query(execute, sql, params, many, context):
+    # execute_wrapper hook: charges each query to the current request, if any.
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_time += time.perf_counter() - start
+        timings.queries += 1
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    connection_created receiver: adds time_query to every new connection.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Charges the block to the current request's serializer time, less the SQL
+    it runs (lazy querysets, related lookups). Nested blocks count once.
+    """
+    timings = _timings.get()
+    if timings is None or timings.serializing:
+        yield
+        return
+    timings.serializing = True
+    start, db_before = time.perf_counter(), timings.db_time
+    try:
+        yield
+    finally:
+        timings.serializing = False
+        timings.serialize_time += time.perf_counter() - start - (timings.db_time - db_before)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that reports its time to the current request's timings.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        timings = current_timings()
+        if timings is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            timings.render_time += time.perf_counter() - start
+
+
+def route_of(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    # DRF router patterns are regexes; drop their anchors.
+    return "/" + match.route.replace("^", "").replace("$", "")
+
+
+class PerformanceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.record(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.record(request, response, timings, time.perf_counter() - start)
+
+    def record(self, request, response, timings, elapsed):
+        labels = (route_of(request), request.method)
+        REQUESTS.inc(labels + (response.status_code,))
+        DURATION.observe(labels, elapsed)
+        DB_TIME.observe(labels, timings.db_time)
+        DB_QUERIES.observe(labels, timings.queries)
+        SERIALIZE_TIME.observe(labels, timings.serialize_time)
+        RENDER_TIME.observe(labels, timings.render_time)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(labels, len(response.content))
+
+        if server_timing_enabled():
+            response["Server-Timing"] = (
+                f"app;dur={elapsed * 1000:.2f}, "
+                f'db;dur={timings.db_time * 1000:.2f};desc="{timings.queries} queries", '
+                f"serialize;dur={timings.serialize_time * 1000:.2f}, "
+                f"render;dur={timings.render_time * 1000:.2f}"
+            )
+        return response
+
+
+def metrics_allowed(request):
+    token = metrics_token()
+    if token:
+        return constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+    return settings.DEBUG or request.META.get("REMOTE_ADDR") in settings.INTERNAL_IPS
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of this process's metrics. Requests must send
+    METRICS_TOKEN as "Authorization: Bearer <token>"; without a token set,
+    only DEBUG or INTERNAL_IPS clients are served.
+    """
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4; charset=utf-8")
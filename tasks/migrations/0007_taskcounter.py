@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-17 05:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('tasks', '0006_alter_task_due_date_alter_task_priority_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('high_priority', models.IntegerField(default=0)),
+                ('medium_priority', models.IntegerField(default=0)),
+                ('low_priority', models.IntegerField(default=0)),
+                ('unknown_priority', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Task Counter',
+                'verbose_name_plural': 'Task Counters',
+            },
+        ),
+    ]
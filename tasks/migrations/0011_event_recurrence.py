@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:07
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_series_end(apps, schema_editor):
+    # Every existing event is a single occurrence, so its series ends with it.
+    Event = apps.get_model('tasks', 'Event')
+    Event.objects.using(schema_editor.connection.alias).update(series_end=F('end'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_calendarfeedtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_exdates',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_freq',
+            field=models.CharField(blank=True, choices=[('DAILY', 'Daily'), ('WEEKLY', 'Weekly'), ('MONTHLY', 'Monthly'), ('YEARLY', 'Yearly')], default='', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_interval',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='series_end',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_series_end, migrations.RunPython.noop),
+    ]
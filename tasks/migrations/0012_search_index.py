@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from tasks.search import rebuild_search_index
+    rebuild_search_index(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    from tasks.search import uninstall_search_index
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    # Creates the vendor-specific full-text index (SQLite FTS5 tables and
+    # triggers, or PostgreSQL GIN tsvector indexes) for tasks and events.
+
+    dependencies = [
+        ('tasks', '0011_event_recurrence'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def assign_existing_users(apps, schema_editor):
+    # Everything predating sharding lives on the default database.
+    if schema_editor.connection.alias != 'default':
+        return
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    ShardAssignment = apps.get_model('tasks', 'ShardAssignment')
+    db = schema_editor.connection.alias
+    ShardAssignment.objects.using(db).bulk_create(
+        [ShardAssignment(user_id=pk, shard='default') for pk in User.objects.using(db).values_list('pk', flat=True)],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('tasks', '0015_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShardAssignment',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='shard_assignment', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('shard', models.CharField(default='default', max_length=64)),
+                ('assigned_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Shard Assignment',
+                'verbose_name_plural': 'Shard Assignments',
+            },
+        ),
+        migrations.RunPython(assign_existing_users, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0017_task_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'series_end'], name='event_user_series_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('series_end__isnull', True)), fields=['user', 'start'], name='event_open_series_idx'),
+        ),
+    ]
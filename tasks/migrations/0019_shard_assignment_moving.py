@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 07:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0018_event_window_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shardassignment',
+            name='moving',
+            field=models.BooleanField(default=False),
+        ),
+    ]
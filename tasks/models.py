@@ -1,9 +1,137 @@
-from django.db import models
+import secrets
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from django.db import DEFAULT_DB_ALIAS, models, router, transaction
+from django.db.models import Count, F, Q
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from . import recurrence
+
 User = get_user_model()
 
+# modified_at of a user who has never written any task data.
+NEVER_MODIFIED = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+# Fields whose values decide which per-user counters a task contributes to.
+COUNTED_FIELDS = {'user', 'user_id', 'status', 'priority', 'completed'}
+
+# pk lists are looked up in chunks of this size, under SQLite's default
+# limit of 999 parameters per query.
+PK_BATCH_SIZE = 900
+
+
+def _pk_batches(queryset, pks):
+    for start in range(0, len(pks), PK_BATCH_SIZE):
+        yield queryset.filter(pk__in=pks[start:start + PK_BATCH_SIZE])
+
+
+class UserOwnedQuerySet(models.QuerySet):
+    """
+    QuerySet for per-user models whose bulk write paths bump the owners'
+    UserDataVersion inside the same transaction as the write.
+    """
+
+    def _owner_ids(self):
+        return set(self.order_by().values_list('user_id', flat=True).distinct())
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            UserDataVersion.bump({obj.user_id for obj in objs}, using=self.db)
+        return created
+
+    def update(self, **kwargs):
+        # updated_at is auto_now, which only save() fills in; sync streams
+        # would otherwise never see rows changed in bulk.
+        kwargs.setdefault('updated_at', timezone.now())
+        reassigning = 'user' in kwargs or 'user_id' in kwargs
+        with transaction.atomic(using=self.db):
+            owners = self._owner_ids()
+            pks = list(self.values_list('pk', flat=True)) if reassigning else None
+            updated = super().update(**kwargs)
+            if reassigning:
+                for rows in _pk_batches(self.model._default_manager.using(self.db), pks):
+                    owners |= rows._owner_ids()
+            UserDataVersion.bump(owners, using=self.db)
+        return updated
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            rows = list(self.order_by().values_list('pk', 'user_id'))
+            result = super().delete()
+            Tombstone.record(self.model, rows, using=self.db)
+            UserDataVersion.bump({user_id for _, user_id in rows}, using=self.db)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class TaskQuerySet(UserOwnedQuerySet):
+    """
+    Task QuerySet whose bulk write paths also keep TaskCounter in step with
+    the rows they touch.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.sync_status()
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            deltas = defaultdict(lambda: defaultdict(int))
+            for obj in objs:
+                TaskCounter.add_contribution(deltas, obj._counter_state(), 1)
+            TaskCounter.apply_deltas(deltas, using=self.db)
+        for obj in objs:
+            obj._counted_state = obj._counter_state()
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # Batches are written through update() below, which adjusts counters.
+        objs = list(objs)
+        fields = list(fields)
+        for obj in objs:
+            obj.sync_status()
+        if 'completed' in fields and 'status' not in fields:
+            fields.append('status')
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if not COUNTED_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            before = self._count_pks(pks)
+            updated = super().update(**kwargs)
+            TaskCounter.apply_deltas(TaskCounter.subtract(self._count_pks(pks), before), using=self.db)
+        return updated
+
+    update.alters_data = True
+
+    def _count_pks(self, pks):
+        counts = defaultdict(lambda: defaultdict(int))
+        for rows in _pk_batches(self.model._default_manager.using(self.db), pks):
+            for user_id, fields in TaskCounter.count_rows(rows).items():
+                for field, n in fields.items():
+                    counts[user_id][field] += n
+        return counts
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            removed = TaskCounter.count_rows(self)
+            result = super().delete()
+            TaskCounter.apply_deltas(TaskCounter.subtract({}, removed), using=self.db)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Task(models.Model):
     """
     Model representing a task assigned to a user, with priority, status, due dates, and completion tracking.
@@ -31,6 +159,8 @@ class Task(models.Model):
     priority = models.CharField(max_length=1, choices=PRIORITY_CHOICES, blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Task'
@@ -38,18 +168,75 @@ class Task(models.Model):
         indexes = [
             models.Index(fields=['user', 'created_at']),
             models.Index(fields=['user', 'due_date']),
+            models.Index(fields=['user', 'updated_at']),
+            models.Index(fields=['user', 'status', 'due_date'], name='task_user_status_due_idx'),
+            # Open tasks only: overdue/upcoming lists.
+            models.Index(fields=['user', 'due_date'], condition=Q(completed=False), name='task_open_due_idx'),
+            # Open tasks across all users, for the reminder scheduler's range scans.
+            models.Index(fields=['due_date', 'id'], condition=Q(completed=False), name='task_open_due_scan_idx'),
+            # Completed tasks only, oldest first, for archive_completed_tasks.
+            models.Index(fields=['updated_at', 'id'], condition=Q(completed=True), name='task_done_updated_idx'),
         ]
 
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
 
-    def save(self, *args, **kwargs):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this row was counted as, so save() can apply a delta
+        # to the user's counters without re-reading the row.
+        if not {'user_id', 'status', 'priority'}.intersection(instance.get_deferred_fields()):
+            instance._counted_state = instance._counter_state()
+        return instance
+
+    def _counter_state(self):
+        return (self.user_id, self.status, self.priority)
+
+    def sync_status(self):
         # Ensure consistency between completed boolean and status field.
         if self.completed and self.status != 'completed':
             self.status = 'completed'
         elif not self.completed and self.status == 'completed':
             self.status = 'pending'
-        super().save(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        self.sync_status()
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using):
+            previous = getattr(self, '_counted_state', None)
+            if previous is None and not self._state.adding and self.pk is not None:
+                previous = (
+                    Task.objects.using(using)
+                    .filter(pk=self.pk)
+                    .values_list('user_id', 'status', 'priority')
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            current = self._counter_state()
+            if current != previous:
+                deltas = defaultdict(lambda: defaultdict(int))
+                if previous is not None:
+                    TaskCounter.add_contribution(deltas, previous, -1)
+                TaskCounter.add_contribution(deltas, current, 1)
+                TaskCounter.apply_deltas(deltas, using=self._state.db)
+            owners = {self.user_id} | ({previous[0]} if previous else set())
+            UserDataVersion.bump(owners, using=self._state.db)
+        self._counted_state = current
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using):
+            state = self._counter_state()
+            pk = self.pk
+            result = super().delete(*args, **kwargs)
+            deltas = defaultdict(lambda: defaultdict(int))
+            TaskCounter.add_contribution(deltas, state, -1)
+            TaskCounter.apply_deltas(deltas, using=using)
+            Tombstone.record(Task, [(pk, self.user_id)], using=using)
+            UserDataVersion.bump({self.user_id}, using=using)
+        self._counted_state = None
+        return result
 
     @property
     def is_overdue(self):
@@ -69,9 +256,92 @@ class Task(models.Model):
         return priority_dict.get(self.priority, "Unknown")
 
 
+class ArchivedTask(models.Model):
+    """
+    A completed task moved out of Task by `archive_completed_tasks`, keeping
+    its id and fields. Read-only; listed and exported with ?archived=true.
+    """
+    ARCHIVED_FIELDS = (
+        'id', 'user_id', 'title', 'description', 'due_date',
+        'created_at', 'updated_at', 'completed', 'priority', 'status',
+    )
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_tasks')
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    due_date = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    completed = models.BooleanField(default=True)
+    priority = models.CharField(max_length=1, choices=Task.PRIORITY_CHOICES, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, default='completed')
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Archived Task'
+        verbose_name_plural = 'Archived Tasks'
+        # The orderings the task list can page through.
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['user', 'due_date']),
+            models.Index(fields=['user', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - archived"
+
+
+# Fields series_end is derived from.
+SERIES_FIELDS = {
+    'start', 'end', 'recurrence_freq', 'recurrence_interval',
+    'recurrence_until', 'recurrence_count', 'recurrence_exdates',
+}
+
+
+class EventQuerySet(UserOwnedQuerySet):
+    """
+    Event QuerySet that keeps series_end in step with rows written in bulk.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.sync_series_end()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # Batches are written through update() with series_end included.
+        objs = list(objs)
+        fields = list(fields)
+        if SERIES_FIELDS.intersection(fields):
+            for obj in objs:
+                obj.sync_series_end()
+            if 'series_end' not in fields:
+                fields.append('series_end')
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if 'series_end' in kwargs or not SERIES_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            updated = super().update(**kwargs)
+            events = [event for rows in _pk_batches(models.QuerySet(Event, using=self.db), pks) for event in rows]
+            for event in events:
+                event.sync_series_end()
+            models.QuerySet(Event, using=self.db).bulk_update(events, ['series_end'], batch_size=500)
+        return updated
+
+    update.alters_data = True
+
+
 class Event(models.Model):
     """
     Model representing a calendar event for a user with start/end time and optional all-day flag.
+    A recurring event stores its rule (freq, interval, until/count, exdates) on one row; its
+    occurrences are expanded per requested window by tasks.recurrence.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='events')
     title = models.CharField(max_length=255)
@@ -79,6 +349,17 @@ class Event(models.Model):
     start = models.DateTimeField()
     end = models.DateTimeField()
     all_day = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    recurrence_freq = models.CharField(max_length=7, choices=recurrence.FREQUENCY_CHOICES, blank=True, default='')
+    recurrence_interval = models.PositiveIntegerField(default=1)
+    recurrence_until = models.DateTimeField(null=True, blank=True)
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True)
+    recurrence_exdates = models.JSONField(default=list, blank=True)
+    # End of the last occurrence (null for open-ended rules); lets window
+    # queries skip finished series without expanding them.
+    series_end = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = EventQuerySet.as_manager()
 
     class Meta:
         ordering = ['start']
@@ -86,9 +367,395 @@ class Event(models.Model):
         verbose_name_plural = 'Events'
         indexes = [
             models.Index(fields=['user', 'start']),
+            models.Index(fields=['user', 'updated_at']),
+            # Window queries: long events and series that began well before the
+            # window, and open-ended series (null series_end).
+            models.Index(fields=['user', 'series_end'], name='event_user_series_end_idx'),
+            models.Index(fields=['user', 'start'], condition=Q(series_end__isnull=True), name='event_open_series_idx'),
         ]
 
+    @property
+    def is_recurring(self):
+        return bool(self.recurrence_freq)
+
+    def sync_series_end(self):
+        for name in ('start', 'end', 'recurrence_until'):
+            value = getattr(self, name)
+            if isinstance(value, str):
+                setattr(self, name, self._meta.get_field(name).to_python(value))
+        self.series_end = recurrence.series_end(self)
+
     def __str__(self):
         start_str = self.start.strftime('%Y-%m-%d %H:%M')
         end_str = self.end.strftime('%H:%M')
         return f"{self.title} ({start_str} - {end_str})"
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(Event, instance=self)
+        with transaction.atomic(using=using):
+            previous_owner = None
+            if not self._state.adding and self.pk is not None:
+                previous_owner = Event.objects.using(using).filter(pk=self.pk).values_list('user_id', flat=True).first()
+            self.sync_series_end()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'series_end' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'series_end']
+            super().save(*args, **kwargs)
+            UserDataVersion.bump({self.user_id, previous_owner} - {None}, using=self._state.db)
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(Event, instance=self)
+        with transaction.atomic(using=using):
+            pk = self.pk
+            result = super().delete(*args, **kwargs)
+            Tombstone.record(Event, [(pk, self.user_id)], using=using)
+            UserDataVersion.bump({self.user_id}, using=using)
+        return result
+
+
+class TaskCounter(models.Model):
+    """
+    Denormalized per-user task counts, maintained on every Task write so stats
+    reads are a single primary-key lookup. Rebuild with `rebuild_task_counters`.
+    """
+    PRIORITY_FIELDS = {
+        'H': 'high_priority',
+        'M': 'medium_priority',
+        'L': 'low_priority',
+    }
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='task_counter')
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    high_priority = models.IntegerField(default=0)
+    medium_priority = models.IntegerField(default=0)
+    low_priority = models.IntegerField(default=0)
+    unknown_priority = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Task Counter'
+        verbose_name_plural = 'Task Counters'
+
+    def __str__(self):
+        return f"Counters for {self.user_id}: {self.total} tasks"
+
+    COUNTER_FIELDS = (
+        'total', 'completed', 'pending', 'in_progress',
+        'high_priority', 'medium_priority', 'low_priority', 'unknown_priority',
+    )
+
+    @classmethod
+    def contribution(cls, status, priority):
+        """
+        Returns the counter fields a task with this status and priority adds one to.
+        """
+        fields = ['total', 'completed' if status == 'completed' else 'pending']
+        if status == 'in_progress':
+            fields.append('in_progress')
+        fields.append(cls.PRIORITY_FIELDS.get(priority, 'unknown_priority'))
+        return fields
+
+    @classmethod
+    def add_contribution(cls, deltas, state, sign):
+        user_id, status, priority = state
+        for field in cls.contribution(status, priority):
+            deltas[user_id][field] += sign
+
+    @classmethod
+    def aggregate_expressions(cls):
+        expressions = {
+            'total': Count('id'),
+            'completed': Count('id', filter=Q(status='completed')),
+            'pending': Count('id', filter=~Q(status='completed')),
+            'in_progress': Count('id', filter=Q(status='in_progress')),
+            'unknown_priority': Count('id', filter=~Q(priority__in=list(cls.PRIORITY_FIELDS)) | Q(priority__isnull=True)),
+        }
+        for code, field in cls.PRIORITY_FIELDS.items():
+            expressions[field] = Count('id', filter=Q(priority=code))
+        return expressions
+
+    @classmethod
+    def count_rows(cls, queryset):
+        """
+        Returns {user_id: {field: count}} for the tasks in queryset, in one
+        grouped query.
+        """
+        rows = queryset.order_by().values('user_id').annotate(**cls.aggregate_expressions())
+        return {row.pop('user_id'): row for row in rows}
+
+    @classmethod
+    def subtract(cls, after, before):
+        deltas = defaultdict(lambda: defaultdict(int))
+        for user_id in set(after) | set(before):
+            for field in cls.COUNTER_FIELDS:
+                deltas[user_id][field] = after.get(user_id, {}).get(field, 0) - before.get(user_id, {}).get(field, 0)
+        return deltas
+
+    @classmethod
+    def apply_deltas(cls, deltas, using=None):
+        """
+        Adds {user_id: {field: n}} to the stored counters with F() updates.
+        A user without a counter row yet gets one rebuilt from the table.
+        """
+        using = using or DEFAULT_DB_ALIAS
+        missing = []
+        for user_id, fields in deltas.items():
+            changes = {field: F(field) + n for field, n in fields.items() if n}
+            if not changes:
+                continue
+            changes['updated_at'] = timezone.now()
+            if not cls.objects.using(using).filter(user_id=user_id).update(**changes):
+                missing.append(user_id)
+        if missing:
+            cls.rebuild(missing, using=using)
+
+    @classmethod
+    def rebuild(cls, user_ids=None, using=None):
+        """
+        Recounts the given users (or every user) from the Task table and
+        stores the result. Returns the number of counter rows written.
+        """
+        using = using or DEFAULT_DB_ALIAS
+        tasks = Task.objects.using(using)
+        if user_ids is None:
+            user_ids = list(User.objects.using(using).values_list('pk', flat=True))
+        else:
+            user_ids = list(user_ids)
+            tasks = tasks.filter(user_id__in=user_ids)
+        counts = cls.count_rows(tasks)
+        with transaction.atomic(using=using):
+            for user_id in user_ids:
+                values = {field: counts.get(user_id, {}).get(field, 0) for field in cls.COUNTER_FIELDS}
+                cls.objects.using(using).update_or_create(user_id=user_id, defaults=values)
+        return len(user_ids)
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        Returns the user's counters, building them on first access.
+        """
+        try:
+            return cls.objects.get(pk=user.pk)
+        except cls.DoesNotExist:
+            cls.rebuild([user.pk])
+            return cls.objects.get(pk=user.pk)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.COUNTER_FIELDS}
+
+
+class UserDataVersion(models.Model):
+    """
+    Per-user change marker, bumped on every Task and Event write. Lets read
+    endpoints answer conditional requests without touching those tables.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='data_version')
+    version = models.BigIntegerField(default=0)
+    modified_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'User Data Version'
+        verbose_name_plural = 'User Data Versions'
+
+    def __str__(self):
+        return f"{self.user_id} v{self.version}"
+
+    @classmethod
+    def bump(cls, user_ids, using=None):
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        using = using or DEFAULT_DB_ALIAS
+        now = timezone.now()
+        versions = cls.objects.using(using)
+        updated = versions.filter(user_id__in=user_ids).update(version=F('version') + 1, modified_at=now)
+        if updated < len(user_ids):
+            existing = set(versions.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+            versions.bulk_create(
+                [cls(user_id=user_id, version=1, modified_at=now) for user_id in user_ids - existing],
+                ignore_conflicts=True,
+            )
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        Returns the user's version row, or an unsaved version 0 if they have
+        never written. Reads never create the row; bump() does.
+        """
+        return cls.objects.filter(user_id=user.pk).first() or cls.unwritten(user)
+
+    @classmethod
+    async def afor_user(cls, user):
+        return await cls.objects.filter(user_id=user.pk).afirst() or cls.unwritten(user)
+
+    @classmethod
+    def unwritten(cls, user):
+        return cls(user_id=user.pk, version=0, modified_at=NEVER_MODIFIED)
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted Task or Event, so sync clients can drop it locally.
+    Pruned after SYNC_TOMBSTONE_RETENTION_DAYS by `prune_tombstones`.
+    """
+    KIND_CHOICES = [
+        ('task', 'Task'),
+        ('event', 'Event'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tombstones')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Tombstone'
+        verbose_name_plural = 'Tombstones'
+        indexes = [
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+    @classmethod
+    def record(cls, model, rows, using=None):
+        """
+        Stores a tombstone for each (pk, user_id) pair of a deleted model row.
+        """
+        kind = model._meta.model_name
+        if kind not in dict(cls.KIND_CHOICES) or not rows:
+            return
+        now = timezone.now()
+        cls.objects.using(using or DEFAULT_DB_ALIAS).bulk_create(
+            [cls(user_id=user_id, kind=kind, object_id=pk, deleted_at=now) for pk, user_id in rows],
+            batch_size=500,
+        )
+
+
+class CalendarFeedToken(models.Model):
+    """
+    Secret per-user token embedded in the iCalendar subscription URL.
+    Rotating it revokes every existing subscription.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='calendar_feed_token')
+    token = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Calendar Feed Token'
+        verbose_name_plural = 'Calendar Feed Tokens'
+
+    def __str__(self):
+        return f"Calendar feed for {self.user_id}"
+
+    @staticmethod
+    def new_token():
+        return secrets.token_urlsafe(32)
+
+    @classmethod
+    def for_user(cls, user, rotate=False):
+        feed, created = cls.objects.get_or_create(user=user, defaults={'token': cls.new_token()})
+        if rotate and not created:
+            feed.token = cls.new_token()
+            feed.save(update_fields=['token', 'created_at'])
+        return feed
+
+
+class ShardAssignment(models.Model):
+    """
+    Which database in DATABASE_SHARDS holds a user's task data. Kept on the
+    default database; see tasks.sharding.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='shard_assignment')
+    shard = models.CharField(max_length=64, default=DEFAULT_DB_ALIAS)
+    # Set while tasks.sharding.move_users copies the user; writes are refused.
+    moving = models.BooleanField(default=False)
+    assigned_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Shard Assignment'
+        verbose_name_plural = 'Shard Assignments'
+
+    def __str__(self):
+        return f"{self.user_id} on {self.shard}"
+
+
+class ReminderLog(models.Model):
+    """
+    One row per reminder sent, unique per (task, kind, due_date) so a task
+    is reminded at most once per kind for a given due date; moving the due
+    date makes it eligible again.
+    """
+    DUE_SOON, OVERDUE = 'due_soon', 'overdue'
+    KIND_CHOICES = [
+        (DUE_SOON, 'Due soon'),
+        (OVERDUE, 'Overdue'),
+    ]
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='reminders')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    due_date = models.DateTimeField()
+    sent_at = models.DateTimeField(default=timezone.now)
+    # Identifies the scheduler batch that inserted the row, so a batch can
+    # tell which of its reminders won against existing rows.
+    run_id = models.CharField(max_length=32, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Reminder Log'
+        verbose_name_plural = 'Reminder Logs'
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'kind', 'due_date'], name='unique_task_reminder'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} reminder for task {self.task_id}"
+
+
+class Job(models.Model):
+    """
+    A unit of deferred work in the database-backed queue (see tasks.jobs).
+    A running job whose locked_until has passed is presumed abandoned by a
+    crashed worker and becomes claimable again.
+    """
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['status', 'locked_until']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @classmethod
+    def claimable(cls, now):
+        return Q(status=cls.QUEUED, run_after__lte=now) | Q(status=cls.RUNNING, locked_until__lt=now)
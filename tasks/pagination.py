@@ -0,0 +1,149 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .filters import EVENT_ORDERING_FIELDS, TASK_ORDERING_FIELDS
+
+
+class UserCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a per-user index: every page is a range scan from
+    the opaque cursor, so deep pages cost the same as the first one.
+
+    `?include_total=1` adds a "count" key (one extra COUNT query), and
+    requests that still send `?page=N` get the old page-number response.
+    `?ordering=<field>` or `-<field>` picks another indexed ordering from
+    ordering_fields. A cursor cannot place nulls, so ordering by a nullable
+    field pages through the rows that have a value first and then the rest
+    by id; the cursor records which of the two it is in, and a page at the
+    boundary may come up short.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    total_query_param = 'include_total'
+    legacy_page_query_param = 'page'
+    ordering_query_param = 'ordering'
+    ordering_fields = ()
+    nullable_ordering_fields = ()
+
+    null_tail_ordering = ('id',)
+
+    def __init__(self):
+        self.legacy = None
+        self.total = None
+        self.null_field = None
+        self.in_null_tail = False
+        self.tail_link = None
+
+    def is_requested(self, request):
+        params = request.query_params
+        return any(p in params for p in (self.cursor_query_param, self.page_size_query_param, self.legacy_page_query_param))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.legacy_page_query_param in request.query_params:
+            self.legacy = PageNumberPagination()
+            self.legacy.page_size_query_param = self.page_size_query_param
+            self.legacy.max_page_size = self.max_page_size
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        if request.query_params.get(self.total_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.total = queryset.count()
+
+        field = self._requested_ordering(request, queryset, view)[0].lstrip('-')
+        if field not in self.nullable_ordering_fields or not self.get_page_size(request):
+            return super().paginate_queryset(queryset, request, view)
+
+        self.null_field = field
+        self.decode_cursor(request)
+        dated = queryset.filter(**{f'{field}__isnull': False})
+        undated = queryset.filter(**{f'{field}__isnull': True})
+        if not self.in_null_tail:
+            page = super().paginate_queryset(dated, request, view)
+            if page or self.cursor is not None:
+                if not self.has_next and undated.exists():
+                    # Past the last dated row: continue with the undated ones.
+                    self.tail_link = ('next', Cursor(offset=0, reverse=False, position=None), True)
+                return page
+            self.in_null_tail = True
+        page = super().paginate_queryset(undated, request, view)
+        if not self.has_previous and dated.exists():
+            # Back from the first undated row: the last page of dated ones.
+            self.tail_link = ('previous', Cursor(offset=0, reverse=True, position=None), False)
+        return page
+
+    def _requested_ordering(self, request, queryset, view):
+        requested = request.query_params.get(self.ordering_query_param, '')
+        if requested.lstrip('-') in self.ordering_fields:
+            return (requested,)
+        return super().get_ordering(request, queryset, view)
+
+    def get_ordering(self, request, queryset, view):
+        if self.in_null_tail:
+            return self.null_tail_ordering
+        return self._requested_ordering(request, queryset, view)
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is not None and self.null_field is not None:
+            encoded = request.query_params[self.cursor_query_param]
+            tokens = parse.parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'))
+            self.in_null_tail = tokens.get('n') == ['1']
+        return cursor
+
+    def encode_cursor(self, cursor, null_tail=None):
+        # CursorPagination.encode_cursor plus an 'n' token for the null tail.
+        tokens = {}
+        if cursor.offset != 0:
+            tokens['o'] = str(cursor.offset)
+        if cursor.reverse:
+            tokens['r'] = '1'
+        if cursor.position is not None:
+            tokens['p'] = cursor.position
+        if self.in_null_tail if null_tail is None else null_tail:
+            tokens['n'] = '1'
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.tail_link is not None and self.tail_link[0] == 'next':
+            return self.encode_cursor(*self.tail_link[1:])
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.tail_link is not None and self.tail_link[0] == 'previous':
+            return self.encode_cursor(*self.tail_link[1:])
+        return super().get_previous_link()
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+
+        payload = OrderedDict()
+        if self.total is not None:
+            payload['count'] = self.total
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties'] = {'count': {'type': 'integer', 'example': 123}, **schema['properties']}
+        return schema
+
+
+class TaskCursorPagination(UserCursorPagination):
+    # Walks the (user, created_at) index by default.
+    ordering = '-created_at'
+    ordering_fields = TASK_ORDERING_FIELDS
+    nullable_ordering_fields = ('due_date',)
+
+
+class EventCursorPagination(UserCursorPagination):
+    # Walks the (user, start) index by default.
+    ordering = 'start'
+    ordering_fields = EVENT_ORDERING_FIELDS
@@ -0,0 +1,191 @@
+"""
+RRULE-style recurrence expansion for Event.
+
+Only the occurrences that overlap a requested window are generated: daily
+and weekly rules jump straight to the window, monthly and yearly rules skip
+whole periods, so cost depends on the window, not the age of the series.
+"""
+import calendar
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .lru import LRUCache
+
+DAILY, WEEKLY, MONTHLY, YEARLY = "DAILY", "WEEKLY", "MONTHLY", "YEARLY"
+FREQUENCY_CHOICES = [
+    (DAILY, "Daily"),
+    (WEEKLY, "Weekly"),
+    (MONTHLY, "Monthly"),
+    (YEARLY, "Yearly"),
+]
+
+# Guards against unbounded loops on pathological rules.
+MAX_OCCURRENCES_PER_WINDOW = 5000
+# Upper bounds accepted for INTERVAL and COUNT.
+MAX_INTERVAL = 1000
+MAX_COUNT = MAX_OCCURRENCES_PER_WINDOW
+
+
+class RecurrenceError(ValueError):
+    pass
+
+_occurrence_cache = None
+
+
+def occurrence_cache():
+    global _occurrence_cache
+    if _occurrence_cache is None:
+        _occurrence_cache = LRUCache(maxsize=getattr(settings, "RECURRENCE_CACHE_SIZE", 4096))
+    return _occurrence_cache
+
+
+def _add_months(value, months):
+    """
+    Shifts a local datetime by whole months, returning None when the day does
+    not exist in the target month (RFC 5545 skips such occurrences).
+    """
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    if value.day > calendar.monthrange(year, month)[1]:
+        return None
+    return value.replace(year=year, month=month)
+
+
+def _exdates(event):
+    excluded = set()
+    for raw in event.recurrence_exdates or []:
+        parsed = parse_datetime(raw) if isinstance(raw, str) else raw
+        if parsed is not None:
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            excluded.add(parsed)
+    return excluded
+
+
+def _candidate_starts(event, skip_to=None):
+    """
+    Yields (index, start) for every rule instance in order, where index
+    counts instances from the series start (used for COUNT). When skip_to is
+    given and COUNT does not need exact indexes, iteration begins near it.
+    Stops at the last instance the datetime type can represent.
+    """
+    tz = timezone.get_current_timezone()
+    first = timezone.localtime(event.start, tz)
+    interval = max(1, event.recurrence_interval or 1)
+    freq = event.recurrence_freq
+
+    if freq in (DAILY, WEEKLY):
+        step = timedelta(days=interval * (7 if freq == WEEKLY else 1))
+        index = 0
+        if skip_to is not None and skip_to > event.start:
+            index = max(0, int((skip_to - event.start) / step) - 1)
+        while True:
+            # Wall-clock arithmetic keeps "09:00" at 09:00 across DST changes.
+            try:
+                start = timezone.make_aware(first.replace(tzinfo=None) + step * index, tz)
+            except OverflowError:
+                return
+            yield index, start
+            index += 1
+    else:
+        months_per_step = interval * (12 if freq == YEARLY else 1)
+        step_index = 0
+        if skip_to is not None and skip_to > event.start and not event.recurrence_count:
+            target = timezone.localtime(skip_to, tz)
+            months = (target.year - first.year) * 12 + target.month - first.month
+            step_index = max(0, months // months_per_step - 1)
+        index = step_index
+        while True:
+            try:
+                local = _add_months(first.replace(tzinfo=None), step_index * months_per_step)
+                start = None if local is None else timezone.make_aware(local, tz)
+            except (OverflowError, ValueError):
+                return
+            if start is not None:
+                yield index, start
+                index += 1
+            step_index += 1
+
+
+def iter_occurrences(event, window_start, window_end):
+    """
+    Yields (start, end) for each occurrence of event overlapping
+    [window_start, window_end). Non-recurring events yield themselves.
+    """
+    duration = event.end - event.start
+    if not event.recurrence_freq:
+        if event.start < window_end and (event.end > window_start or event.start >= window_start):
+            yield event.start, event.end
+        return
+
+    excluded = _exdates(event)
+    count, until = event.recurrence_count, event.recurrence_until
+    skip_to = window_start - duration if not count else None
+    produced = 0
+    for index, start in _candidate_starts(event, skip_to):
+        if count and index >= count:
+            return
+        if until and start > until:
+            return
+        if start >= window_end:
+            return
+        end = start + duration
+        if start in excluded or not (end > window_start or start >= window_start):
+            continue
+        yield start, end
+        produced += 1
+        if produced >= MAX_OCCURRENCES_PER_WINDOW:
+            return
+
+
+def occurrences(event, window_start, window_end):
+    """
+    Cached list of iter_occurrences(); keyed on the rule's last change so an
+    edited event never serves stale occurrences.
+    """
+    if not event.recurrence_freq:
+        return list(iter_occurrences(event, window_start, window_end))
+    key = (event.pk, event.updated_at, window_start, window_end)
+    cache = occurrence_cache()
+    cached = cache.get(key)
+    if cached is None:
+        cached = list(iter_occurrences(event, window_start, window_end))
+        cache.set(key, cached)
+    return cached
+
+
+def _last_counted_start(event):
+    count, until = event.recurrence_count, event.recurrence_until
+    if event.recurrence_freq in (DAILY, WEEKLY) and not until:
+        # Every instance exists, so the last one is count - 1 steps on.
+        tz = timezone.get_current_timezone()
+        days = max(1, event.recurrence_interval or 1) * (7 if event.recurrence_freq == WEEKLY else 1)
+        local = timezone.localtime(event.start, tz).replace(tzinfo=None)
+        try:
+            return timezone.make_aware(local + timedelta(days=days * (count - 1)), tz)
+        except OverflowError:
+            raise RecurrenceError("The series runs past the year 9999.")
+    last = None
+    for index, start in _candidate_starts(event):
+        if index >= count or (until and start > until):
+            return last
+        last = start
+    raise RecurrenceError("The series runs past the year 9999.")
+
+
+def series_end(event):
+    """
+    Returns when the last occurrence ends, or None for an open-ended rule.
+    Stored on Event so window queries can skip finished series. Raises
+    RecurrenceError when a COUNT rule ends past the last representable date.
+    """
+    if not event.recurrence_freq:
+        return event.end
+    duration = event.end - event.start
+    if event.recurrence_count:
+        return (_last_counted_start(event) or event.start) + duration
+    if event.recurrence_until:
+        return event.recurrence_until + duration
+    return None
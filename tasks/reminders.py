@@ -0,0 +1,216 @@
+"""
+Due-date reminder scheduler.
+
+Every scan range-scans open tasks whose reminder fires within the next
+horizon (keyset-paged over the partial (due_date, id) index on open tasks)
+and loads them into an in-memory timer wheel. Each tick pops the timers
+that are due and dispatches them in batches: a ReminderLog row is inserted
+per reminder (unique per task, kind and due date) and only the rows this
+batch actually inserted get a mail job, so nothing is sent twice. Work per
+scan depends on how many tasks fall due within the horizon, not on the
+size of the Task table. With sharding, every shard is scanned and each
+reminder is dispatched on the shard that holds its task.
+"""
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .jobs import enqueue_many
+from .models import ReminderLog, Task
+from .sharding import shard_aliases
+
+
+def reminder_offsets():
+    """
+    Returns {kind: timedelta before the due date at which it fires}.
+    """
+    return {
+        ReminderLog.DUE_SOON: timedelta(minutes=getattr(settings, "REMINDER_DUE_SOON_MINUTES", 60)),
+        ReminderLog.OVERDUE: timedelta(),
+    }
+
+
+def horizon():
+    return timedelta(seconds=getattr(settings, "REMINDER_HORIZON_SECONDS", 600))
+
+
+def tick_seconds():
+    return getattr(settings, "REMINDER_TICK_SECONDS", 10)
+
+
+def catchup():
+    # How far back a freshly started scheduler looks for missed reminders.
+    return timedelta(hours=getattr(settings, "REMINDER_CATCHUP_HOURS", 24))
+
+
+def batch_size():
+    return getattr(settings, "REMINDER_BATCH_SIZE", 500)
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel: timers are bucketed by fire time into `slots`
+    buckets of `resolution` seconds, so adding a timer and advancing the
+    clock cost O(1) per timer regardless of how many are pending. Timers
+    must fall within slots * resolution of the current position; timers
+    already in the past fire on the next advance.
+    """
+
+    def __init__(self, resolution, slots, now):
+        self.resolution = resolution
+        self.slots = slots
+        self.buckets = [[] for _ in range(slots)]
+        self.keys = set()
+        self.position = int(now // resolution)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, fire_at, key, item=None):
+        """
+        Schedules item at fire_at (a timestamp); returns False if a timer
+        with this key is already pending.
+        """
+        if key in self.keys:
+            return False
+        tick = max(int(fire_at // self.resolution), self.position)
+        if tick - self.position >= self.slots:
+            raise ValueError("Timer is beyond the wheel's span.")
+        self.buckets[tick % self.slots].append((tick, key, item))
+        self.keys.add(key)
+        return True
+
+    def advance(self, now):
+        """
+        Moves the wheel to `now` and returns the (key, item) pairs that fired.
+        """
+        target = int(now // self.resolution)
+        fired = []
+        # Never walk more than one full turn; every bucket is visited by then.
+        for tick in range(self.position, min(target, self.position + self.slots - 1) + 1):
+            bucket = self.buckets[tick % self.slots]
+            keep = []
+            for entry in bucket:
+                if entry[0] <= target:
+                    fired.append((entry[1], entry[2]))
+                    self.keys.discard(entry[1])
+                else:
+                    keep.append(entry)
+            self.buckets[tick % self.slots] = keep
+        self.position = target
+        return fired
+
+
+def scan_open_tasks(start, end, size=None, using=DEFAULT_DB_ALIAS):
+    """
+    Yields batches of (id, due_date) for open tasks due in [start, end),
+    keyset-paged by (due_date, id).
+    """
+    size = size or batch_size()
+    last = None
+    while True:
+        tasks = Task.objects.using(using).filter(completed=False, due_date__gte=start, due_date__lt=end)
+        if last is not None:
+            tasks = tasks.filter(Q(due_date__gt=last[1]) | Q(due_date=last[1], id__gt=last[0]))
+        rows = list(tasks.order_by("due_date", "id").values_list("id", "due_date")[:size])
+        if rows:
+            yield rows
+        if len(rows) < size:
+            return
+        last = rows[-1]
+
+
+def dispatch(entries, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Sends reminders for (task_id, kind, due_date) entries of one shard that
+    are still valid, once each. Returns the number of reminder jobs enqueued.
+    """
+    now = now or timezone.now()
+    current = dict(
+        Task.objects.using(using).filter(pk__in={task_id for task_id, _, _ in entries}, completed=False)
+        .values_list("id", "due_date")
+    )
+    valid = [
+        (task_id, kind, due_date)
+        for task_id, kind, due_date in entries
+        # Drop rescheduled/completed tasks, and "due soon" for tasks already overdue.
+        if current.get(task_id) == due_date and not (kind == ReminderLog.DUE_SOON and due_date <= now)
+    ]
+    if not valid:
+        return 0
+    run_id = uuid.uuid4().hex
+    with transaction.atomic(using=using):
+        ReminderLog.objects.using(using).bulk_create(
+            [ReminderLog(task_id=t, kind=k, due_date=d, sent_at=now, run_id=run_id) for t, k, d in valid],
+            ignore_conflicts=True,
+            batch_size=batch_size(),
+        )
+        won = ReminderLog.objects.using(using).filter(run_id=run_id).values_list("task_id", "kind", "due_date")
+        payloads = [{"task_id": t, "kind": k, "due_date": d.isoformat(), "shard": using} for t, k, d in won]
+        enqueue_many("send_task_reminder", payloads)
+    return len(payloads)
+
+
+class ReminderScheduler:
+    def __init__(self, now=None):
+        now = now or timezone.now()
+        self.wheel = TimerWheel(tick_seconds(), int(horizon().total_seconds() // tick_seconds()) * 2 + 1, now.timestamp())
+        self.scanned_at = None
+        self.sent = 0
+
+    def scan(self, now):
+        """
+        Loads every reminder firing before now + horizon into the wheel. The
+        first scan also looks back over the catch-up window; later scans
+        overlap the previous one so tasks created or rescheduled since are
+        not missed (ReminderLog drops the repeats). Returns the number of
+        timers added.
+        """
+        start = now - (catchup() if self.scanned_at is None else horizon())
+        end = now + horizon()
+        added = 0
+        for alias in shard_aliases():
+            for kind, offset in reminder_offsets().items():
+                for rows in scan_open_tasks(start + offset, end + offset, using=alias):
+                    for task_id, due_date in rows:
+                        fire_at = due_date - offset
+                        added += self.wheel.add(fire_at.timestamp(), (alias, task_id, kind, due_date))
+        self.scanned_at = now
+        return added
+
+    def tick(self, now):
+        """
+        Fires due timers, dispatching them in batches. Returns jobs enqueued.
+        """
+        by_shard = {}
+        for (alias, *entry), _ in self.wheel.advance(now.timestamp()):
+            by_shard.setdefault(alias, []).append(tuple(entry))
+        sent = 0
+        size = batch_size()
+        for alias, fired in by_shard.items():
+            for i in range(0, len(fired), size):
+                sent += dispatch(fired[i:i + size], now, using=alias)
+        self.sent += sent
+        return sent
+
+    def run_once(self, now=None):
+        now = now or timezone.now()
+        self.scan(now)
+        return self.tick(now)
+
+    def run(self, stop=None):
+        """
+        Rescans every half horizon and ticks every REMINDER_TICK_SECONDS
+        until stop() returns True.
+        """
+        rescan_every = horizon() / 2
+        while not (stop and stop()):
+            now = timezone.now()
+            if self.scanned_at is None or now - self.scanned_at >= rescan_every:
+                self.scan(now)
+            self.tick(now)
+            time.sleep(tick_seconds())
@@ -0,0 +1,127 @@
+"""
+Server-side cache of read-endpoint payloads.
+
+Entries are keyed by the same validator as the ETag (user, data version,
+URL and, for time-sensitive views, the clock bucket), so a Task or Event
+write moves the user onto fresh keys and stale entries simply age out; no
+explicit invalidation is needed. The default backend is a bounded
+per-process LRU; RESPONSE_CACHE_ALIAS names a Django cache to share
+entries between workers instead.
+"""
+import threading
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .lru import LRUCache
+from .metrics import RESPONSE_CACHE_LOOKUPS
+
+_MISSING = object()
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def response_cache_size():
+    return getattr(settings, "RESPONSE_CACHE_SIZE", 2048)
+
+
+def response_cache_alias():
+    return getattr(settings, "RESPONSE_CACHE_ALIAS", None)
+
+
+def response_cache_timeout():
+    # Lifetime of entries that are not time-sensitive; a version bump makes
+    # them unreachable long before this.
+    return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60 * 60)
+
+
+class LocalResponseCache:
+    def __init__(self, maxsize):
+        self.entries = LRUCache(maxsize=maxsize)
+
+    def get(self, key):
+        return self.entries.get(key, _MISSING)
+
+    def set(self, key, data, ttl=None):
+        self.entries.set(key, data, ttl=ttl or response_cache_timeout())
+
+    async def aget(self, key):
+        return self.get(key)
+
+    async def aset(self, key, data, ttl=None):
+        self.set(key, data, ttl)
+
+
+class SharedResponseCache:
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def get(self, key):
+        return self.cache.get(key, _MISSING)
+
+    def set(self, key, data, ttl=None):
+        self.cache.set(key, data, timeout=ttl or response_cache_timeout())
+
+    async def aget(self, key):
+        return await self.cache.aget(key, _MISSING)
+
+    async def aset(self, key, data, ttl=None):
+        await self.cache.aset(key, data, timeout=ttl or response_cache_timeout())
+
+
+def get_response_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            alias = response_cache_alias()
+            _cache = SharedResponseCache(alias) if alias else LocalResponseCache(response_cache_size())
+        return _cache
+
+
+def reset_response_cache():
+    """
+    Drops the process-local cache and re-reads settings (used by tests).
+    """
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def cache_key(etag):
+    return "resp:" + etag.strip('"')
+
+
+def _cacheable(response):
+    return isinstance(response, Response) and response.status_code == 200
+
+
+def cached_response(etag, build_response, ttl=None):
+    """
+    Returns the cached payload for etag as a Response, or calls
+    build_response() and caches its data if it succeeded.
+    """
+    cache = get_response_cache()
+    key = cache_key(etag)
+    data = cache.get(key)
+    if data is not _MISSING:
+        RESPONSE_CACHE_LOOKUPS.inc(("hit",))
+        return Response(data)
+    RESPONSE_CACHE_LOOKUPS.inc(("miss",))
+    response = build_response()
+    if _cacheable(response):
+        cache.set(key, response.data, ttl)
+    return response
+
+
+async def acached_response(etag, build_response, ttl=None):
+    cache = get_response_cache()
+    key = cache_key(etag)
+    data = await cache.aget(key)
+    if data is not _MISSING:
+        RESPONSE_CACHE_LOOKUPS.inc(("hit",))
+        return Response(data)
+    RESPONSE_CACHE_LOOKUPS.inc(("miss",))
+    response = await build_response()
+    if _cacheable(response):
+        await cache.aset(key, response.data, ttl)
+    return response
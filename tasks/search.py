@@ -0,0 +1,205 @@
+"""
+Full-text search over task and event titles and descriptions.
+
+SQLite uses external-content FTS5 tables kept in step with their source
+tables by triggers, so every write path (save, delete, bulk_create, update,
+raw SQL) keeps the index current. PostgreSQL uses GIN expression indexes
+over a weighted tsvector, which the database maintains itself. Other
+vendors fall back to an unindexed icontains match.
+"""
+import re
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+
+from .models import Task, Event
+
+# Source table -> indexed text columns, weighted title first.
+SEARCH_TABLES = {
+    "tasks_task": ("title", "description"),
+    "tasks_event": ("title", "description"),
+}
+SEARCH_MODELS = {
+    "tasks": Task,
+    "events": Event,
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchQueryError(ValueError):
+    pass
+
+
+def max_results():
+    return getattr(settings, "SEARCH_MAX_RESULTS", 50)
+
+
+def query_terms(query):
+    """
+    Splits user input into word tokens; the last one is prefix-matched so
+    results show up while the user is still typing.
+    """
+    terms = _TOKEN_RE.findall(query or "")[:16]
+    if not terms:
+        raise SearchQueryError("'q' must contain at least one word.")
+    return [term.lower() for term in terms]
+
+
+class SQLiteFTS5Backend:
+    vendor = "sqlite"
+
+    @staticmethod
+    def fts_table(table):
+        return f"{table}_fts"
+
+    def install_statements(self, table, columns):
+        fts = self.fts_table(table)
+        cols = ", ".join(columns)
+        new_values = ", ".join(f"new.{c}" for c in columns)
+        old_values = ", ".join(f"old.{c}" for c in columns)
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{cols}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        ]
+
+    def uninstall_statements(self, table, columns):
+        fts = self.fts_table(table)
+        return [f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ("ai", "ad", "au")] + [
+            f"DROP TABLE IF EXISTS {fts}",
+        ]
+
+    def rebuild_statements(self, table, columns):
+        fts = self.fts_table(table)
+        return [f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"]
+
+    def match_expression(self, terms):
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def search(self, model, user, terms, limit):
+        """
+        Returns [(pk, rank)] best first; bm25 weights title matches 10x.
+        """
+        table = model._meta.db_table
+        fts = self.fts_table(table)
+        sql = (
+            f"SELECT t.id, bm25({fts}, 10.0, 1.0) AS rank FROM {fts} "
+            f"JOIN {table} t ON t.id = {fts}.rowid "
+            f"WHERE {fts} MATCH %s AND t.user_id = %s ORDER BY rank, t.id LIMIT %s"
+        )
+        with connections[router.db_for_read(model)].cursor() as cursor:
+            cursor.execute(sql, [self.match_expression(terms), user.pk, limit])
+            # bm25 is lower-is-better; flip it so callers see higher-is-better.
+            return [(pk, -rank) for pk, rank in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    vendor = "postgresql"
+    config = "simple"
+
+    def vector_sql(self, columns):
+        weights = "ABCD"
+        return " || ".join(
+            f"setweight(to_tsvector('{self.config}'::regconfig, COALESCE({column}, '')), '{weights[i]}')"
+            for i, column in enumerate(columns)
+        )
+
+    def install_statements(self, table, columns):
+        return [
+            f"CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} "
+            f"USING GIN (({self.vector_sql(columns)}))",
+        ]
+
+    def uninstall_statements(self, table, columns):
+        return [f"DROP INDEX IF EXISTS {table}_search_idx"]
+
+    def rebuild_statements(self, table, columns):
+        return [f"REINDEX INDEX {table}_search_idx"]
+
+    def search(self, model, user, terms, limit):
+        table = model._meta.db_table
+        vector = self.vector_sql(SEARCH_TABLES[table])
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        sql = (
+            f"SELECT id, ts_rank({vector}, to_tsquery('{self.config}'::regconfig, %s)) AS rank "
+            f"FROM {table} WHERE user_id = %s AND ({vector}) @@ to_tsquery('{self.config}'::regconfig, %s) "
+            f"ORDER BY rank DESC, id LIMIT %s"
+        )
+        with connections[router.db_for_read(model)].cursor() as cursor:
+            cursor.execute(sql, [tsquery, user.pk, tsquery, limit])
+            return cursor.fetchall()
+
+
+class FallbackSearchBackend:
+    vendor = None
+
+    def install_statements(self, table, columns):
+        return []
+
+    uninstall_statements = rebuild_statements = install_statements
+
+    def search(self, model, user, terms, limit):
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(description__icontains=term)
+        pks = model.objects.filter(condition, user=user).order_by("id").values_list("pk", flat=True)[:limit]
+        return [(pk, 0.0) for pk in pks]
+
+
+BACKENDS = {backend.vendor: backend for backend in (SQLiteFTS5Backend, PostgresSearchBackend)}
+
+
+def get_backend(connection):
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)()
+
+
+def _execute(connection, statements_for):
+    backend = get_backend(connection)
+    with connection.cursor() as cursor:
+        for table, columns in SEARCH_TABLES.items():
+            for statement in statements_for(backend)(table, columns):
+                cursor.execute(statement)
+
+
+def install_search_index(connection):
+    """
+    Creates the index structures if missing. Idempotent, so it is safe to
+    run after every migrate (SQLite table rebuilds drop triggers).
+    """
+    _execute(connection, lambda backend: backend.install_statements)
+
+
+def uninstall_search_index(connection):
+    _execute(connection, lambda backend: backend.uninstall_statements)
+
+
+def rebuild_search_index(connection):
+    install_search_index(connection)
+    _execute(connection, lambda backend: backend.rebuild_statements)
+
+
+def search(user, query, kinds=("tasks", "events"), limit=None):
+    """
+    Returns {kind: [(instance, rank)]} for the user's matching rows, best
+    first, with at most `limit` rows per kind.
+    """
+    terms = query_terms(query)
+    limit = max(1, min(limit or max_results(), max_results()))
+    results = {}
+    for kind in kinds:
+        model = SEARCH_MODELS[kind]
+        backend = get_backend(connections[router.db_for_read(model)])
+        ranked = backend.search(model, user, terms, limit)
+        objects = model.objects.select_related("user").in_bulk([pk for pk, _ in ranked])
+        results[kind] = [(objects[pk], rank) for pk, rank in ranked if pk in objects]
+    return results
@@ -1,15 +1,35 @@
 from rest_framework import serializers
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+from . import recurrence
+from .metrics import timed_serialization
 from .models import Task, Event
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import force_str
+from django.utils import timezone
 
 User = get_user_model()
 
 # --- Task & Event Serializers ---
 
-class TaskSerializer(serializers.ModelSerializer):
+class TimedDataMixin:
+    """
+    Reports building .data to the request's serializer timing.
+    """
+
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+
+class TaskSerializer(TimedDataMixin, serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username')
     priority_display = serializers.CharField(source='get_priority_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -27,6 +47,7 @@ class TaskSerializer(serializers.ModelSerializer):
             'user'
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
 
     def create(self, validated_data):
         user = self.context.get('request').user
@@ -38,15 +59,155 @@ class TaskSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class EventSerializer(serializers.ModelSerializer):
+def iso_datetime_formatter():
+    """
+    Returns a function formatting datetimes exactly like DRF's DateTimeField,
+    with the field and timezone lookups done once instead of per value.
+    """
+    field = serializers.DateTimeField()
+    if (api_settings.DATETIME_FORMAT or '').lower() != ISO_8601:
+        return field.to_representation
+    tz = field.default_timezone()
+
+    def format_datetime(value):
+        if not value:
+            return None
+        value = value.astimezone(tz).isoformat() if tz is not None else field.to_representation(value)
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return format_datetime
+
+
+class TaskRowSerializer:
+    """
+    List-optimized equivalent of TaskSerializer for read-only responses.
+
+    Works on `.values(*TaskRowSerializer.values_fields)` rows instead of model
+    instances, pins "now" once per request for is_overdue/is_upcoming and
+    resolves display labels from prebuilt maps. Output matches TaskSerializer
+    field for field.
+    """
+    values_fields = (
+        'id', 'title', 'description', 'due_date',
+        'created_at', 'updated_at', 'completed',
+        'priority', 'status', 'user__username',
+    )
+
+    def __init__(self, now=None):
+        self.now = now or timezone.now()
+        self.priority_labels = dict(Task.PRIORITY_CHOICES)
+        self.status_labels = dict(Task.STATUS_CHOICES)
+        self.format_datetime = iso_datetime_formatter()
+
+    def to_representation(self, row):
+        fmt = self.format_datetime
+        now = self.now
+        due_date = row['due_date']
+        completed = row['completed']
+        priority = row['priority']
+        status = row['status']
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'due_date': fmt(due_date),
+            'created_at': fmt(row['created_at']),
+            'updated_at': fmt(row['updated_at']),
+            'completed': completed,
+            'priority': priority,
+            'priority_display': self.priority_labels.get(priority, priority),
+            'status': status,
+            'status_display': self.status_labels.get(status, status),
+            'is_overdue': due_date and due_date < now and not completed,
+            'is_upcoming': due_date and due_date >= now and not completed,
+            'user': row['user__username'],
+        }
+
+    def serialize(self, rows):
+        with timed_serialization():
+            return [self.to_representation(row) for row in rows]
+
+
+class EventRowSerializer:
+    """
+    List-optimized equivalent of EventSerializer over `.values()` rows.
+    """
+    values_fields = (
+        'id', 'title', 'description', 'start', 'end', 'all_day',
+        'recurrence_freq', 'recurrence_interval', 'recurrence_until',
+        'recurrence_count', 'recurrence_exdates', 'user__username',
+    )
+
+    def __init__(self):
+        self.format_datetime = iso_datetime_formatter()
+
+    def to_representation(self, row):
+        fmt = self.format_datetime
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'start': fmt(row['start']),
+            'end': fmt(row['end']),
+            'all_day': row['all_day'],
+            'recurrence_freq': row['recurrence_freq'],
+            'recurrence_interval': row['recurrence_interval'],
+            'recurrence_until': fmt(row['recurrence_until']),
+            'recurrence_count': row['recurrence_count'],
+            'recurrence_exdates': row['recurrence_exdates'],
+            'user': row['user__username'],
+        }
+
+    def serialize(self, rows):
+        with timed_serialization():
+            return [self.to_representation(row) for row in rows]
+
+
+class EventSerializer(TimedDataMixin, serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username')
+    recurrence_exdates = serializers.ListField(child=serializers.DateTimeField(), required=False)
 
     class Meta:
         model = Event
         fields = [
-            'id', 'title', 'description', 'start', 'end', 'all_day', 'user'
+            'id', 'title', 'description', 'start', 'end', 'all_day',
+            'recurrence_freq', 'recurrence_interval', 'recurrence_until',
+            'recurrence_count', 'recurrence_exdates', 'user'
         ]
         read_only_fields = ['id', 'user']
+        list_serializer_class = TimedListSerializer
+        extra_kwargs = {
+            'recurrence_interval': {'min_value': 1, 'max_value': recurrence.MAX_INTERVAL},
+            'recurrence_count': {'min_value': 1, 'max_value': recurrence.MAX_COUNT},
+        }
+
+    def validate_recurrence_exdates(self, value):
+        # Stored as ISO strings in the JSON column.
+        return [exdate.isoformat() for exdate in value]
+
+    def validate(self, attrs):
+        def current(name):
+            if name in attrs:
+                return attrs[name]
+            return getattr(self.instance, name, None)
+
+        start, end = current('start'), current('end')
+        if start and end and end < start:
+            raise serializers.ValidationError({'end': "End must not be before start."})
+        if current('recurrence_until') and current('recurrence_count'):
+            raise serializers.ValidationError("Set either recurrence_until or recurrence_count, not both.")
+        if not current('recurrence_freq') and (current('recurrence_until') or current('recurrence_count')):
+            raise serializers.ValidationError({'recurrence_freq': "Required when until or count is given."})
+        if start and end and current('recurrence_count'):
+            rule = Event(**{name: current(name) for name in (
+                'start', 'end', 'recurrence_freq', 'recurrence_interval', 'recurrence_until', 'recurrence_count',
+            )})
+            try:
+                recurrence.series_end(rule)
+            except recurrence.RecurrenceError as e:
+                raise serializers.ValidationError({'recurrence_count': str(e)})
+        return attrs
 
     def create(self, validated_data):
         user = self.context.get('request').user
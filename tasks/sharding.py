@@ -0,0 +1,441 @@
+"""
+User-keyed sharding of task data across DATABASE_SHARDS.
+
+Each user's Task, ArchivedTask, Event, TaskCounter, UserDataVersion,
+Tombstone and ReminderLog rows live together on one shard. Users, auth data, jobs and
+the shard map itself stay on the default database, which is also shard 0.
+
+Shard map: a ShardAssignment row (on default) records where each user's
+data lives. New users are placed by rendezvous hashing over the configured
+shards, which is deterministic and, when a shard is added, only assigns the
+new shard a fair share of users; existing users stay put until
+`rebalance_shards` moves them. Lookups are cached per process for
+SHARD_MAP_CACHE_TTL seconds.
+
+Moves: a user being moved is flagged in the shard map, and the router
+refuses writes routed for them (UserMoving, a 503) until the move ends.
+Since other processes only see the flag once their cached lookup expires,
+a move waits SHARD_MAP_CACHE_TTL after flagging before copying, and again
+after the switch before deleting the source copy that stale readers may
+still be using. Users are moved in batches so those waits are shared.
+
+Routing: ShardRouter sends sharded models to
+  * the shard of the instance (or its user) for instance-based operations,
+  * the shard pinned by using_shard()/using_user_shard(), if any,
+  * the shard of the authenticated user of the current request,
+  * and otherwise the default database.
+Code that touches task data outside a request (commands, job handlers)
+must pin a shard with one of the context managers or use .using().
+
+A user's row is copied onto their shard when they are placed there, and
+again whenever it is saved, so foreign keys to auth_user hold on every
+shard and joined user fields stay current. Task and Event ids are
+allocated from a separate range on each shard (SHARD_ID_SPACING apart) so
+they stay unique when users move.
+"""
+import copy
+import hashlib
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.utils import timezone
+from rest_framework import exceptions
+
+from .db_router import _current_request, _resolved_user
+from .lru import LRUCache
+
+SHARDED_MODELS = {
+    "task", "archivedtask", "event", "taskcounter", "userdataversion", "tombstone", "reminderlog",
+}
+
+_pinned_shard = ContextVar("pinned_shard", default=None)
+_pinned_user = ContextVar("pinned_user", default=None)
+_assignments = None
+
+
+class ShardMoveError(Exception):
+    pass
+
+
+class UserMoving(exceptions.APIException):
+    status_code = 503
+    default_detail = "This account is being moved; retry in a minute."
+    default_code = "user_moving"
+
+
+def shard_aliases():
+    return getattr(settings, "DATABASE_SHARDS", [DEFAULT_DB_ALIAS])
+
+
+def sharding_enabled():
+    return len(shard_aliases()) > 1
+
+
+def shard_map_cache_ttl():
+    return getattr(settings, "SHARD_MAP_CACHE_TTL", 60)
+
+
+def shard_id_spacing():
+    return getattr(settings, "SHARD_ID_SPACING", 2 ** 40)
+
+
+def is_sharded(model):
+    return model._meta.app_label == "tasks" and model._meta.model_name in SHARDED_MODELS
+
+
+# --- Shard map ---
+
+def hash_shard(user_id, aliases=None):
+    """
+    Rendezvous placement: the alias with the highest hash of (alias, user).
+    """
+    aliases = aliases or shard_aliases()
+    return max(aliases, key=lambda alias: hashlib.sha1(f"{alias}:{user_id}".encode()).digest())
+
+
+def _assignment_cache():
+    global _assignments
+    if _assignments is None:
+        _assignments = LRUCache(maxsize=100000, ttl=shard_map_cache_ttl())
+    return _assignments
+
+
+def assigned_shard(user_id):
+    """
+    Reads the user's recorded shard from the directory, bypassing the cache.
+    """
+    from .models import ShardAssignment
+    return (
+        ShardAssignment.objects.using(DEFAULT_DB_ALIAS)
+        .filter(user_id=user_id).values_list("shard", flat=True).first()
+    )
+
+
+def _placement(user_id):
+    """
+    Returns (alias, moving) for the user, cached for SHARD_MAP_CACHE_TTL.
+    """
+    from .models import ShardAssignment
+    cache = _assignment_cache()
+    placement = cache.get(user_id)
+    if placement is None:
+        recorded = (
+            ShardAssignment.objects.using(DEFAULT_DB_ALIAS)
+            .filter(user_id=user_id).values_list("shard", "moving").first()
+        )
+        placement = recorded or (hash_shard(user_id), False)
+        cache.set(user_id, placement)
+    return placement
+
+
+def shard_for_user(user_id):
+    if not sharding_enabled():
+        return DEFAULT_DB_ALIAS
+    return _placement(user_id)[0]
+
+
+def user_is_moving(user_id):
+    return sharding_enabled() and _placement(user_id)[1]
+
+
+def group_by_shard(user_ids):
+    """
+    Returns {alias: [user_id, ...]} for the given users.
+    """
+    user_ids = list(user_ids)
+    if not sharding_enabled():
+        return {DEFAULT_DB_ALIAS: user_ids} if user_ids else {}
+    from .models import ShardAssignment
+    recorded = dict(
+        ShardAssignment.objects.using(DEFAULT_DB_ALIAS)
+        .filter(user_id__in=user_ids).values_list("user_id", "shard")
+    )
+    groups = {}
+    for user_id in user_ids:
+        groups.setdefault(recorded.get(user_id) or hash_shard(user_id), []).append(user_id)
+    return groups
+
+
+def forget_assignments():
+    global _assignments
+    _assignments = None
+
+
+def forget_assignment(user_id):
+    if _assignments is not None:
+        _assignments.delete(user_id)
+
+
+def place_user(user):
+    """
+    Records a new user's shard and copies their row there.
+    """
+    from .models import ShardAssignment
+    alias = hash_shard(user.pk) if sharding_enabled() else DEFAULT_DB_ALIAS
+    ShardAssignment.objects.using(DEFAULT_DB_ALIAS).get_or_create(user_id=user.pk, defaults={"shard": alias})
+    mirror_user(user, alias)
+    return alias
+
+
+def mirror_user(user, alias):
+    """
+    Saves a copy of the user's row on alias, inserting or updating it.
+    """
+    if alias == DEFAULT_DB_ALIAS:
+        return
+    copied = copy.copy(user)
+    copied._state = copy.copy(user._state)
+    copied.save(using=alias)
+
+
+def drop_mirrored_user(user_id, alias):
+    """
+    Deletes a user's copy on alias, cascading to all of their rows there.
+    """
+    if alias != DEFAULT_DB_ALIAS:
+        get_user_model().objects.using(alias).filter(pk=user_id).delete()
+
+
+# --- Routing ---
+
+@contextmanager
+def using_shard(alias):
+    """
+    Routes sharded models to alias inside the block.
+    """
+    token = _pinned_shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _pinned_shard.reset(token)
+
+
+@contextmanager
+def using_user_shard(user_id):
+    """
+    Routes sharded models to the user's shard inside the block, with writes
+    checked against a move in progress like a request's.
+    """
+    token = _pinned_user.set(user_id)
+    try:
+        with using_shard(shard_for_user(user_id)) as alias:
+            yield alias
+    finally:
+        _pinned_user.reset(token)
+
+
+def current_shard():
+    pinned = _pinned_shard.get()
+    if pinned is not None:
+        return pinned
+    request = _current_request.get()
+    user = _resolved_user(request) if request is not None else None
+    if user is not None:
+        return shard_for_user(user.pk)
+    return None
+
+
+def _write_owner(hints):
+    instance = hints.get("instance")
+    if instance is not None:
+        if isinstance(instance, get_user_model()):
+            return instance.pk
+        return getattr(instance, "user_id", None)
+    pinned = _pinned_user.get()
+    if pinned is not None:
+        return pinned
+    request = _current_request.get()
+    user = _resolved_user(request) if request is not None else None
+    return user.pk if user is not None else None
+
+
+class ShardRouter:
+    def _shard_for(self, model, hints):
+        if not sharding_enabled() or not is_sharded(model):
+            return None
+        instance = hints.get("instance")
+        if instance is not None:
+            if is_sharded(type(instance)):
+                if instance._state.db in shard_aliases():
+                    return instance._state.db
+                owner = getattr(instance, "user_id", None)
+                if owner is not None:
+                    return shard_for_user(owner)
+            elif isinstance(instance, get_user_model()):
+                return shard_for_user(instance.pk)
+        return current_shard() or DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        return self._shard_for(model, hints)
+
+    def db_for_write(self, model, **hints):
+        alias = self._shard_for(model, hints)
+        if alias is not None:
+            owner = _write_owner(hints)
+            if owner is not None and user_is_moving(owner):
+                raise UserMoving()
+        return alias
+
+
+# --- Id ranges ---
+
+ID_RANGED_MODELS = ("task", "event")
+
+
+def reserve_id_range(using):
+    """
+    Starts Task and Event ids on the n-th shard at n * SHARD_ID_SPACING.
+    """
+    if using not in shard_aliases():
+        return
+    floor = shard_aliases().index(using) * shard_id_spacing()
+    if not floor:
+        return
+    from django.apps import apps
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for name in ID_RANGED_MODELS:
+            table = apps.get_model("tasks", name)._meta.db_table
+            if connection.vendor == "sqlite":
+                cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, %s) WHERE name = %s", [floor, table])
+                if not cursor.rowcount:
+                    cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)", [table, floor])
+            elif connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                    f"GREATEST(%s, (SELECT COALESCE(MAX(id), 0) FROM {connection.ops.quote_name(table)})))",
+                    [table, floor],
+                )
+
+
+# --- Moving users ---
+
+def _copy_rows(model, source, target, **lookup):
+    # Plain QuerySets skip the counter/version side effects of the models'
+    # own querysets; counters and versions are rebuilt afterwards.
+    rows = list(models.QuerySet(model, using=source).filter(**lookup).order_by("pk"))
+    # Task and Event ids are unique across shards, and archived tasks keep
+    # their task's id; other rows get new ids on the target.
+    keep_pk = model._meta.model_name in ID_RANGED_MODELS or not model._meta.pk.auto_created
+    for row in rows:
+        if not keep_pk:
+            row.pk = None
+        row._state.db = target
+    models.QuerySet(model, using=target).bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def _delete_rows(model, alias, **lookup):
+    models.QuerySet(model, using=alias).filter(**lookup).delete()
+
+
+def _set_moving(user_ids, moving):
+    from .models import ShardAssignment
+    ShardAssignment.objects.using(DEFAULT_DB_ALIAS).filter(user_id__in=user_ids).update(moving=moving)
+    for user_id in user_ids:
+        forget_assignment(user_id)
+
+
+def _wait_for_shard_map(sleep):
+    # Every process has re-read the shard map once its cached entries expire.
+    sleep(shard_map_cache_ttl())
+
+
+def _copy_user(user_id, source, target):
+    from .models import ArchivedTask, Event, ReminderLog, ShardAssignment, Task, TaskCounter, Tombstone, UserDataVersion
+
+    def version():
+        return models.QuerySet(UserDataVersion, using=source).filter(user_id=user_id).values_list(
+            "version", flat=True
+        ).first() or 0
+
+    before = version()
+    mirror_user(get_user_model().objects.using(DEFAULT_DB_ALIAS).get(pk=user_id), target)
+    with transaction.atomic(using=target):
+        copied = sum(
+            _copy_rows(model, source, target, user_id=user_id) for model in (Task, ArchivedTask, Event, Tombstone)
+        )
+        copied += _copy_rows(ReminderLog, source, target, task__user_id=user_id)
+        TaskCounter.rebuild([user_id], using=target)
+        models.QuerySet(UserDataVersion, using=target).update_or_create(
+            user_id=user_id, defaults={"version": before + 1, "modified_at": timezone.now()},
+        )
+        # Writes are refused while the user is flagged; this catches any
+        # that were already under way when the flag was set.
+        if version() != before:
+            raise ShardMoveError(f"User {user_id} changed data during the move; retry later.")
+    ShardAssignment.objects.using(DEFAULT_DB_ALIAS).filter(user_id=user_id).update(shard=target, moving=False)
+    forget_assignment(user_id)
+    return copied
+
+
+def _drop_source_copy(user_id, source):
+    from .models import ArchivedTask, Event, Task, TaskCounter, Tombstone, UserDataVersion
+    with transaction.atomic(using=source):
+        if source == DEFAULT_DB_ALIAS:
+            for model in (Task, ArchivedTask, Event, Tombstone, TaskCounter, UserDataVersion):
+                _delete_rows(model, source, user_id=user_id)
+        else:
+            drop_mirrored_user(user_id, source)
+
+
+def move_users(moves, sleep=time.sleep):
+    """
+    Moves each (user_id, target) in moves: flags the users as moving, waits
+    out the shard map cache, copies each user's data to its target and
+    repoints the shard map, then waits again before deleting the source
+    copies. Returns {user_id: rows copied, or the ShardMoveError raised};
+    a user already on its target copies 0 rows.
+    """
+    from .models import ShardAssignment
+    results, sources = {}, {}
+    for user_id, target in moves:
+        if target not in shard_aliases():
+            results[user_id] = ShardMoveError(f"Unknown shard {target!r}.")
+            continue
+        source = assigned_shard(user_id) or DEFAULT_DB_ALIAS
+        if source == target:
+            results[user_id] = 0
+        elif not get_user_model().objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id).exists():
+            results[user_id] = ShardMoveError(f"No user with id {user_id}.")
+        else:
+            ShardAssignment.objects.using(DEFAULT_DB_ALIAS).get_or_create(user_id=user_id, defaults={"shard": source})
+            sources[user_id] = (source, target)
+    if not sources:
+        return results
+
+    _set_moving(list(sources), True)
+    moved = []
+    try:
+        _wait_for_shard_map(sleep)
+        for user_id, (source, target) in sources.items():
+            try:
+                results[user_id] = _copy_user(user_id, source, target)
+            except ShardMoveError as e:
+                results[user_id] = e
+            else:
+                moved.append(user_id)
+    finally:
+        # Users not switched over stay on their source; lift the flag.
+        _set_moving([user_id for user_id in sources if user_id not in moved], False)
+
+    if moved:
+        # Processes that cached the old placement still read from the source.
+        _wait_for_shard_map(sleep)
+        for user_id in moved:
+            _drop_source_copy(user_id, sources[user_id][0])
+    return results
+
+
+def move_user(user_id, target, sleep=time.sleep):
+    """
+    Moves one user; see move_users. Returns the number of rows copied and
+    raises ShardMoveError if the move failed (nothing is changed).
+    """
+    result = move_users([(user_id, target)], sleep=sleep)[user_id]
+    if isinstance(result, ShardMoveError):
+        raise result
+    return result
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    # Covers password resets (set_password + save) and deactivation.
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def place_new_user(sender, instance, created, using, raw=False, **kwargs):
+    if raw or using != DEFAULT_DB_ALIAS:
+        return
+    from .sharding import assigned_shard, mirror_user, place_user, sharding_enabled
+    if created:
+        place_user(instance)
+    elif sharding_enabled():
+        # Keep the shard's copy current for joins such as user__username.
+        mirror_user(instance, assigned_shard(instance.pk) or DEFAULT_DB_ALIAS)
+
+
+@receiver(pre_delete, sender=User)
+def find_sharded_user(sender, instance, using, **kwargs):
+    # Read the directory now: the cascade deletes the ShardAssignment row
+    # before post_delete, and the cached or hashed placement may be stale.
+    from .sharding import assigned_shard, sharding_enabled
+    if using == DEFAULT_DB_ALIAS and sharding_enabled():
+        instance._data_shard = assigned_shard(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def drop_sharded_user(sender, instance, using, **kwargs):
+    # The user's rows on another shard aren't reached by the cascade.
+    from .sharding import drop_mirrored_user, forget_assignment
+    shard = getattr(instance, "_data_shard", None)
+    if using == DEFAULT_DB_ALIAS and shard:
+        forget_assignment(instance.pk)
+        drop_mirrored_user(instance.pk, shard)
+
+
+def reserve_shard_ids(sender, using, **kwargs):
+    from .sharding import reserve_id_range
+    reserve_id_range(using)
+
+
+def ensure_search_index(sender, using, **kwargs):
+    # SQLite table rebuilds in later migrations drop the FTS triggers;
+    # recreate anything missing once migrate has finished.
+    from .search import install_search_index
+    connection = connections[using]
+    if ("tasks", "0012_search_index") in MigrationRecorder(connection).applied_migrations():
+        install_search_index(connection)
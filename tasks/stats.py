@@ -0,0 +1,130 @@
+import asyncio
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Task, TaskCounter
+
+
+def priority_breakdown(stats):
+    """
+    Builds the insights list of {"priority": label, "count": n} from the
+    counters, skipping priorities the user has no tasks for. Rows come in
+    priority-code order, as the grouped query below returns them.
+    """
+    priority_map = dict(Task.PRIORITY_CHOICES)
+    fields = TaskCounter.PRIORITY_FIELDS
+    counts = [(priority_map[code], stats[fields[code]]) for code in sorted(fields)]
+    return [{"priority": label, "count": count} for label, count in counts if count]
+
+
+def _priority_groups(user):
+    return Task.objects.filter(user=user).values("priority").annotate(count=Count("id"))
+
+
+def _grouped_breakdown(groups):
+    priority_map = dict(Task.PRIORITY_CHOICES)
+    return [
+        {"priority": priority_map.get(item["priority"], "Unknown"), "count": item["count"]}
+        for item in groups
+    ]
+
+
+def _upcoming_queryset(user, now=None):
+    now = now or timezone.now()
+    return Task.objects.filter(
+        user=user,
+        due_date__gt=now,
+        due_date__lte=now + timedelta(days=7),
+    ).exclude(status='completed').only("id", "title", "due_date", "description")
+
+
+def _upcoming_entry(task):
+    return {
+        "id": task.id,
+        "title": task.title,
+        "due_date": task.due_date.isoformat() if task.due_date else None,
+        "description": task.description,
+    }
+
+
+def upcoming_tasks(user, now=None):
+    """
+    Returns the user's open tasks due within the next seven days.
+    """
+    return [_upcoming_entry(t) for t in _upcoming_queryset(user, now)]
+
+
+async def aupcoming_tasks(user, now=None):
+    return [_upcoming_entry(t) async for t in _upcoming_queryset(user, now)]
+
+
+def stored_task_stats(user):
+    """
+    Returns the time-independent counters (total, completed, pending,
+    per-priority) from the user's TaskCounter row rather than the Task table.
+    """
+    return TaskCounter.for_user(user).as_dict()
+
+
+async def astored_task_stats(user):
+    try:
+        counter = await TaskCounter.objects.aget(pk=user.pk)
+    except TaskCounter.DoesNotExist:
+        # First access builds the row; rare enough to run in a thread.
+        counter = await sync_to_async(TaskCounter.for_user)(user)
+    return counter.as_dict()
+
+
+def _dashboard(stats, upcoming):
+    return {
+        "total": stats["total"],
+        "completed": stats["completed"],
+        "pending": stats["pending"],
+        "upcoming": upcoming,
+    }
+
+
+def _task_stats(stats):
+    return {
+        "high_priority": stats["high_priority"],
+        "medium_priority": stats["medium_priority"],
+        "low_priority": stats["low_priority"],
+        "completed": stats["completed"],
+        "pending": stats["pending"],
+    }
+
+
+def dashboard_payload(user):
+    return _dashboard(stored_task_stats(user), upcoming_tasks(user))
+
+
+async def adashboard_payload(user):
+    # The counter row and the upcoming list are independent queries.
+    stats, upcoming = await asyncio.gather(astored_task_stats(user), aupcoming_tasks(user))
+    return _dashboard(stats, upcoming)
+
+
+def task_stats_payload(user):
+    return _task_stats(stored_task_stats(user))
+
+
+async def atask_stats_payload(user):
+    return _task_stats(await astored_task_stats(user))
+
+
+def insights_payload(user):
+    stats = stored_task_stats(user)
+    if stats["unknown_priority"]:
+        # The counter lumps NULL, "" and unrecognised codes together, while
+        # insights lists each of them as its own "Unknown" group.
+        return {"data": _grouped_breakdown(_priority_groups(user))}
+    return {"data": priority_breakdown(stats)}
+
+
+async def ainsights_payload(user):
+    stats = await astored_task_stats(user)
+    if stats["unknown_priority"]:
+        return {"data": _grouped_breakdown([item async for item in _priority_groups(user)])}
+    return {"data": priority_breakdown(stats)}
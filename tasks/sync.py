@@ -0,0 +1,162 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Task, Event, Tombstone
+from .serializers import TaskSerializer, EventSerializer
+from .sharding import shard_aliases, shard_for_user
+
+TOKEN_SALT = "tasks.sync"
+
+# Rows are stamped with updated_at before their transaction commits, so a
+# slow writer can become visible after a client has synced past its stamp.
+# Drained streams restart this far in the past; clients upsert by id, so the
+# occasional re-sent row is harmless.
+SYNC_SAFETY_WINDOW = timedelta(seconds=5)
+
+
+class SyncTokenError(ValueError):
+    pass
+
+
+class SyncTokenExpired(SyncTokenError):
+    pass
+
+
+def page_size():
+    return getattr(settings, "SYNC_PAGE_SIZE", 500)
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+
+
+def encode_token(position):
+    return signing.dumps(position, salt=TOKEN_SALT, compress=True)
+
+
+def decode_token(token, user):
+    """
+    Returns the stream positions stored in a sync token, or None for a first
+    sync. Rejects tokens from another user or older than tombstone retention.
+    """
+    if not token:
+        return None
+    try:
+        position = signing.loads(token, salt=TOKEN_SALT)
+    except signing.BadSignature:
+        raise SyncTokenError("Invalid sync token.")
+    if position.get("user") != user.pk:
+        raise SyncTokenError("Invalid sync token.")
+    # Tombstone ids are per shard, so a token can't follow a user who moved.
+    if position.get("shard", "default") != shard_for_user(user.pk):
+        raise SyncTokenExpired("Sync token expired; a full resync is required.")
+    issued = parse_datetime(position.get("issued") or "")
+    if issued is None or timezone.now() - issued > tombstone_retention():
+        raise SyncTokenExpired("Sync token expired; a full resync is required.")
+    return position
+
+
+def _changed_rows(queryset, position, limit):
+    """
+    Keyset page over (updated_at, id) after position. Returns (rows, new
+    position, truncated).
+    """
+    if position:
+        stamp, last_id = parse_datetime(position[0]), position[1]
+        queryset = queryset.filter(Q(updated_at__gt=stamp) | Q(updated_at=stamp, id__gt=last_id))
+    rows = list(queryset.order_by("updated_at", "id")[:limit + 1])
+    truncated = len(rows) > limit
+    rows = rows[:limit]
+    if truncated:
+        last = rows[-1]
+        return rows, [last.updated_at.isoformat(), last.id], True
+    restart = timezone.now() - SYNC_SAFETY_WINDOW
+    return rows, [restart.isoformat(), 0], False
+
+
+def _tombstone_restart(user, upto):
+    """
+    Tombstone id a drained stream resumes after: the newest one at or below
+    upto that is older than the safety window. Ids are taken before commit
+    too, so a slow delete can surface below an id the client has passed.
+    """
+    cutoff = timezone.now() - SYNC_SAFETY_WINDOW
+    return (
+        Tombstone.objects.filter(user=user, id__lte=upto, deleted_at__lt=cutoff)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    ) or 0
+
+
+def changes_payload(user, token, context=None):
+    """
+    Returns tasks and events changed since the token, tombstones for rows
+    deleted since then, and the token to send next time. With no token the
+    first page of a full sync is returned.
+    """
+    position = decode_token(token, user) or {}
+    limit = page_size()
+
+    tasks, task_position, tasks_more = _changed_rows(
+        Task.objects.filter(user=user).select_related("user"), position.get("tasks"), limit,
+    )
+    events, event_position, events_more = _changed_rows(
+        Event.objects.filter(user=user).select_related("user"), position.get("events"), limit,
+    )
+
+    deleted = {"tasks": [], "events": []}
+    tombstone_position = position.get("tombstones", 0)
+    tombstones_more = False
+    if position:
+        tombstones = list(
+            Tombstone.objects.filter(user=user, id__gt=tombstone_position)
+            .order_by("id")
+            .values_list("id", "kind", "object_id")[:limit + 1]
+        )
+        tombstones_more = len(tombstones) > limit
+        for tombstone_id, kind, object_id in tombstones[:limit]:
+            deleted[f"{kind}s"].append(object_id)
+            tombstone_position = tombstone_id
+        if not tombstones_more:
+            tombstone_position = _tombstone_restart(user, tombstone_position)
+    else:
+        # A full sync starts after every existing tombstone, less those
+        # still inside the safety window.
+        latest = Tombstone.objects.filter(user=user).order_by("-id").values_list("id", flat=True).first()
+        tombstone_position = _tombstone_restart(user, latest or 0)
+
+    has_more = tasks_more or events_more or tombstones_more
+    now = timezone.now().isoformat()
+    next_token = encode_token({
+        "user": user.pk,
+        "shard": shard_for_user(user.pk),
+        # Mid-stream pages keep the original issue time so expiry still
+        # reflects the oldest tombstone the client has yet to receive.
+        "issued": position.get("issued", now) if has_more else now,
+        "tasks": task_position,
+        "events": event_position,
+        "tombstones": tombstone_position,
+    })
+    return {
+        "tasks": TaskSerializer(tasks, many=True, context=context).data,
+        "events": EventSerializer(events, many=True, context=context).data,
+        "deleted": deleted,
+        "sync_token": next_token,
+        "has_more": has_more,
+    }
+
+
+def prune_tombstones(now=None):
+    """
+    Deletes tombstones older than the retention window. Returns the count.
+    """
+    cutoff = (now or timezone.now()) - tombstone_retention()
+    deleted = 0
+    for alias in shard_aliases():
+        deleted += Tombstone.objects.using(alias).filter(deleted_at__lt=cutoff).delete()[0]
+    return deleted
@@ -1,3 +1,1270 @@
-from django.test import TestCase
+import csv
+import json
+import time
+from io import StringIO
+from unittest import mock, skipUnless
+from datetime import timedelta
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import HttpResponse, QueryDict
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from . import urls as tasks_urls
+from .archive import archive_completed_tasks
+from .authentication import CachedJWTAuthentication, get_user_cache
+from .db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware, check_replica, mark_replica, reset_routing_state
+from .filters import TaskFilter
+from .jobs import claim_jobs, enqueue, register_job, run_job, work
+from .models import ArchivedTask, Event, Job, ReminderLog, ShardAssignment, Task, TaskCounter, Tombstone, UserDataVersion
+from .metrics import RESPONSE_CACHE_LOOKUPS, PerformanceMiddleware, timed_serialization
+from .reminders import ReminderScheduler, TimerWheel
+from .serializers import TaskRowSerializer, TaskSerializer
+from .sharding import (
+    ShardMoveError, ShardRouter, UserMoving, forget_assignments, hash_shard, move_users, shard_for_user,
+    using_user_shard,
+)
+from .sync import SyncTokenExpired, decode_token, encode_token
+from .response_cache import reset_response_cache
+from .throttling import LocalBucketStore, get_hashing_limiter, reset_throttles
+from .urls import async_read_urlpatterns
+
+User = get_user_model()
+
+
+class StatsEndpointTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pass12345")
+        other = User.objects.create_user(username="bob", email="bob@example.com", password="pass12345")
+        now = timezone.now()
+        Task.objects.create(user=self.user, title="a", priority="H", due_date=now + timedelta(days=2))
+        Task.objects.create(user=self.user, title="b", priority="H", completed=True)
+        Task.objects.create(user=self.user, title="c", priority="L", due_date=now - timedelta(days=1))
+        Task.objects.create(user=self.user, title="d")
+        Task.objects.create(user=other, title="e", priority="M")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_dashboard_stats(self):
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/dashboard/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], 4)
+        self.assertEqual(response.data["completed"], 1)
+        self.assertEqual(response.data["pending"], 3)
+        self.assertEqual([t["title"] for t in response.data["upcoming"]], ["a"])
+
+    def test_task_stats(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/task-stats/")
+        self.assertEqual(response.data, {
+            "high_priority": 2,
+            "medium_priority": 0,
+            "low_priority": 1,
+            "completed": 1,
+            "pending": 3,
+        })
+
+    def test_insights(self):
+        Task.objects.filter(title="d").update(priority="M")
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/insights/")
+        self.assertEqual(response.data, {"data": [
+            {"priority": "High", "count": 2},
+            {"priority": "Low", "count": 1},
+            {"priority": "Medium", "count": 1},
+        ]})
+
+    def test_insights_lists_each_unknown_priority(self):
+        Task.objects.create(user=self.user, title="f", priority="")
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/insights/")
+        self.assertEqual(response.data, {"data": [
+            {"priority": "Unknown", "count": 1},
+            {"priority": "Unknown", "count": 1},
+            {"priority": "High", "count": 2},
+            {"priority": "Low", "count": 1},
+        ]})
+
+    def test_conditional_get_returns_304_until_data_changes(self):
+        UserDataVersion.objects.filter(user=self.user).update(modified_at=timezone.now() - timedelta(seconds=5))
+        response = self.client.get("/api/task-stats/")
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/task-stats/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Event.objects.create(user=self.user, title="x", start=timezone.now(), end=timezone.now())
+        response = self.client.get("/api/task-stats/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+    def test_last_modified_waits_for_the_second_to_pass(self):
+        response = self.client.get("/api/task-stats/")
+        self.assertFalse(response.has_header("Last-Modified"))
+        # A client holding a date from the same second is never told 304.
+        since = http_date(int(UserDataVersion.objects.get(user=self.user).modified_at.timestamp()))
+        Task.objects.create(user=self.user, title="same second")
+        response = self.client.get("/api/task-stats/", HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_get_does_not_write(self):
+        newcomer = User.objects.create_user(username="nia", email="nia@example.com", password="pass12345")
+        UserDataVersion.objects.filter(user=newcomer).delete()
+        self.client.force_authenticate(newcomer)
+        etag = self.client.get("/api/task-stats/")["ETag"]
+        response = self.client.get("/api/task-stats/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(UserDataVersion.objects.filter(user=newcomer).exists())
+
+
+# URLconf for AsyncReadEndpointTests: the async read views as asgi.py routes them.
+urlpatterns = [path("api/", include(async_read_urlpatterns + tasks_urls.urlpatterns))]
+
+
+@override_settings(ROOT_URLCONF="tasks.tests")
+class AsyncReadEndpointTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="ava", email="ava@example.com", password="pass12345")
+        Task.objects.create(user=self.user, title="soon", due_date=timezone.now() + timedelta(days=1))
+        Event.objects.create(user=self.user, title="call", start="2026-03-05T10:00:00Z", end="2026-03-05T11:00:00Z")
+        self.auth = {"authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def test_read_endpoints_under_asgi(self):
+        response = await self.async_client.get("/api/dashboard/", headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t["title"] for t in response.json()["upcoming"]], ["soon"])
+
+        response = await self.async_client.get("/api/tasks/", {"status": "pending"}, headers=self.auth)
+        self.assertEqual([t["title"] for t in response.json()["results"]], ["soon"])
+
+        response = await self.async_client.get("/api/events/", headers=self.auth)
+        self.assertEqual([e["title"] for e in response.json()], ["call"])
+
+        etag = response["ETag"]
+        response = await self.async_client.get("/api/events/", headers={**self.auth, "if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(PERF_SERVER_TIMING=True)
+    async def test_queries_are_timed_in_async_views(self):
+        response = await self.async_client.get("/api/task-stats/", headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('desc="0 queries"', response["Server-Timing"])
+
+    async def test_uses_drf_request_handling(self):
+        # Content negotiation and method checks behave as on the sync views.
+        response = await self.async_client.get("/api/dashboard/", headers={**self.auth, "accept": "text/csv"})
+        self.assertEqual(response.status_code, 406)
+        response = await self.async_client.post("/api/dashboard/", headers=self.auth)
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response.json(), {"detail": 'Method "POST" not allowed.'})
+
+    async def test_options(self):
+        response = await self.async_client.options("/api/dashboard/", headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], "Dashboard Stats Async")
+        self.assertEqual(response["Allow"], "GET, OPTIONS")
+        response = await self.async_client.get("/api/events/", headers=self.auth)
+        self.assertEqual(set(response["Allow"].split(", ")), {"GET", "POST", "OPTIONS"})
+
+    @override_settings(DISABLE_AUTH_FOR_TESTING=True)
+    async def test_auth_disabled_for_testing(self):
+        response = await self.async_client.get("/api/task-stats/")
+        self.assertEqual(response.status_code, 200)
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get("/api/task-stats/")
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+    def test_writes_fall_back_to_sync_views(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post("/api/tasks/", {"title": "new"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        response = client.post("/api/events/", {"title": "e", "start": "2026-03-06T10:00:00Z", "end": "2026-03-06T11:00:00Z"}, format="json")
+        self.assertEqual(response.status_code, 201)
+
+
+class TaskCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="carol", email="carol@example.com", password="pass12345")
+
+    def assertCountersMatchTable(self):
+        stored = TaskCounter.objects.get(pk=self.user.pk).as_dict()
+        actual = TaskCounter.count_rows(Task.objects.filter(user=self.user)).get(self.user.pk, {})
+        self.assertEqual(stored, {f: actual.get(f, 0) for f in TaskCounter.COUNTER_FIELDS})
+
+    def test_counters_follow_every_write_path(self):
+        task = Task.objects.create(user=self.user, title="a", priority="H")
+        self.assertCountersMatchTable()
+
+        task.completed = True
+        task.save()
+        self.assertEqual(TaskCounter.objects.get(pk=self.user.pk).completed, 1)
+        self.assertCountersMatchTable()
+
+        Task.objects.bulk_create([Task(user=self.user, title=str(i), priority="L") for i in range(3)])
+        self.assertCountersMatchTable()
+
+        Task.objects.filter(user=self.user, priority="L").update(status="in_progress")
+        self.assertCountersMatchTable()
+
+        tasks = list(Task.objects.filter(user=self.user, priority="L"))
+        for t in tasks:
+            t.priority = "M"
+        Task.objects.bulk_update(tasks, ["priority"])
+        self.assertCountersMatchTable()
+
+        Task.objects.filter(user=self.user, priority="M")[:1].get().delete()
+        Task.objects.filter(user=self.user, completed=True).delete()
+        self.assertEqual(TaskCounter.objects.get(pk=self.user.pk).total, 2)
+        self.assertCountersMatchTable()
+
+    @mock.patch("tasks.models.PK_BATCH_SIZE", 2)
+    def test_bulk_updates_count_in_batches(self):
+        other = User.objects.create_user(username="dora", email="dora@example.com", password="pass12345")
+        Task.objects.bulk_create([Task(user=self.user, title=str(i), priority="L") for i in range(5)])
+        Task.objects.filter(user=self.user).update(status="in_progress")
+        self.assertCountersMatchTable()
+
+        before = UserDataVersion.for_user(other).version
+        Task.objects.filter(user=self.user).update(user=other)
+        self.assertEqual(TaskCounter.objects.get(pk=self.user.pk).total, 0)
+        self.assertEqual(TaskCounter.objects.get(pk=other.pk).in_progress, 5)
+        self.assertEqual(UserDataVersion.for_user(other).version, before + 1)
+
+    def test_rebuild_command_repairs_stale_counters(self):
+        Task.objects.create(user=self.user, title="a")
+        TaskCounter.objects.filter(pk=self.user.pk).update(total=10)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_task_counters", verify=True, stdout=StringIO())
+        call_command("rebuild_task_counters", stdout=StringIO())
+        call_command("rebuild_task_counters", verify=True, stdout=StringIO())
+        self.assertCountersMatchTable()
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="dave", email="dave@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_window_is_required(self):
+        response = self.client.get("/api/calendar/feed/")
+        self.assertEqual(response.status_code, 400)
+
+    def test_merges_tasks_and_events_in_window(self):
+        Task.objects.create(user=self.user, title="in", due_date="2026-03-10T09:00:00Z")
+        Task.objects.create(user=self.user, title="out", due_date="2026-04-10T09:00:00Z")
+        Event.objects.create(user=self.user, title="spanning", start="2026-02-27T00:00:00Z", end="2026-03-02T00:00:00Z")
+        Event.objects.create(user=self.user, title="meeting", start="2026-03-05T10:00:00Z", end="2026-03-05T11:00:00Z")
+        Event.objects.create(user=self.user, title="earlier", start="2026-02-01T10:00:00Z", end="2026-02-01T11:00:00Z")
+
+        response = self.client.get("/api/calendar/feed/", {"start": "2026-03-01", "end": "2026-04-01"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(item["type"], item["title"]) for item in response.data["items"]],
+            [("event", "spanning"), ("event", "meeting"), ("task", "in")],
+        )
+
+    def test_window_finds_long_events_and_series_started_long_before(self):
+        Event.objects.create(user=self.user, title="sabbatical", start="2026-01-01T00:00:00Z", end="2026-03-15T00:00:00Z")
+        Event.objects.create(
+            user=self.user, title="standup", start="2026-01-05T09:00:00Z", end="2026-01-05T09:15:00Z",
+            recurrence_freq="WEEKLY",
+        )
+        Event.objects.create(
+            user=self.user, title="finished", start="2026-01-06T09:00:00Z", end="2026-01-06T09:15:00Z",
+            recurrence_freq="WEEKLY", recurrence_count=2,
+        )
+
+        response = self.client.get("/api/calendar/feed/", {"start": "2026-03-02", "end": "2026-03-03"})
+        self.assertEqual(
+            [item["title"] for item in response.data["items"]], ["sabbatical", "standup"],
+        )
+
+    def test_unwindowed_calendar_keeps_newest_first(self):
+        Task.objects.create(user=self.user, title="older", due_date="2026-02-01T09:00:00Z")
+        Task.objects.create(user=self.user, title="newer", due_date="2026-03-01T09:00:00Z")
+        response = self.client.get("/api/calendar/")
+        self.assertEqual([item["title"] for item in response.data], ["newer", "older"])
+
+
+class RecurringEventTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="rita", email="rita@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_weekly_rule_expands_only_inside_window(self):
+        response = self.client.post("/api/events/", {
+            "title": "standup", "start": "2025-01-06T09:00:00Z", "end": "2025-01-06T09:30:00Z",
+            "recurrence_freq": "WEEKLY", "recurrence_exdates": ["2026-03-09T09:00:00Z"],
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Event.objects.count(), 1)
+
+        response = self.client.get("/api/calendar/feed/", {"start": "2026-03-01", "end": "2026-03-24"})
+        self.assertEqual(
+            [item["start"] for item in response.data["items"]],
+            ["2026-03-02T09:00:00+00:00", "2026-03-16T09:00:00+00:00", "2026-03-23T09:00:00+00:00"],
+        )
+        self.assertTrue(all(item["recurring"] for item in response.data["items"]))
+
+        response = self.client.get("/api/events/", {"start": "2026-03-01", "end": "2026-03-24"})
+        self.assertEqual([item["end"] for item in response.data][0], "2026-03-02T09:30:00Z")
+
+    def test_count_and_month_end_rules(self):
+        Event.objects.create(
+            user=self.user, title="rent", start="2026-01-31T12:00:00Z", end="2026-01-31T13:00:00Z",
+            recurrence_freq="MONTHLY", recurrence_count=3,
+        )
+        response = self.client.get("/api/calendar/feed/", {"start": "2026-01-01", "end": "2026-12-31"})
+        # February, April and June have no 31st, so three instances reach May.
+        self.assertEqual(
+            [item["start"][:10] for item in response.data["items"]],
+            ["2026-01-31", "2026-03-31", "2026-05-31"],
+        )
+        event = Event.objects.get()
+        self.assertEqual(event.series_end.isoformat(), "2026-05-31T13:00:00+00:00")
+
+        response = self.client.get("/api/calendar/feed/", {"start": "2026-06-01", "end": "2026-12-31"})
+        self.assertEqual(response.data["items"], [])
+
+    def test_bulk_writes_refresh_series_end(self):
+        event = Event.objects.create(
+            user=self.user, title="trip", start="2026-01-01T09:00:00Z", end="2026-01-01T10:00:00Z",
+        )
+        window = {"start": "2026-01-05", "end": "2026-01-06"}
+        Event.objects.filter(pk=event.pk).update(end="2026-01-10T10:00:00Z")
+        self.assertEqual(Event.objects.get().series_end.isoformat(), "2026-01-10T10:00:00+00:00")
+        self.assertEqual(len(self.client.get("/api/calendar/feed/", window).data["items"]), 1)
+
+        event.refresh_from_db()
+        event.recurrence_freq, event.recurrence_count = "WEEKLY", 3
+        Event.objects.bulk_update([event], ["recurrence_freq", "recurrence_count"])
+        self.assertEqual(Event.objects.get().series_end.isoformat(), "2026-01-24T10:00:00+00:00")
+
+    def test_until_and_count_are_exclusive(self):
+        response = self.client.post("/api/events/", {
+            "title": "x", "start": "2026-01-01T09:00:00Z", "end": "2026-01-01T10:00:00Z",
+            "recurrence_freq": "DAILY", "recurrence_count": 3, "recurrence_until": "2026-02-01T00:00:00Z",
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_rules_are_bounded(self):
+        def post(**rule):
+            return self.client.post("/api/events/", {
+                "title": "x", "start": "2026-01-01T09:00:00Z", "end": "2026-01-01T10:00:00Z", **rule,
+            }, format="json")
+
+        self.assertEqual(post(recurrence_freq="YEARLY", recurrence_interval=1000000, recurrence_count=2).status_code, 400)
+        self.assertEqual(post(recurrence_freq="DAILY", recurrence_count=1000000).status_code, 400)
+        response = post(recurrence_freq="YEARLY", recurrence_interval=1000, recurrence_count=5000)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("9999", response.data["recurrence_count"][0])
+
+        response = post(recurrence_freq="DAILY", recurrence_count=5000)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Event.objects.get().series_end.isoformat(), "2039-09-09T10:00:00+00:00")
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="sam", email="sam@example.com", password="pass12345")
+        self.other = User.objects.create_user(username="sue", email="sue@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ranked_prefix_search_scoped_to_user(self):
+        Task.objects.create(user=self.user, title="Quarterly report", description="numbers")
+        Task.objects.create(user=self.user, title="Groceries", description="buy paper for the report")
+        Task.objects.bulk_create([Task(user=self.other, title="Report for sue")])
+        Event.objects.create(user=self.user, title="Report review", start="2026-03-05T10:00:00Z", end="2026-03-05T11:00:00Z")
+
+        response = self.client.get("/api/search/", {"q": "repo"})
+        self.assertEqual(response.status_code, 200)
+        # Title matches outrank description matches.
+        self.assertEqual([t["title"] for t in response.data["tasks"]], ["Quarterly report", "Groceries"])
+        self.assertEqual([e["title"] for e in response.data["events"]], ["Report review"])
+
+    def test_index_follows_updates_and_deletes(self):
+        task = Task.objects.create(user=self.user, title="draft slides")
+        task.title = "final slides"
+        task.save()
+        self.assertEqual(self.client.get("/api/search/", {"q": "draft", "type": "tasks"}).data["tasks"], [])
+        self.assertEqual(len(self.client.get("/api/search/", {"q": "final", "type": "tasks"}).data["tasks"]), 1)
+
+        Task.objects.filter(pk=task.pk).delete()
+        self.assertEqual(self.client.get("/api/search/", {"q": "final", "type": "tasks"}).data["tasks"], [])
+
+    def test_empty_query_is_rejected(self):
+        self.assertEqual(self.client.get("/api/search/", {"q": "  "}).status_code, 400)
+
+    @override_settings(SEARCH_MAX_RESULTS=2)
+    def test_limit_is_positive_and_capped(self):
+        Task.objects.bulk_create([Task(user=self.user, title=f"alpha {i}") for i in range(3)])
+        for limit in ("-5", "0", "x"):
+            self.assertEqual(self.client.get("/api/search/", {"q": "alpha", "limit": limit}).status_code, 400)
+        self.assertEqual(len(self.client.get("/api/search/", {"q": "alpha", "limit": 10}).data["tasks"]), 2)
+        self.assertEqual(len(self.client.get("/api/search/", {"q": "alpha", "limit": 1}).data["tasks"]), 1)
+
+
+class TaskPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="erin", email="erin@example.com", password="pass12345")
+        Task.objects.bulk_create([Task(user=self.user, title=f"t{i}") for i in range(25)])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages_cover_every_task_once(self):
+        seen = []
+        url = "/api/tasks/?page_size=10"
+        while url:
+            response = self.client.get(url)
+            self.assertNotIn("count", response.data)
+            seen.extend(t["id"] for t in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(sorted(seen), sorted(Task.objects.values_list("id", flat=True)))
+
+    def test_total_and_legacy_page_numbers(self):
+        response = self.client.get("/api/tasks/", {"include_total": "1"})
+        self.assertEqual(response.data["count"], 25)
+
+        response = self.client.get("/api/tasks/", {"page": 3})
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual(len(response.data["results"]), 5)
+
+
+class TaskFilterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="gina", email="gina@example.com", password="pass12345")
+        now = timezone.now()
+        Task.objects.bulk_create([
+            Task(user=self.user, title="late", due_date=now - timedelta(days=2)),
+            Task(user=self.user, title="done late", due_date=now - timedelta(days=1), completed=True),
+            Task(user=self.user, title="soon", due_date=now + timedelta(days=1), status="in_progress"),
+            Task(user=self.user, title="later", due_date=now + timedelta(days=5)),
+            Task(user=self.user, title="someday"),
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def titles(self, params):
+        response = self.client.get("/api/tasks/", params)
+        self.assertEqual(response.status_code, 200)
+        return [t["title"] for t in response.data["results"]]
+
+    def test_filters(self):
+        self.assertEqual(self.titles({"overdue": "true"}), ["late"])
+        self.assertEqual(sorted(self.titles({"status": ["pending", "in_progress"], "has_due_date": "true"})),
+                         ["late", "later", "soon"])
+        self.assertEqual(self.client.get("/api/tasks/", {"status": "bogus"}).status_code, 400)
+
+    def test_cursor_over_due_date_puts_undated_tasks_last(self):
+        Task.objects.create(user=self.user, title="someday too")
+        for ordering, dated in (("due_date", ["late", "done late", "soon", "later"]),
+                                ("-due_date", ["later", "soon", "done late", "late"])):
+            pages, url = [], f"/api/tasks/?ordering={ordering}&page_size=2"
+            while url:
+                response = self.client.get(url)
+                pages.append([t["title"] for t in response.data["results"]])
+                url = response.data["next"]
+            self.assertEqual(sum(pages, []), dated + ["someday", "someday too"])
+
+            back = []
+            url = response.data["previous"]
+            while url:
+                response = self.client.get(url)
+                back.append([t["title"] for t in response.data["results"]])
+                url = response.data["previous"]
+            self.assertEqual(back, pages[-2::-1])
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite-specific")
+    def test_filtered_lists_use_indexes(self):
+        plans = {
+            "task_user_status_due_idx": "status=pending&due_after=2026-01-01T00:00:00Z",
+            "task_open_due_idx": "overdue=true",
+        }
+        for index, params in plans.items():
+            queryset = TaskFilter(QueryDict(params), queryset=Task.objects.filter(user=self.user)).qs
+            plan = queryset.explain()
+            self.assertIn(f"USING INDEX {index}", plan)
+            self.assertNotIn("SCAN tasks_task", plan)
+
+
+class TaskBulkTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="frank", email="frank@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_update_delete(self):
+        response = self.client.post("/api/tasks/bulk/", [
+            {"title": "a", "priority": "H"},
+            {"title": "b", "completed": True},
+        ], format="json")
+        self.assertEqual(response.status_code, 201)
+        ids = [t["id"] for t in response.data]
+        self.assertEqual(Task.objects.get(pk=ids[1]).status, "completed")
+
+        response = self.client.patch("/api/tasks/bulk/", [
+            {"id": ids[0], "completed": True},
+            {"id": ids[1], "completed": False},
+        ], format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(dict(Task.objects.values_list("id", "status")), {ids[0]: "completed", ids[1]: "pending"})
+        self.assertEqual(TaskCounter.objects.get(pk=self.user.pk).completed, 1)
+
+        response = self.client.delete("/api/tasks/bulk/", {"ids": ids}, format="json")
+        self.assertEqual(response.data, {"deleted": 2})
+        self.assertFalse(Task.objects.exists())
+
+    def test_malformed_ids_are_item_errors(self):
+        task = Task.objects.create(user=self.user, title="keep")
+        response = self.client.delete("/api/tasks/bulk/", {"ids": [task.pk, [1], {"a": 1}, True]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [(e["index"], e["errors"]["id"][0]) for e in response.data["errors"]],
+            [(1, "A valid integer is required."), (2, "A valid integer is required."), (3, "A valid integer is required.")],
+        )
+        response = self.client.patch("/api/tasks/bulk/", [{"id": [1], "title": "x"}, "x"], format="json")
+        self.assertEqual([e["index"] for e in response.data["errors"]], [0, 1])
+        self.assertTrue(Task.objects.filter(pk=task.pk, title="keep").exists())
+
+    def test_bulk_create_is_all_or_nothing(self):
+        response = self.client.post("/api/tasks/bulk/", [{"title": "ok"}, {"priority": "X"}], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertFalse(Task.objects.exists())
+
+    def test_batch_size_limit(self):
+        with self.settings(TASK_BULK_MAX_ITEMS=2):
+            response = self.client.post("/api/tasks/bulk/", [{"title": str(i)} for i in range(3)], format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class SyncChangesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="gina", email="gina@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_changes_since_token(self):
+        kept = Task.objects.create(user=self.user, title="kept")
+        doomed = Task.objects.create(user=self.user, title="doomed")
+        response = self.client.get("/api/changes/")
+        self.assertEqual({t["title"] for t in response.data["tasks"]}, {"kept", "doomed"})
+        token = response.data["sync_token"]
+
+        # Step past the safety window so unchanged rows are not re-sent.
+        Task.objects.filter(pk=kept.pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+        Task.objects.filter(pk=doomed.pk).delete()
+        event = Event.objects.create(user=self.user, title="new", start=timezone.now(), end=timezone.now())
+
+        response = self.client.get("/api/changes/", {"since": token})
+        self.assertEqual(response.data["tasks"], [])
+        self.assertEqual([e["id"] for e in response.data["events"]], [event.id])
+        self.assertEqual(response.data["deleted"], {"tasks": [doomed.id], "events": []})
+
+    def test_bulk_updates_are_synced(self):
+        task = Task.objects.create(user=self.user, title="before")
+        Task.objects.filter(pk=task.pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+        token = self.client.get("/api/changes/").data["sync_token"]
+
+        Task.objects.filter(pk=task.pk).update(title="after")
+        response = self.client.get("/api/changes/", {"since": token})
+        self.assertEqual([t["title"] for t in response.data["tasks"]], ["after"])
+
+    def test_late_tombstones_are_not_skipped(self):
+        Tombstone.objects.create(id=10, user=self.user, kind="task", object_id=1)
+        token = self.client.get("/api/changes/").data["sync_token"]
+
+        # A delete whose id was taken earlier but committed after the sync.
+        Tombstone.objects.create(id=5, user=self.user, kind="task", object_id=2)
+        response = self.client.get("/api/changes/", {"since": token})
+        self.assertEqual(response.data["deleted"]["tasks"], [2, 1])
+
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(minutes=1))
+        token = response.data["sync_token"]
+        response = self.client.get("/api/changes/", {"since": token})
+        token = response.data["sync_token"]
+        response = self.client.get("/api/changes/", {"since": token})
+        self.assertEqual(response.data["deleted"]["tasks"], [])
+
+    def test_rejects_tampered_token(self):
+        response = self.client.get("/api/changes/", {"since": "garbage"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskRowSerializerTests(TestCase):
+    def test_matches_task_serializer_byte_for_byte(self):
+        user = User.objects.create_user(username="hank", email="hank@example.com", password="pass12345")
+        now = timezone.now()
+        Task.objects.create(user=user, title="overdue", priority="H", due_date=now - timedelta(days=3))
+        Task.objects.create(user=user, title="upcoming", priority="M", due_date=now + timedelta(days=3), status="in_progress")
+        Task.objects.create(user=user, title="done", priority="L", due_date=now - timedelta(days=1), completed=True)
+        Task.objects.create(user=user, title="undated", description="no due date")
+
+        tasks = Task.objects.filter(user=user).select_related("user")
+        expected = JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+        rows = TaskRowSerializer(now=now).serialize(tasks.values(*TaskRowSerializer.values_fields))
+        self.assertEqual(JSONRenderer().render(rows), expected)
+
+    def test_list_endpoint_does_not_query_per_row(self):
+        user = User.objects.create_user(username="ivy", email="ivy@example.com", password="pass12345")
+        Task.objects.bulk_create([Task(user=user, title=str(i)) for i in range(10)])
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.assertNumQueries(2):
+            response = client.get("/api/tasks/")
+        self.assertEqual(len(response.data["results"]), 10)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        self.user = User.objects.create_user(username="jack", email="jack@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_user_lookup_is_cached_until_user_changes(self):
+        self.client.get("/api/task-stats/")
+        # Only the data version is read: the user comes from the JWT user
+        # cache and the payload from the response cache.
+        with self.assertNumQueries(1):
+            self.client.get("/api/task-stats/")
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get("/api/task-stats/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        authentication = CachedJWTAuthentication()
+        token = authentication.get_validated_token(str(AccessToken.for_user(self.user)))
+        authentication.get_user(token)
+        first = authentication.get_user(token)
+        first.first_name = "changed"
+        first._state.fields_cache["marker"] = object()
+
+        second = authentication.get_user(token)
+        self.assertEqual(second.first_name, "")
+        self.assertNotIn("marker", second._state.fields_cache)
+        self.assertFalse(second._state.adding)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="kate", email="kate@example.com", password="pass12345")
+        Task.objects.create(user=self.user, title="first, with comma", priority="H")
+        Task.objects.create(user=self.user, title="second", due_date=timezone.now())
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ndjson_matches_task_api(self):
+        response = self.client.get("/api/export/tasks.ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        api = self.client.get("/api/tasks/").json()["results"]
+        self.assertEqual(lines, sorted(api, key=lambda t: t["id"]))
+
+    def test_csv_has_header_and_rows(self):
+        response = self.client.get("/api/export/tasks.csv")
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:2], ["id", "title"])
+        self.assertEqual([r[1] for r in rows[1:]], ["first, with comma", "second"])
+
+    def test_unknown_export(self):
+        self.assertEqual(self.client.get("/api/export/users.csv").status_code, 404)
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="liam", email="liam@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_csv_import_reports_row_errors(self):
+        upload = SimpleUploadedFile("tasks.csv", (
+            "title,description,due_date,priority,completed\n"
+            "Write report,,2026-05-01T09:00:00Z,H,\n"
+            "Bad priority,,,Z,\n"
+            "Done already,notes,,,true\n"
+        ).encode())
+        response = self.client.post("/api/import/", {"file": upload, "kind": "tasks"}, format="multipart")
+        self.assertEqual(response.data["created"], {"tasks": 2, "events": 0})
+        self.assertEqual(response.data["errors"][0]["row"], 3)
+        self.assertEqual(Task.objects.get(title="Done already").status, "completed")
+        self.assertEqual(TaskCounter.objects.get(pk=self.user.pk).total, 2)
+
+    def test_bad_encoding_is_rejected_before_any_batch(self):
+        rows = "".join(f"Task {i},,,,\n" for i in range(2000))
+        upload = SimpleUploadedFile("tasks.csv", (
+            "title,description,due_date,priority,completed\n" + rows
+        ).encode() + b"Caf\xe9,,,,\n")
+        with self.settings(IMPORT_BATCH_SIZE=500):
+            response = self.client.post("/api/import/", {"file": upload, "kind": "tasks"}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "The file must be UTF-8 encoded.")
+        self.assertFalse(Task.objects.exists())
+
+    def test_ics_import(self):
+        upload = SimpleUploadedFile("cal.ics", (
+            "BEGIN:VCALENDAR\r\n"
+            "BEGIN:VEVENT\r\nSUMMARY:Stand-up\\, daily\r\nDTSTART:20260302T090000Z\r\nDURATION:PT15M\r\nEND:VEVENT\r\n"
+            "BEGIN:VTODO\r\nSUMMARY:File taxes\r\nDUE;VALUE=DATE:20260415\r\nPRIORITY:1\r\n"
+            "DESCRIPTION:a long line that is\r\n  folded\r\nEND:VTODO\r\n"
+            "END:VCALENDAR\r\n"
+        ).encode())
+        response = self.client.post("/api/import/", {"file": upload}, format="multipart")
+        self.assertEqual(response.data["created"], {"tasks": 1, "events": 1})
+        event = Event.objects.get()
+        self.assertEqual((event.title, event.end - event.start), ("Stand-up, daily", timedelta(minutes=15)))
+        task = Task.objects.get()
+        self.assertEqual((task.priority, task.description), ("H", "a long line that is folded"))
+
+
+class CalendarSubscriptionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="mia", email="mia@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_feed_is_cached_until_data_changes(self):
+        Event.objects.create(user=self.user, title="Dentist", start="2026-03-02T09:00:00Z", end="2026-03-02T10:00:00Z")
+        url = self.client.get("/api/calendar/subscription/").data["url"]
+        feed = APIClient()
+
+        response = feed.get(url)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertIn(b"SUMMARY:Dentist", response.content)
+        self.assertIn(b"DTSTART:20260302T090000Z", response.content)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(feed.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        Task.objects.create(user=self.user, title="Pay rent", due_date="2026-03-01T00:00:00Z")
+        self.assertIn(b"SUMMARY:Pay rent", feed.get(url).content)
+
+    def test_rotating_token_revokes_old_url(self):
+        old = self.client.get("/api/calendar/subscription/").data["url"]
+        new = self.client.post("/api/calendar/subscription/").data["url"]
+        self.assertNotEqual(old, new)
+        self.assertEqual(APIClient().get(old).status_code, 404)
+
+
+_flaky_calls = []
+
+
+@register_job("test_flaky")
+def _flaky_job(fail_times):
+    _flaky_calls.append(1)
+    if len(_flaky_calls) <= fail_times:
+        raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        _flaky_calls.clear()
+
+    def test_password_reset_mail_is_sent_by_worker(self):
+        User.objects.create_user(username="jo", email="jo@example.com", password="pass12345")
+        response = APIClient().post("/api/auth/forgot-password/", {"email": "jo@example.com"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Job.objects.get().status, Job.QUEUED)
+
+        self.assertEqual(work(once=True), {Job.DONE: 1})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("/reset-password/", mail.outbox[0].body)
+
+    def test_failures_back_off_then_give_up(self):
+        job = enqueue("test_flaky", {"fail_times": 5}, max_attempts=2)
+        self.assertEqual(work(once=True), {Job.QUEUED: 1})
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=29))
+        self.assertIn("boom", job.last_error)
+
+        self.assertEqual(work(once=True), {})  # not due yet
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertEqual(work(once=True), {Job.FAILED: 1})
+
+    def test_abandoned_job_is_reclaimed_after_visibility_timeout(self):
+        enqueue("test_flaky", {"fail_times": 0})
+        stale, = claim_jobs("crashed-worker")
+        self.assertEqual(claim_jobs("other"), [])
+
+        later = timezone.now() + timedelta(hours=1)
+        job, = claim_jobs("other", now=later)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(run_job(job), Job.DONE)
+        # The first worker finishing late does not overwrite the new claim.
+        run_job(stale)
+        self.assertEqual(Job.objects.get().locked_by, job.locked_by)
+
+
+class ReminderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="rita", email="rita@example.com", password="pass12345")
+        self.now = timezone.now()
+
+    def test_reminders_are_sent_once(self):
+        soon = Task.objects.create(user=self.user, title="Soon", due_date=self.now + timedelta(minutes=30))
+        late = Task.objects.create(user=self.user, title="Late", due_date=self.now - timedelta(hours=2))
+        Task.objects.create(user=self.user, title="Done", due_date=self.now - timedelta(hours=1), completed=True)
+        Task.objects.create(user=self.user, title="Far off", due_date=self.now + timedelta(days=3))
+
+        self.assertEqual(ReminderScheduler(self.now).run_once(self.now), 2)
+        self.assertEqual(
+            set(ReminderLog.objects.values_list("task__title", "kind")),
+            {(soon.title, ReminderLog.DUE_SOON), (late.title, ReminderLog.OVERDUE)},
+        )
+        # A second scheduler (e.g. after a restart) sends nothing new.
+        self.assertEqual(ReminderScheduler(self.now).run_once(self.now), 0)
+
+        work(once=True)
+        self.assertEqual(sorted(m.subject for m in mail.outbox), ["Task due soon: Soon", "Task overdue: Late"])
+
+    def test_rescheduled_task_gets_new_reminder(self):
+        task = Task.objects.create(user=self.user, title="Moved", due_date=self.now - timedelta(minutes=5))
+        self.assertEqual(ReminderScheduler(self.now).run_once(self.now), 1)
+
+        task.due_date = self.now + timedelta(minutes=10)
+        task.save()
+        later = self.now + timedelta(minutes=11)
+        self.assertEqual(ReminderScheduler(later).run_once(later), 1)
+        self.assertEqual(ReminderLog.objects.filter(task=task, kind=ReminderLog.OVERDUE).count(), 2)
+
+    def test_timer_wheel_fires_in_order_of_ticks(self):
+        wheel = TimerWheel(resolution=10, slots=8, now=1000)
+        wheel.add(1005, "a")
+        wheel.add(1035, "b")
+        self.assertFalse(wheel.add(1035, "b"))
+        wheel.add(900, "late")
+        self.assertEqual(sorted(key for key, _ in wheel.advance(1010)), ["a", "late"])
+        self.assertEqual(wheel.advance(1020), [])
+        self.assertEqual([key for key, _ in wheel.advance(1040)], ["b"])
+        self.assertEqual(len(wheel), 0)
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite-specific")
+    def test_scan_uses_open_due_index(self):
+        query = Task.objects.filter(
+            completed=False, due_date__gte=self.now, due_date__lt=self.now + timedelta(minutes=10)
+        ).order_by("due_date", "id").values_list("id", "due_date")
+        plan = query.explain()
+        self.assertIn("USING INDEX task_open_due_scan_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+@override_settings(AUTH_THROTTLE_RATES={"auth_ip": "100/min", "auth_account": "2/min"})
+class AuthThrottleTests(TestCase):
+    def setUp(self):
+        reset_throttles()
+        self.addCleanup(reset_throttles)
+        User.objects.create_user(username="ursula", email="ursula@example.com", password="pass12345")
+        self.client = APIClient()
+
+    def login(self, username):
+        return self.client.post("/auth/login/", {"username": username, "password": "wrong"}, format="json")
+
+    def test_account_bucket(self):
+        self.assertEqual([self.login("ursula").status_code for _ in range(2)], [401, 401])
+        response = self.login("URSULA")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        # Other accounts are unaffected.
+        self.assertEqual(self.login("someone").status_code, 401)
+
+    @override_settings(AUTH_THROTTLE_RATES={"auth_ip": "2/min", "auth_account": "100/min"})
+    def test_ip_bucket(self):
+        statuses = [self.login(name).status_code for name in ("a", "b", "c")]
+        self.assertEqual(statuses, [401, 401, 429])
+        other_ip = self.client.post(
+            "/auth/login/", {"username": "d", "password": "x"}, format="json", REMOTE_ADDR="10.0.0.9",
+        )
+        self.assertEqual(other_ip.status_code, 401)
+
+    def test_bucket_refills(self):
+        store = LocalBucketStore()
+        self.assertEqual(store.take("k", 2, 1.0, now=0), (True, None))
+        self.assertEqual(store.take("k", 2, 1.0, now=0)[0], True)
+        self.assertEqual(store.take("k", 2, 1.0, now=0.5), (False, 0.5))
+        self.assertEqual(store.take("k", 2, 1.0, now=1.0)[0], True)
+
+    @override_settings(AUTH_HASHING_CONCURRENCY=1)
+    def test_hashing_cap_rejects_fast(self):
+        limiter = get_hashing_limiter()
+        slot = limiter.acquire()
+        self.assertTrue(slot)
+        payload = {"username": "vic", "email": "vic@example.com", "password": "pass12345"}
+        response = self.client.post("/api/auth/register/", payload, format="json")
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(User.objects.filter(username="vic").exists())
+
+        limiter.release(slot)
+        self.assertEqual(self.client.post("/api/auth/register/", payload, format="json").status_code, 201)
+
+    @override_settings(AUTH_HASHING_CONCURRENCY=1, AUTH_THROTTLE_CACHE="default")
+    def test_shared_hashing_slots_survive_expiry(self):
+        cache.clear()
+        limiter = get_hashing_limiter()
+        stale = limiter.acquire()
+        self.assertIsNone(limiter.acquire())
+
+        # The holder crashed; its slot expires and is taken again.
+        later = time.time() + limiter.slot_timeout + 1
+        with mock.patch("time.time", return_value=later):
+            fresh = limiter.acquire()
+            self.assertTrue(fresh)
+            # A late release of the expired slot leaves the new holder's.
+            limiter.release(stale)
+            self.assertIsNone(limiter.acquire())
+            limiter.release(fresh)
+            self.assertTrue(limiter.acquire())
+
+
+@override_settings(PERF_SERVER_TIMING=True, METRICS_TOKEN=None)
+class PerformanceMetricsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="wes", email="wes@example.com", password="pass12345")
+        Task.objects.create(user=self.user, title="Measured")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, 200)
+        timing = response["Server-Timing"]
+        self.assertRegex(
+            timing, r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, render;dur=[\d.]+$',
+        )
+        self.assertNotIn('desc="0 queries"', timing)
+
+    def test_serializer_time_excludes_sql(self):
+        def view(request):
+            with timed_serialization():
+                time.sleep(0.02)
+                list(Task.objects.all())
+                with timed_serialization():
+                    time.sleep(0.02)
+            return HttpResponse("ok")
+
+        response = PerformanceMiddleware(view)(RequestFactory().get("/"))
+        timing = dict(part.split(";")[:2] for part in response["Server-Timing"].split(", "))
+        app, db, serialize = (float(timing[name].split("=")[1]) for name in ("app", "db", "serialize"))
+        self.assertGreaterEqual(serialize, 40)
+        self.assertLess(serialize, 60)  # the nested block is not counted twice
+        self.assertLessEqual(serialize + db, app)
+
+    def test_middleware_stays_async_for_async_views(self):
+        async def view(request):
+            await sync_to_async(Task.objects.count)()
+            return HttpResponse("ok")
+
+        middleware = PerformanceMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        with override_settings(PERF_SERVER_TIMING=True):
+            response = async_to_sync(middleware)(RequestFactory().get("/"))
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
+
+    @override_settings(INTERNAL_IPS=["127.0.0.1"])
+    def test_metrics_endpoint(self):
+        self.client.get("/api/tasks/")
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn('smarttasker_http_requests_total{route="/api/tasks/",method="GET",status="200"}', body)
+        self.assertIn('smarttasker_http_request_duration_seconds_bucket{route="/api/tasks/",method="GET",le="+Inf"}', body)
+        self.assertIn('smarttasker_db_queries_count{route="/api/tasks/",method="GET"}', body)
+
+    def test_metrics_token(self):
+        with override_settings(METRICS_TOKEN="s3cret", INTERNAL_IPS=["127.0.0.1"]):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200)
+        # No token: only DEBUG or internal clients.
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        reset_response_cache()
+        self.addCleanup(reset_response_cache)
+        self.user = User.objects.create_user(username="xena", email="xena@example.com", password="pass12345")
+        Task.objects.create(user=self.user, title="One", priority="H")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_repeat_reads_skip_task_tables(self):
+        for path in ("/api/dashboard/", "/api/insights/", "/api/task-stats/", "/api/calendar/"):
+            first = self.client.get(path)
+            self.assertEqual(first.status_code, 200)
+            with CaptureQueriesContext(connection) as queries:
+                second = self.client.get(path)
+            self.assertEqual(second.json(), first.json())
+            self.assertEqual(second["ETag"], first["ETag"])
+            self.assertFalse([q["sql"] for q in queries if "tasks_task" in q["sql"]], path)
+
+    def test_writes_invalidate(self):
+        before = self.client.get("/api/task-stats/").json()
+        response = self.client.post("/api/tasks/", {"title": "Two", "priority": "H"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        after = self.client.get("/api/task-stats/").json()
+        self.assertNotEqual(after, before)
+
+    def test_hits_are_counted(self):
+        hits = RESPONSE_CACHE_LOOKUPS.series.get(("hit",), 0)
+        self.client.get("/api/insights/")
+        self.client.get("/api/insights/")
+        self.assertEqual(RESPONSE_CACHE_LOOKUPS.series[("hit",)], hits + 1)
+
+    def test_users_do_not_share_entries(self):
+        other = User.objects.create_user(username="yuri", email="yuri@example.com", password="pass12345")
+        mine = self.client.get("/api/task-stats/").json()
+        self.client.force_authenticate(other)
+        self.assertNotEqual(self.client.get("/api/task-stats/").json(), mine)
+
+
+# Not a TestCase: reads inside a transaction are always routed to the primary.
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRoutingTests(TransactionTestCase):
+    def setUp(self):
+        reset_routing_state()
+        self.addCleanup(reset_routing_state)
+        mark_replica("replica1", True)
+        self.user = User.objects.create_user(username="zoe", email="zoe@example.com", password="pass12345")
+        self.factory = RequestFactory()
+        # The middleware returns whatever the router picked for a read.
+        self.route = ReplicaRoutingMiddleware(lambda request: PrimaryReplicaRouter().db_for_read(Task))
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.route(self.factory.get("/api/tasks/")), "replica1")
+        self.assertEqual(self.route(self.factory.post("/api/tasks/")), "default")
+        self.assertEqual(PrimaryReplicaRouter().db_for_read(Task), "default")  # outside a request
+
+    def test_reads_follow_own_writes(self):
+        write = self.factory.post("/api/tasks/")
+        write.user = self.user
+        self.route(write)
+
+        read = self.factory.get("/api/tasks/")
+        read.user = self.user
+        self.assertEqual(self.route(read), "default")
+        other = self.factory.get("/api/tasks/")
+        other.user = User.objects.create_user(username="zed", password="pass12345")
+        self.assertEqual(self.route(other), "replica1")
+
+    def test_async_requests_are_routed(self):
+        async def view(request):
+            return await sync_to_async(PrimaryReplicaRouter().db_for_read)(Task)
+
+        route = ReplicaRoutingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(route))
+        self.assertEqual(async_to_sync(route)(self.factory.get("/api/tasks/")), "replica1")
+
+        write = self.factory.post("/api/tasks/")
+        write.user = self.user
+        async_to_sync(route)(write)
+        read = self.factory.get("/api/tasks/")
+        read.user = self.user
+        self.assertEqual(async_to_sync(route)(read), "default")
+
+    @override_settings(DATABASE_REPLICAS=["replica1", "replica2"])
+    def test_one_replica_per_request(self):
+        mark_replica("replica2", True)
+        route = ReplicaRoutingMiddleware(
+            lambda request: {PrimaryReplicaRouter().db_for_read(Task) for _ in range(50)}
+        )
+        self.assertEqual(len(route(self.factory.get("/api/tasks/"))), 1)
+        chosen = set().union(*(route(self.factory.get("/api/tasks/")) for _ in range(50)))
+        self.assertEqual(chosen, {"replica1", "replica2"})
+
+    def test_unhealthy_replica_is_skipped(self):
+        mark_replica("replica1", False)
+        self.assertEqual(self.route(self.factory.get("/api/tasks/")), "default")
+        # Stale results are re-checked; an unreachable alias fails the check.
+        mark_replica("replica1", True, now=time.monotonic() - 3600)
+        self.assertEqual(self.route(self.factory.get("/api/tasks/")), "default")
+        self.assertTrue(check_replica("default"))
+
+
+class ShardingTests(TestCase):
+    def setUp(self):
+        forget_assignments()
+        self.addCleanup(forget_assignments)
+        self.user = User.objects.create_user(username="amy", email="amy@example.com", password="pass12345")
+
+    def test_new_users_are_placed(self):
+        self.assertEqual(ShardAssignment.objects.get(user=self.user).shard, "default")
+        self.assertEqual(shard_for_user(self.user.pk), "default")
+
+    def test_hash_placement_is_stable(self):
+        two = ["default", "shard1"]
+        three = two + ["shard2"]
+        placements = [(hash_shard(user_id, two), hash_shard(user_id, three)) for user_id in range(1, 2001)]
+        self.assertEqual(placements, [(hash_shard(u, two), hash_shard(u, three)) for u in range(1, 2001)])
+        # Adding a shard only moves users onto the new shard.
+        moved = [(before, after) for before, after in placements if before != after]
+        self.assertTrue(all(after == "shard2" for _, after in moved))
+        self.assertTrue(500 < len(moved) < 830)
+
+    def test_router_follows_shard_map(self):
+        ShardAssignment.objects.filter(user=self.user).update(shard="shard1")
+        router = ShardRouter()
+        with override_settings(DATABASE_SHARDS=["default", "shard1"]):
+            self.assertEqual(router.db_for_read(Task), "default")
+            with using_user_shard(self.user.pk):
+                self.assertEqual(router.db_for_read(Task), "shard1")
+                self.assertEqual(router.db_for_write(TaskCounter), "shard1")
+            self.assertEqual(router.db_for_write(Task, instance=Task(user=self.user)), "shard1")
+            self.assertEqual(router.db_for_read(Event, instance=self.user), "shard1")
+            self.assertIsNone(router.db_for_read(Job))
+            self.assertIsNone(router.db_for_read(User))
+        with override_settings(DATABASE_SHARDS=["default"]):
+            self.assertIsNone(router.db_for_read(Task))
+
+    def test_writes_are_refused_while_moving(self):
+        ShardAssignment.objects.filter(user=self.user).update(shard="shard1", moving=True)
+        router = ShardRouter()
+        with override_settings(DATABASE_SHARDS=["default", "shard1"]):
+            self.assertEqual(router.db_for_read(Task, instance=self.user), "shard1")
+            with self.assertRaises(UserMoving):
+                router.db_for_write(Task, instance=Task(user=self.user))
+            with using_user_shard(self.user.pk), self.assertRaises(UserMoving):
+                router.db_for_write(TaskCounter)
+            self.assertIsNone(router.db_for_write(User, instance=self.user))
+
+    def test_move_waits_out_the_shard_map_cache(self):
+        router = ShardRouter()
+        steps = []
+
+        def sleep(seconds):
+            forget_assignments()  # as other processes' caches expire
+            writable = True
+            try:
+                router.db_for_write(Task, instance=Task(user=self.user))
+            except UserMoving:
+                writable = False
+            steps.append(("wait", seconds, writable))
+
+        def copy_user(user_id, source, target):
+            steps.append(("copy", source, target))
+            ShardAssignment.objects.filter(user_id=user_id).update(shard=target, moving=False)
+            return 3
+
+        with override_settings(DATABASE_SHARDS=["default", "shard1"], SHARD_MAP_CACHE_TTL=60), \
+                mock.patch("tasks.sharding._copy_user", copy_user), \
+                mock.patch("tasks.sharding._drop_source_copy", lambda *args: steps.append(("drop",) + args)):
+            self.assertEqual(move_users([(self.user.pk, "shard1")], sleep=sleep), {self.user.pk: 3})
+        self.assertEqual(steps, [
+            ("wait", 60, False),
+            ("copy", "default", "shard1"),
+            ("wait", 60, True),
+            ("drop", self.user.pk, "default"),
+        ])
+        self.assertFalse(ShardAssignment.objects.get(user=self.user).moving)
+
+    def test_failed_move_lifts_the_flag(self):
+        def copy_user(*args):
+            raise ShardMoveError("boom")
+
+        with override_settings(DATABASE_SHARDS=["default", "shard1"]), \
+                mock.patch("tasks.sharding._copy_user", copy_user):
+            result = move_users([(self.user.pk, "shard1")], sleep=lambda seconds: None)[self.user.pk]
+        self.assertIsInstance(result, ShardMoveError)
+        self.assertEqual(
+            ShardAssignment.objects.filter(user=self.user).values_list("shard", "moving").get(), ("default", False),
+        )
+
+    def test_user_changes_are_mirrored_to_the_shard(self):
+        ShardAssignment.objects.filter(user=self.user).update(shard="shard1")
+        mirrored = []
+        with override_settings(DATABASE_SHARDS=["default", "shard1"]), \
+                mock.patch("tasks.sharding.mirror_user", lambda user, alias: mirrored.append((user.username, alias))):
+            self.user.username = "amelia"
+            self.user.save()
+        self.assertEqual(mirrored, [("amelia", "shard1")])
+
+    def test_delete_cleans_up_the_recorded_shard(self):
+        shards = ["default", "shard1", "shard2"]
+        user_id = self.user.pk
+        # A shard the user would not hash to, as after rebalance_shards.
+        moved_to = next(alias for alias in shards[1:] if alias != hash_shard(user_id, shards))
+        ShardAssignment.objects.filter(user=self.user).update(shard=moved_to)
+        dropped = []
+        with override_settings(DATABASE_SHARDS=shards), \
+                mock.patch("tasks.sharding.drop_mirrored_user", lambda *args: dropped.append(args)):
+            self.user.delete()
+        self.assertEqual(dropped, [(user_id, moved_to)])
+
+    def test_sync_token_does_not_follow_a_move(self):
+        token = encode_token({"user": self.user.pk, "shard": "default", "issued": timezone.now().isoformat()})
+        self.assertEqual(decode_token(token, self.user)["shard"], "default")
+        ShardAssignment.objects.filter(user=self.user).update(shard="shard1")
+        with override_settings(DATABASE_SHARDS=["default", "shard1"]):
+            with self.assertRaises(SyncTokenExpired):
+                decode_token(token, self.user)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="abe", email="abe@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        old = timezone.now() - timedelta(days=120)
+        self.done = [Task.objects.create(user=self.user, title=f"Done {i}", completed=True, priority="H") for i in range(3)]
+        Task.objects.filter(pk__in=[t.pk for t in self.done]).update(updated_at=old)
+        Task.objects.create(user=self.user, title="Recently done", completed=True)
+        Task.objects.filter(pk=Task.objects.create(user=self.user, title="Old but open").pk).update(updated_at=old)
+
+    def test_moves_old_completed_tasks_in_batches(self):
+        before = self.client.get("/api/tasks/?ordering=created_at").json()["results"][:3]
+        self.assertEqual(archive_completed_tasks(batch_size=2), 3)
+
+        self.assertEqual(
+            sorted(ArchivedTask.objects.values_list("id", flat=True)), sorted(t.pk for t in self.done),
+        )
+        self.assertEqual(set(Task.objects.values_list("title", flat=True)), {"Recently done", "Old but open"})
+        self.assertEqual(Tombstone.objects.filter(kind="task").count(), 3)
+        counter = TaskCounter.objects.get(pk=self.user.pk).as_dict()
+        TaskCounter.rebuild([self.user.pk])
+        self.assertEqual(counter, TaskCounter.objects.get(pk=self.user.pk).as_dict())
+        self.assertEqual(counter["total"], 2)
+
+        archived = self.client.get("/api/tasks/?archived=true&ordering=created_at").json()["results"]
+        self.assertEqual(archived, before)
+        self.assertEqual(len(self.client.get("/api/tasks/").json()["results"]), 2)
+        self.assertEqual(self.client.get(f"/api/tasks/{self.done[0].pk}/?archived=true").status_code, 404)
+
+    def test_limited_run_resumes(self):
+        self.assertEqual(archive_completed_tasks(limit=1), 1)
+        out = StringIO()
+        call_command("archive_completed_tasks", "--dry-run", stdout=out)
+        self.assertIn("2 tasks", out.getvalue())
+        call_command("archive_completed_tasks", stdout=StringIO())
+        self.assertEqual(ArchivedTask.objects.count(), 3)
+        self.assertEqual(archive_completed_tasks(), 0)
+
+    def test_archived_export(self):
+        archive_completed_tasks()
+        response = self.client.get("/api/export/tasks.ndjson?archived=true")
+        self.assertIn("archived-tasks", response["Content-Disposition"])
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([line["title"] for line in lines], ["Done 0", "Done 1", "Done 2"])
+        self.assertEqual(self.client.get("/api/export/events.csv?archived=true").status_code, 400)
@@ -0,0 +1,233 @@
+"""
+Throttling for the endpoints that hash passwords (login, register, reset).
+
+PBKDF2 is deliberately slow, so a burst of auth attempts can tie up every
+worker core. Two layers keep that in check:
+
+* Token buckets per client IP and per account (DRF throttle classes).
+  Rates use DRF's "N/period" format: a bucket holds N tokens and refills
+  at N per period, so short bursts pass and sustained floods get 429s.
+* A cap on how many requests may be hashing at once. Requests over the cap
+  are rejected immediately with a 429 instead of queueing behind the
+  hashing work, leaving the remaining capacity for normal API traffic.
+
+State lives in process memory by default. Setting AUTH_THROTTLE_CACHE to a
+cache alias shares it between workers through that cache; the shared
+backend is best-effort (read-modify-write without a lock), which is fine
+for throttling.
+"""
+import os
+import random
+import secrets
+import threading
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import exceptions
+from rest_framework.throttling import BaseThrottle
+
+from .lru import LRUCache
+
+_bucket_store = None
+_hashing_limiter = None
+_state_lock = threading.Lock()
+
+
+def throttle_rates():
+    return getattr(settings, "AUTH_THROTTLE_RATES", {"auth_ip": "30/min", "auth_account": "10/min"})
+
+
+def throttle_cache_alias():
+    return getattr(settings, "AUTH_THROTTLE_CACHE", None)
+
+
+def hashing_concurrency():
+    return getattr(settings, "AUTH_HASHING_CONCURRENCY", None) or max(1, (os.cpu_count() or 2) // 2)
+
+
+def parse_rate(rate):
+    """
+    "10/min" -> (capacity 10, refill of 10 tokens per 60 seconds).
+    """
+    count, period = rate.split("/")
+    seconds = {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+    return int(count), int(count) / seconds
+
+
+class LocalBucketStore:
+    """
+    Token buckets in a bounded per-process LRU. An entry expires once its
+    bucket would have refilled completely, which is the same as a new one.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.buckets = LRUCache(maxsize=maxsize)
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            tokens, updated = self.buckets.get(key) or (capacity, now)
+            allowed, tokens, wait = _take(tokens, updated, capacity, refill_rate, now)
+            self.buckets.set(key, (tokens, now), ttl=capacity / refill_rate)
+        return allowed, wait
+
+
+class CacheBucketStore:
+    """
+    Token buckets in a Django cache shared by all workers.
+    """
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def take(self, key, capacity, refill_rate, now=None):
+        now = time.time() if now is None else now
+        cache_key = f"throttle:{key}"
+        tokens, updated = self.cache.get(cache_key) or (capacity, now)
+        allowed, tokens, wait = _take(tokens, updated, capacity, refill_rate, now)
+        self.cache.set(cache_key, (tokens, now), timeout=int(capacity / refill_rate) + 1)
+        return allowed, wait
+
+
+def _take(tokens, updated, capacity, refill_rate, now):
+    tokens = min(capacity, tokens + max(0.0, now - updated) * refill_rate)
+    if tokens >= 1:
+        return True, tokens - 1, None
+    return False, tokens, (1 - tokens) / refill_rate
+
+
+class LocalHashingLimiter:
+    def __init__(self, limit):
+        self.semaphore = threading.BoundedSemaphore(limit)
+
+    def acquire(self):
+        return self.semaphore.acquire(blocking=False)
+
+    def release(self, slot):
+        self.semaphore.release()
+
+
+class CacheHashingLimiter:
+    """
+    Caps in-flight hashing requests across workers with one cache key per
+    slot, claimed by an atomic add(). A slot expires a minute after it was
+    taken, so one held by a crashed worker comes back, and a release only
+    frees the slot if it still holds it.
+    """
+    key_prefix = "throttle:hashing-slot"
+    slot_timeout = 60
+
+    def __init__(self, alias, limit):
+        self.cache = caches[alias]
+        self.limit = limit
+
+    def acquire(self):
+        """
+        Returns the claimed slot for release(), or None if all are taken.
+        """
+        holder = secrets.token_hex(8)
+        first = random.randrange(self.limit)
+        for offset in range(self.limit):
+            key = f"{self.key_prefix}:{(first + offset) % self.limit}"
+            if self.cache.add(key, holder, timeout=self.slot_timeout):
+                return key, holder
+        return None
+
+    def release(self, slot):
+        key, holder = slot
+        if self.cache.get(key) == holder:
+            self.cache.delete(key)
+
+
+def get_bucket_store():
+    global _bucket_store
+    with _state_lock:
+        if _bucket_store is None:
+            alias = throttle_cache_alias()
+            _bucket_store = CacheBucketStore(alias) if alias else LocalBucketStore()
+        return _bucket_store
+
+
+def get_hashing_limiter():
+    global _hashing_limiter
+    with _state_lock:
+        if _hashing_limiter is None:
+            alias = throttle_cache_alias()
+            limit = hashing_concurrency()
+            _hashing_limiter = CacheHashingLimiter(alias, limit) if alias else LocalHashingLimiter(limit)
+        return _hashing_limiter
+
+
+def reset_throttles():
+    """
+    Drops all throttle state and re-reads settings (used by tests).
+    """
+    global _bucket_store, _hashing_limiter
+    with _state_lock:
+        _bucket_store = None
+        _hashing_limiter = None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        capacity, refill_rate = parse_rate(throttle_rates()[self.scope])
+        allowed, self._wait = get_bucket_store().take(f"{self.scope}:{key}", capacity, refill_rate)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    scope = "auth_ip"
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AuthAccountThrottle(TokenBucketThrottle):
+    """
+    Buckets by the account being authenticated: the submitted username or
+    email, or the user id encoded in a reset link.
+    """
+    scope = "auth_account"
+
+    def get_key(self, request, view):
+        uidb64 = getattr(view, "kwargs", {}).get("uidb64")
+        if uidb64:
+            return f"uid:{uidb64}"
+        for field in ("username", "email"):
+            value = request.data.get(field) if hasattr(request.data, "get") else None
+            if isinstance(value, str) and value.strip():
+                return f"{field}:{value.strip().lower()}"
+        return None
+
+
+AUTH_THROTTLES = [AuthIPThrottle, AuthAccountThrottle]
+
+
+def limit_hashing(func):
+    """
+    Runs func only if a hashing slot is free; otherwise fails fast with 429.
+    """
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        limiter = get_hashing_limiter()
+        slot = limiter.acquire()
+        if not slot:
+            raise exceptions.Throttled(wait=1, detail="Server is busy, please retry shortly.")
+        try:
+            return func(*args, **kwargs)
+        finally:
+            limiter.release(slot)
+    return wrapped
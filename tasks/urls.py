@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
@@ -5,18 +6,53 @@ from .views import (
     event_list_create,
     dashboard_stats,
     calendar_tasks,
+    calendar_feed,
     insights_data,
-    task_stats_view, 
+    task_stats_view,
+    task_list_async,
+    event_list_async,
+    dashboard_stats_async,
+    calendar_tasks_async,
+    insights_data_async,
+    task_stats_async,
+    sync_changes,
+    export_data,
+    import_data,
+    calendar_subscription,
+    calendar_ics,
+    search_view,
 )
 
 router = DefaultRouter()
 router.register(r"tasks", TaskViewSet, basename="tasks")
 
-urlpatterns = [
-    path("", include(router.urls)),
+sync_read_urlpatterns = [
     path("dashboard/", dashboard_stats, name="dashboard"),
     path("calendar/", calendar_tasks, name="calendar-tasks"),
     path("insights/", insights_data, name="insights"),
     path("events/", event_list_create, name="event-list-create"),
     path("task-stats/", task_stats_view, name="task-stats"),
 ]
+
+async_read_urlpatterns = [
+    # Ahead of the router's tasks/ route; POST falls through to the viewset.
+    path("tasks/", task_list_async, name="task-list-async"),
+    path("dashboard/", dashboard_stats_async, name="dashboard"),
+    path("calendar/", calendar_tasks_async, name="calendar-tasks"),
+    path("insights/", insights_data_async, name="insights"),
+    path("events/", event_list_async, name="event-list-create"),
+    path("task-stats/", task_stats_async, name="task-stats"),
+]
+
+read_urlpatterns = async_read_urlpatterns if getattr(settings, "ASYNC_READ_VIEWS", False) else sync_read_urlpatterns
+
+urlpatterns = read_urlpatterns + [
+    path("", include(router.urls)),
+    path("calendar/feed/", calendar_feed, name="calendar-feed"),
+    path("calendar/subscription/", calendar_subscription, name="calendar-subscription"),
+    path("calendar/ics/<str:token>.ics", calendar_ics, name="calendar-ics"),
+    path("changes/", sync_changes, name="changes"),
+    path("export/<str:kind>.<str:fmt>", export_data, name="export"),
+    path("import/", import_data, name="import"),
+    path("search/", search_view, name="search"),
+]
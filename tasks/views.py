@@ -1,20 +1,54 @@
 import traceback
-from datetime import timedelta
+from functools import wraps
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
 from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.utils.encoding import force_bytes, force_str
-from django.utils import timezone
-from django.db.models import Count
-from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from django.utils.http import urlsafe_base64_decode
+from django.utils.encoding import force_str
+from rest_framework import exceptions, viewsets, permissions, status
+from rest_framework.decorators import action, api_view, parser_classes, permission_classes, throttle_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
-
-from .models import Task, Event
-from .serializers import TaskSerializer, EventSerializer
+from django_filters.rest_framework import DjangoFilterBackend
+
+from .models import ArchivedTask, CalendarFeedToken, Task, Event
+from .serializers import TaskSerializer, TaskRowSerializer, EventSerializer
+from .bulk import BulkRequestError, bulk_create_tasks, bulk_delete_tasks, bulk_update_tasks
+from .calendar_feed import (
+    CalendarWindowError,
+    calendar_window_payload,
+    events_in_window,
+    parse_window,
+    serialize_occurrences,
+    task_entry,
+    tasks_in_window,
+)
+from .conditional import TIME_SENSITIVE_TTL, aconditional_user_response, conditional_user_response
+from .export import ARCHIVE_SOURCES, EXPORT_FORMATS, EXPORT_SOURCES, export_response
+from .ics_feed import user_feed
+from .importer import ImportFormatError, import_file
+from .jobs import enqueue
+from .filters import ArchivedTaskFilter, EventFilter, TaskFilter, archived_requested
+from .pagination import EventCursorPagination, TaskCursorPagination
+from .search import SEARCH_MODELS, SearchQueryError, search
+from .sharding import UserMoving, using_user_shard
+from .stats import (
+    adashboard_payload,
+    ainsights_payload,
+    atask_stats_payload,
+    dashboard_payload,
+    insights_payload,
+    task_stats_payload,
+)
+from .sync import SyncTokenError, SyncTokenExpired, changes_payload
+from .throttling import AUTH_THROTTLES, limit_hashing
 
 User = get_user_model()
 
@@ -27,20 +61,113 @@ def get_user_from_request(request):
         return user
     return request.user
 
-def get_permission_classes():
+def get_view_permission_classes():
     if getattr(settings, "DISABLE_AUTH_FOR_TESTING", False):
-        return [permissions.AllowAny()]
-    return [permissions.IsAuthenticated()]
+        return [permissions.AllowAny]
+    return [permissions.IsAuthenticated]
+
+def get_permission_classes():
+    return [permission() for permission in get_view_permission_classes()]
+
+def conditional_on_user_version(ttl=None, cache=False):
+    """
+    Makes a GET view answer conditional requests from the user's data
+    version, skipping the view entirely when the client is up to date.
+    cache=True also serves unchanged payloads from the response cache.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            user = get_user_from_request(request)
+            return conditional_user_response(
+                request, user, lambda: view_func(request, *args, **kwargs), ttl=ttl, cache=cache,
+            )
+        return _wrapped_view
+    return decorator
+
+class AsyncReadView(APIView):
+    """
+    Supplies DRF's request handling (authentication, permissions, throttles,
+    content negotiation, exception handler, renderers) to the coroutine
+    views; the blocking steps run in a worker thread.
+    """
+
+    def get_permissions(self):
+        return get_permission_classes()
+
+    def _allowed_methods(self):
+        # The handlers are the wrapped coroutine and its fallback, not methods.
+        return [method.upper() for method in self.http_method_names]
+
+
+def async_read_view(ttl=None, fallback=None, cache=False):
+    """
+    Serves GET/HEAD from a coroutine view, called as view(request, user),
+    with the same authentication, permission and conditional-request rules
+    as the sync views, and OPTIONS as APIView does. Other methods are handed
+    to the sync `fallback` view in a worker thread. Runs natively under ASGI
+    and via Django's async adapter under WSGI.
+    """
+    def decorator(view_func):
+        # Named after the view function for OPTIONS metadata, as @api_view
+        # does, and allowing whatever the fallback also serves.
+        if fallback is None:
+            methods = ["get", "options"]
+        elif getattr(fallback, "actions", None):
+            methods = [*fallback.actions, "options"]
+        else:
+            methods = fallback.cls.http_method_names
+        view_class = type(view_func.__name__, (AsyncReadView,), {
+            "__doc__": view_func.__doc__,
+            "http_method_names": methods,
+        })
+
+        def initial(view, request, *args, **kwargs):
+            view.initial(request, *args, **kwargs)
+            return get_user_from_request(request)
+
+        @csrf_exempt
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") and fallback is not None:
+                return await sync_to_async(fallback)(request, *args, **kwargs)
+
+            view = view_class(args=args, kwargs=kwargs)
+            request = view.request = view.initialize_request(request, *args, **kwargs)
+            view.headers = view.default_response_headers
+            try:
+                if request.method not in ("GET", "HEAD", "OPTIONS"):
+                    raise exceptions.MethodNotAllowed(request.method)
+                user = await sync_to_async(initial)(view, request, *args, **kwargs)
+                if request.method == "OPTIONS":
+                    response = view.options(request, *args, **kwargs)
+                else:
+                    response = await aconditional_user_response(
+                        request, user, lambda: view_func(request, user, *args, **kwargs), ttl=ttl, cache=cache,
+                    )
+            except Exception as exc:
+                response = view.handle_exception(exc)
+            # Rendered by Django's handler, like any TemplateResponse.
+            return view.finalize_response(request, response, *args, **kwargs)
+        return _wrapped_view
+    return decorator
 
 # === Auth Views ===
 class SafeTokenObtainPairView(TokenObtainPairView):
     http_method_names = ['post']
+    throttle_classes = AUTH_THROTTLES
+
+    @limit_hashing
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
 
     def get(self, request, *args, **kwargs):
         return Response({"detail": "Method 'GET' not allowed."}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes(AUTH_THROTTLES)
+@limit_hashing
 def register_view(request):
     try:
         data = request.data
@@ -79,23 +206,10 @@ def forgot_password_view(request):
         if not email:
             return Response({"error": "Email is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            return Response({"message": "If this email exists, a reset link was sent."}, status=status.HTTP_200_OK)
-
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        token = default_token_generator.make_token(user)
-        frontend_url = getattr(settings, "FRONTEND_URL", "http://localhost:3000")
-        reset_link = f"{frontend_url}/reset-password/{uid}/{token}/"
-
-        send_mail(
-            subject="SmartTasker Password Reset",
-            message=f"Click here to reset your password:\n{reset_link}",
-            from_email="noreply@smarttasker.com",
-            recipient_list=[email],
-            fail_silently=False,
-        )
+        user = User.objects.filter(email=email).first()
+        if user is not None:
+            # Sent by a `run_jobs` worker, so SMTP latency stays off the request.
+            enqueue("send_password_reset_email", {"user_id": user.pk})
 
         return Response({"message": "If this email exists, a reset link was sent."}, status=status.HTTP_200_OK)
 
@@ -105,6 +219,8 @@ def forgot_password_view(request):
 
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes(AUTH_THROTTLES)
+@limit_hashing
 def reset_password_view(request, uidb64, token):
     try:
         password = request.data.get("password")
@@ -132,75 +248,271 @@ def reset_password_view(request, uidb64, token):
 # === Task CRUD ===
 class TaskViewSet(viewsets.ModelViewSet):
     serializer_class = TaskSerializer
+    pagination_class = TaskCursorPagination
+    filter_backends = [DjangoFilterBackend]
 
     def get_permissions(self):
         return get_permission_classes()
 
+    def _archived(self):
+        # Archived tasks are list-only; they cannot be fetched or edited by id.
+        return self.action == 'list' and archived_requested(self.request.query_params)
+
+    @property
+    def filterset_class(self):
+        return ArchivedTaskFilter if self._archived() else TaskFilter
+
     def get_queryset(self):
         user = get_user_from_request(self.request)
-        return Task.objects.filter(user=user)
+        model = ArchivedTask if self._archived() else Task
+        return model.objects.filter(user=user).select_related('user')
+
+    def list(self, request, *args, **kwargs):
+        # is_overdue/is_upcoming depend on the clock, hence the TTL.
+        user = get_user_from_request(request)
+        return conditional_user_response(request, user, lambda: self._list_rows(request), ttl=TIME_SENSITIVE_TTL)
+
+    def _list_rows(self, request):
+        # Read-only fast path: plain value rows instead of model instances.
+        queryset = self.filter_queryset(self.get_queryset()).values(*TaskRowSerializer.values_fields)
+        rows = TaskRowSerializer()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.serialize(page))
+        return Response(rows.serialize(queryset))
 
     def perform_create(self, serializer):
         user = get_user_from_request(self.request)
         serializer.save(user=user)
 
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="bulk")
+    def bulk(self, request):
+        """
+        POST a list of tasks to create, PATCH a list of {"id", ...fields} to
+        update, or DELETE {"ids": [...]}. All items are validated first and
+        the batch is applied in one transaction only if every item passes.
+        """
+        try:
+            user = get_user_from_request(request)
+            context = self.get_serializer_context()
+
+            if request.method == "DELETE":
+                deleted, errors = bulk_delete_tasks(user, request.data)
+                if errors:
+                    return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+                return Response({"deleted": deleted}, status=status.HTTP_200_OK)
+
+            if request.method == "POST":
+                tasks, errors = bulk_create_tasks(user, request.data, context)
+                success_status = status.HTTP_201_CREATED
+            else:
+                tasks, errors = bulk_update_tasks(user, request.data, context)
+                success_status = status.HTTP_200_OK
+
+            if errors:
+                return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(TaskSerializer(tasks, many=True, context=context).data, status=success_status)
+
+        except BulkRequestError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        except UserMoving as e:
+            return Response({"error": str(e.detail)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        except Exception:
+            traceback.print_exc()
+            return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# === Async Read Endpoints ===
+# Coroutine counterparts of the read views, routed instead of them when
+# ASYNC_READ_VIEWS is on (see asgi.py). Under WSGI the sync views are used,
+# since running a coroutine view there adds an event loop per request.
+
+# Creation on /tasks/ stays on the viewset.
+_task_collection = TaskViewSet.as_view({"get": "list", "post": "create"})
+
+# is_overdue/is_upcoming depend on the clock, hence the TTL.
+@async_read_view(ttl=TIME_SENSITIVE_TTL, fallback=_task_collection)
+async def task_list_async(request, user):
+    try:
+        if archived_requested(request.query_params):
+            filterset_class, model = ArchivedTaskFilter, ArchivedTask
+        else:
+            filterset_class, model = TaskFilter, Task
+        filterset = filterset_class(request.query_params, queryset=model.objects.filter(user=user), request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Read-only fast path: plain value rows instead of model instances.
+        # DRF's cursor paginator is synchronous, so the page query runs in a
+        # worker thread; auth and the conditional check above stay async.
+        queryset = filterset.qs.values(*TaskRowSerializer.values_fields)
+        paginator = TaskCursorPagination()
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, request)
+        return paginator.get_paginated_response(TaskRowSerializer().serialize(page))
+
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 # === Events API ===
+def _event_filter(request, user):
+    """
+    Shared by the sync and async events GET: the optional window, then
+    EventFilter. Returns (filterset, start, end); callers answer 400 with
+    filterset.errors when it is invalid, else list filterset.qs.
+
+    Lists are unpaginated unless the client asks for a cursor page, so
+    existing callers keep receiving a plain list.
+    """
+    start, end = parse_window(request.query_params, required=False)
+    if start is not None:
+        events = events_in_window(user, start, end)
+    else:
+        events = Event.objects.filter(user=user)
+    filterset = EventFilter(request.query_params, queryset=events.select_related("user"), request=request)
+    return filterset, start, end
+
+
+def _event_data(events, start, end):
+    # With a window, recurring events are expanded into their occurrences;
+    # a page then holds every occurrence of the series on it.
+    if start is not None:
+        return serialize_occurrences(events, start, end, EventSerializer)
+    return EventSerializer(events, many=True).data
+
+
+def _event_page(paginator, events, request, start, end):
+    page = paginator.paginate_queryset(events, request)
+    return paginator.get_paginated_response(_event_data(page, start, end))
+
+
+def _event_list(request, user):
+    filterset, start, end = _event_filter(request, user)
+    if not filterset.is_valid():
+        return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+    paginator = EventCursorPagination()
+    if paginator.is_requested(request):
+        return _event_page(paginator, filterset.qs, request, start, end)
+    return Response(_event_data(filterset.qs, start, end))
+
 @api_view(["GET", "POST"])
-@permission_classes(get_permission_classes())
+@permission_classes(get_view_permission_classes())
+@conditional_on_user_version()
 def event_list_create(request):
     try:
         user = get_user_from_request(request)
 
         if request.method == "GET":
-            events = Event.objects.filter(user=user)
-            serializer = EventSerializer(events, many=True)
-            return Response(serializer.data)
+            return _event_list(request, user)
 
-        serializer = EventSerializer(data=request.data)
+        serializer = EventSerializer(data=request.data, context={"request": request})
         if serializer.is_valid():
             serializer.save(user=user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    except CalendarWindowError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    except UserMoving as e:
+        return Response({"error": str(e.detail)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@async_read_view(fallback=event_list_create)
+async def event_list_async(request, user):
+    try:
+        # Recurrence expansion is CPU-bound, so the listing runs in a worker
+        # thread rather than on the event loop.
+        return await sync_to_async(_event_list)(request, user)
+
+    except CalendarWindowError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# === Delta Sync ===
+@api_view(["GET"])
+@permission_classes(get_view_permission_classes())
+def sync_changes(request):
+    try:
+        user = get_user_from_request(request)
+        payload = changes_payload(user, request.query_params.get("since"), {"request": request})
+        return Response(payload, status=status.HTTP_200_OK)
+
+    except SyncTokenExpired as e:
+        return Response({"error": str(e)}, status=status.HTTP_410_GONE)
+
+    except SyncTokenError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# === Export ===
+@api_view(["GET"])
+@permission_classes(get_view_permission_classes())
+def export_data(request, kind, fmt):
+    try:
+        if kind not in EXPORT_SOURCES or fmt not in EXPORT_FORMATS:
+            return Response({"error": "Unknown export."}, status=status.HTTP_404_NOT_FOUND)
+        archived = archived_requested(request.query_params)
+        if archived and kind not in ARCHIVE_SOURCES:
+            return Response({"error": "Only tasks are archived."}, status=status.HTTP_400_BAD_REQUEST)
+        user = get_user_from_request(request)
+        return export_response(user, kind, fmt, archived)
+
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# === Import ===
+@api_view(["POST"])
+@permission_classes(get_view_permission_classes())
+@parser_classes([MultiPartParser])
+def import_data(request):
+    try:
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "A 'file' upload is required."}, status=status.HTTP_400_BAD_REQUEST)
+        user = get_user_from_request(request)
+        report = import_file(user, upload.file, upload.name, request.data.get("kind"), {"request": request})
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+    except ImportFormatError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    except UserMoving as e:
+        return Response({"error": str(e.detail)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
     except Exception:
         traceback.print_exc()
         return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # === Dashboard Stats ===
 @api_view(["GET"])
-@permission_classes(get_permission_classes())
+@permission_classes(get_view_permission_classes())
+@conditional_on_user_version(ttl=TIME_SENSITIVE_TTL, cache=True)
 def dashboard_stats(request):
     try:
         user = get_user_from_request(request)
-        tasks = Task.objects.filter(user=user)
-
-        total = tasks.count()
-        completed = tasks.filter(status='completed').count()
-        pending = tasks.exclude(status='completed').count()
-
-        now = timezone.now()
-        upcoming_tasks = tasks.filter(
-            due_date__gt=now,
-            due_date__lte=now + timedelta(days=7),
-        ).exclude(status='completed')
-
-        upcoming = [
-            {
-                "id": t.id,
-                "title": t.title,
-                "due_date": t.due_date.isoformat() if t.due_date else None,
-                "description": t.description,
-            }
-            for t in upcoming_tasks
-        ]
+        return Response(dashboard_payload(user))
 
-        return Response({
-            "total": total,
-            "completed": completed,
-            "pending": pending,
-            "upcoming": upcoming
-        })
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@async_read_view(ttl=TIME_SENSITIVE_TTL, cache=True)
+async def dashboard_stats_async(request, user):
+    try:
+        return Response(await adashboard_payload(user))
 
     except Exception:
         traceback.print_exc()
@@ -208,53 +520,145 @@ def dashboard_stats(request):
 
 # === Calendar Data ===
 @api_view(["GET"])
-@permission_classes(get_permission_classes())
+@permission_classes(get_view_permission_classes())
+@conditional_on_user_version(cache=True)
 def calendar_tasks(request):
     try:
         user = get_user_from_request(request)
-        tasks = Task.objects.filter(user=user).exclude(due_date__isnull=True)
-        events = [
-            {
-                "id": t.id,
-                "title": t.title,
-                "start": t.due_date.isoformat(),
-                "end": t.due_date.isoformat(),
-                "completed": t.completed,
-                "priority": t.get_priority_display(),
-                "status": t.get_status_display(),
-            }
-            for t in tasks
-        ]
+        start, end = parse_window(request.query_params, required=False)
+        events = [task_entry(t) for t in tasks_in_window(user, start, end)]
         return Response(events)
 
+    except CalendarWindowError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@async_read_view(cache=True)
+async def calendar_tasks_async(request, user):
+    try:
+        start, end = parse_window(request.query_params, required=False)
+        events = [task_entry(t) async for t in tasks_in_window(user, start, end)]
+        return Response(events)
+
+    except CalendarWindowError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     except Exception:
         traceback.print_exc()
         return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-# === Insights / Task Stats ===
 @api_view(["GET"])
-@permission_classes(get_permission_classes())
-def insights_data(request):
+@permission_classes(get_view_permission_classes())
+@conditional_on_user_version()
+def calendar_feed(request):
     try:
         user = get_user_from_request(request)
+        start, end = parse_window(request.query_params)
+        return Response({
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "items": calendar_window_payload(user, start, end),
+        })
 
-        task_stats = (
-            Task.objects.filter(user=user)
-            .values("priority")
-            .annotate(count=Count("id"))
-        )
+    except CalendarWindowError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        priority_map = dict(Task.PRIORITY_CHOICES)
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        result = [
-            {
-                "priority": priority_map.get(item["priority"], "Unknown"),
-                "count": item["count"]
-            }
-            for item in task_stats
-        ]
+# === iCalendar Subscription ===
+@api_view(["GET", "POST"])
+@permission_classes(get_view_permission_classes())
+def calendar_subscription(request):
+    """
+    GET returns the user's subscription URL; POST rotates the token, which
+    revokes the previous URL.
+    """
+    try:
+        user = get_user_from_request(request)
+        feed = CalendarFeedToken.for_user(user, rotate=request.method == "POST")
+        url = request.build_absolute_uri(reverse("calendar-ics", args=[feed.token]))
+        return Response({"url": url}, status=status.HTTP_200_OK)
 
-        return Response({"data": result}, status=status.HTTP_200_OK)
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@require_GET
+def calendar_ics(request, token):
+    # Calendar apps can't send a JWT, so the secret token is the credential.
+    feed = CalendarFeedToken.objects.select_related("user").filter(token=token).first()
+    if feed is None or not feed.user.is_active:
+        raise Http404("Unknown calendar feed.")
+    user = feed.user
+
+    def build():
+        response = HttpResponse(user_feed(user), content_type="text/calendar; charset=utf-8")
+        response["Content-Disposition"] = 'inline; filename="smarttasker.ics"'
+        return response
+
+    # No authenticated user on this request, so pick the shard explicitly.
+    with using_user_shard(user.pk):
+        return conditional_user_response(request, user, build)
+
+# === Search ===
+@api_view(["GET"])
+@permission_classes(get_view_permission_classes())
+@conditional_on_user_version(ttl=TIME_SENSITIVE_TTL)
+def search_view(request):
+    try:
+        user = get_user_from_request(request)
+        query = request.query_params.get("q", "")
+        kind = request.query_params.get("type")
+        if kind and kind not in SEARCH_MODELS:
+            return Response({"error": "type must be 'tasks' or 'events'."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = request.query_params.get("limit")
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = 0
+            if limit < 1:
+                return Response({"error": "limit must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = search(user, query, kinds=[kind] if kind else list(SEARCH_MODELS), limit=limit)
+        serializers_by_kind = {"tasks": TaskSerializer, "events": EventSerializer}
+        payload = {"query": query}
+        for name, matches in results.items():
+            payload[name] = [
+                {**serializers_by_kind[name](instance).data, "rank": round(rank, 6)}
+                for instance, rank in matches
+            ]
+        return Response(payload)
+
+    except SearchQueryError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# === Insights / Task Stats ===
+@api_view(["GET"])
+@permission_classes(get_view_permission_classes())
+@conditional_on_user_version(cache=True)
+def insights_data(request):
+    try:
+        user = get_user_from_request(request)
+        return Response(insights_payload(user), status=status.HTTP_200_OK)
+
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@async_read_view(cache=True)
+async def insights_data_async(request, user):
+    try:
+        return Response(await ainsights_payload(user), status=status.HTTP_200_OK)
 
     except Exception:
         traceback.print_exc()
@@ -262,21 +666,21 @@ def insights_data(request):
 
 # === Task Statistics: Count by Priority and Completion ===
 @api_view(["GET"])
-@permission_classes(get_permission_classes())
+@permission_classes(get_view_permission_classes())
+@conditional_on_user_version(cache=True)
 def task_stats_view(request):
     try:
         user = get_user_from_request(request)
-        tasks = Task.objects.filter(user=user)
+        return Response(task_stats_payload(user), status=status.HTTP_200_OK)
 
-        stats = {
-            "high_priority": tasks.filter(priority="H").count(),
-            "medium_priority": tasks.filter(priority="M").count(),
-            "low_priority": tasks.filter(priority="L").count(),
-            "completed": tasks.filter(status="completed").count(),
-            "pending": tasks.exclude(status="completed").count(),
-        }
+    except Exception:
+        traceback.print_exc()
+        return Response({"error": "Internal server error."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        return Response(stats, status=status.HTTP_200_OK)
+@async_read_view(cache=True)
+async def task_stats_async(request, user):
+    try:
+        return Response(await atask_stats_payload(user), status=status.HTTP_200_OK)
 
     except Exception:
         traceback.print_exc()